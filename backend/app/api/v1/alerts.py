@@ -0,0 +1,44 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.auth import get_current_user
+from app.models.schemas import AlertEventsResponse, AlertRule, AlertRuleCreate
+from app.services.alert_engine import ALERT_INDICATORS, alert_engine, list_alert_events
+
+router = APIRouter()
+
+
+@router.get("", response_model=list[AlertRule])
+async def get_alert_rules(user=Depends(get_current_user)):
+    return await alert_engine.list_rules(user["id"])
+
+
+@router.post("", response_model=AlertRule)
+async def create_alert_rule(req: AlertRuleCreate, user=Depends(get_current_user)):
+    """
+    Create an alert that fires when an indicator crosses a threshold,
+    e.g. `{"symbol": "EURUSD=X", "indicator": "rsi", "operator": "<", "threshold": 30}`.
+
+    Omit `symbol` to watch every polled symbol.
+    """
+    if req.indicator not in ALERT_INDICATORS:
+        raise HTTPException(status_code=400, detail=f"Indicator must be one of {', '.join(ALERT_INDICATORS)}")
+    return await alert_engine.add_rule(user["id"], req.symbol, req.indicator, req.operator, req.threshold)
+
+
+@router.delete("/{rule_id}")
+async def delete_alert_rule(rule_id: int, user=Depends(get_current_user)):
+    if not await alert_engine.remove_rule(user["id"], rule_id):
+        raise HTTPException(status_code=404, detail="Alert rule not found")
+    return {"message": "Alert rule deleted"}
+
+
+@router.get("/events", response_model=AlertEventsResponse)
+async def get_alert_events(
+    limit: int = Query(default=50, ge=1, le=500),
+    before_id: Optional[int] = Query(default=None, description="Return events older than this id (from next_before_id)"),
+    user=Depends(get_current_user),
+):
+    """Get the current user's alert firings, newest first."""
+    return await list_alert_events(user["id"], limit=limit, before_id=before_id)
@@ -1,9 +1,11 @@
+import json
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from pathlib import Path
 from datetime import datetime
 
 from app.models.schemas import ChatRequest, ChatResponse, ChatMessage
-from app.services.claude_engine import AIEngine
+from app.services.claude_engine import AIEngine, get_ai_engine
 from app.auth import get_optional_user
 from app.database import get_db
 
@@ -26,11 +28,8 @@ async def _save_chat_messages(user_id: int, user_content: str, assistant_content
         pass
 
 
-@router.post("", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest, background_tasks: BackgroundTasks, user=Depends(get_optional_user)):
-    """Chat with the AI: accepts message history + current prompt and optional system prompt key/override."""
-    claude_engine = AIEngine()
-
+def _with_system_prompt(request: ChatRequest) -> list[ChatMessage]:
+    """The request's messages, preceded by the selected system prompt if any."""
     messages = list(request.messages)
 
     system_prompt_content = None
@@ -54,8 +53,19 @@ async def chat_endpoint(request: ChatRequest, background_tasks: BackgroundTasks,
     if system_prompt_content:
         system_message = ChatMessage(role="system", content=system_prompt_content, timestamp=datetime.now())
         messages = [system_message] + messages
+    return messages
 
-    response = claude_engine.chat(messages, model=request.model)
+
+@router.post("", response_model=ChatResponse)
+async def chat_endpoint(
+    request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    user=Depends(get_optional_user),
+    claude_engine: AIEngine = Depends(get_ai_engine),
+):
+    """Chat with the AI: accepts message history + current prompt and optional system prompt key/override."""
+    messages = _with_system_prompt(request)
+    response = await claude_engine.chat(messages, model=request.model)
 
     # Save to DB if user is authenticated
     if user and response.message:
@@ -66,3 +76,32 @@ async def chat_endpoint(request: ChatRequest, background_tasks: BackgroundTasks,
             )
 
     return response
+
+
+@router.post("/stream")
+async def chat_stream_endpoint(
+    request: ChatRequest,
+    user=Depends(get_optional_user),
+    claude_engine: AIEngine = Depends(get_ai_engine),
+):
+    """
+    Streaming variant of `/chat` as Server-Sent Events.
+
+    Sends `token` events (`{"content": ...}`) as the reply is generated, `tool` events
+    while market data is fetched for the model, and a final `done` event carrying the
+    complete ChatResponse. The exchange is saved to history before `done` is sent.
+    """
+    messages = _with_system_prompt(request)
+    user_messages = [m for m in request.messages if m.role == "user"]
+
+    async def event_source():
+        async for event, data in claude_engine.chat_stream(messages, model=request.model):
+            if event == "done" and user and user_messages:
+                await _save_chat_messages(user["id"], user_messages[-1].content, data["message"]["content"])
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,12 +1,13 @@
 import json
 from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from typing import Optional
 
 from app.models.schemas import (
-    ContentRequest, ContentResponse,
+    ContentBatchRequest, ContentBatchResponse, ContentRequest, ContentResponse,
     Persona, Platform
 )
-from app.services.content_generator import content_generator
+from app.services.content_generator import ContentGenerator, get_content_generator
 from app.auth import get_optional_user
 from app.database import get_db
 
@@ -26,7 +27,12 @@ async def _save_content(user_id: int, response: ContentResponse, market_context:
 
 
 @router.post("", response_model=ContentResponse)
-async def generate_content(request: ContentRequest, background_tasks: BackgroundTasks, user=Depends(get_optional_user)):
+async def generate_content(
+    request: ContentRequest,
+    background_tasks: BackgroundTasks,
+    user=Depends(get_optional_user),
+    content_generator: ContentGenerator = Depends(get_content_generator),
+):
     """
     Generate social media content with a specific persona voice.
 
@@ -45,7 +51,7 @@ async def generate_content(request: ContentRequest, background_tasks: Background
     - weekly_brief: Broader market themes
     - chart_post: You-trade-like-this style
     """
-    response = content_generator.generate_content(
+    response = await content_generator.generate_content(
         market_context=request.market_context,
         persona=request.persona,
         platform=request.platform,
@@ -60,28 +66,92 @@ async def generate_content(request: ContentRequest, background_tasks: Background
 
 
 @router.post("/all")
-def generate_all_personas(
+async def generate_all_personas(
     market_context: str,
     behavior_context: Optional[str] = None,
     coaching_insight: Optional[str] = None,
-    platform: Platform = Platform.LINKEDIN
+    platform: Platform = Platform.LINKEDIN,
+    content_generator: ContentGenerator = Depends(get_content_generator),
 ):
     """
     Generate content for all three personas at once.
     Useful for comparing different voice options.
     """
     results = {}
-    for persona in Persona:
-        content = content_generator.generate_content(
-            market_context=market_context,
-            persona=persona,
-            platform=platform,
-            behavior_context=behavior_context,
-            coaching_insight=coaching_insight,
-        )
-        results[persona.value] = content
+    async for content in content_generator.generate_batch(
+        market_context=market_context,
+        platforms=[platform],
+        behavior_context=behavior_context,
+        coaching_insight=coaching_insight,
+    ):
+        results[content.persona.value] = content
+
+    return {persona.value: results[persona.value] for persona in Persona}
+
+
+@router.post("/batch", response_model=ContentBatchResponse)
+async def generate_batch(
+    request: ContentBatchRequest,
+    background_tasks: BackgroundTasks,
+    user=Depends(get_optional_user),
+    content_generator: ContentGenerator = Depends(get_content_generator),
+):
+    """
+    Generate content for every requested persona × platform combination.
+
+    Variants are generated concurrently (at most CONTENT_MAX_CONCURRENCY at a time) and
+    returned in completion order. With `single_prompt`, one structured completion writes
+    them all, and any it misses are generated individually.
+    """
+    results = []
+    async for response in content_generator.generate_batch(
+        market_context=request.market_context,
+        personas=request.personas,
+        platforms=request.platforms,
+        behavior_context=request.behavior_context,
+        coaching_insight=request.coaching_insight,
+        single_prompt=request.single_prompt,
+    ):
+        results.append(response)
+        if user:
+            background_tasks.add_task(_save_content, user["id"], response, request.market_context)
+
+    return ContentBatchResponse(results=results)
+
+
+@router.post("/batch/stream")
+async def generate_batch_stream(
+    request: ContentBatchRequest,
+    user=Depends(get_optional_user),
+    content_generator: ContentGenerator = Depends(get_content_generator),
+):
+    """
+    Streaming variant of `/content/batch` as Server-Sent Events.
 
-    return results
+    Sends a `content` event (a ContentResponse) as each variant finishes and a final
+    `done` event with the number of variants. Variants are saved to history as they arrive.
+    """
+    async def event_source():
+        count = 0
+        async for response in content_generator.generate_batch(
+            market_context=request.market_context,
+            personas=request.personas,
+            platforms=request.platforms,
+            behavior_context=request.behavior_context,
+            coaching_insight=request.coaching_insight,
+            single_prompt=request.single_prompt,
+        ):
+            count += 1
+            yield f"event: content\ndata: {response.model_dump_json()}\n\n"
+            if user:
+                await _save_content(user["id"], response, request.market_context)
+        yield f"event: done\ndata: {json.dumps({'count': count})}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/personas")
@@ -1,20 +1,19 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from app.models.schemas import InsightRequest, InsightResponse
-from app.services.claude_engine import AIEngine
+from app.services.claude_engine import AIEngine, get_ai_engine
 
 router = APIRouter()
 
 
 @router.post("", response_model=InsightResponse)
-def generate_insight(request: InsightRequest):
+async def generate_insight(request: InsightRequest, claude_engine: AIEngine = Depends(get_ai_engine)):
     """
     Generate a coaching insight that fuses market context (X) with trader behavior (Y).
 
     Returns: "Market did X, and based on your history, you tend to Y" style coaching.
     """
-    claude_engine = AIEngine()
-    coaching_insight = claude_engine.generate_coaching_from_context(
+    coaching_insight = await claude_engine.generate_coaching_from_context(
         market_context=request.market_context,
         behavior_context=request.behavior_context,
     )
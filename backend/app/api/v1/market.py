@@ -1,21 +1,65 @@
 import asyncio
+from datetime import datetime
 
-from fastapi import APIRouter, Query
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from typing import Optional
 
-from app.models.schemas import MarketResponse, Trade, BehaviorRequest, MarketWithNewsResponse
-from app.services.market_intelligence import MarketIntelligenceService
-from app.services.claude_engine import AIEngine
+from app.config import Settings
+from app.models.schemas import (
+    MarketResponse, Trade, BehaviorRequest, MarketWithNewsResponse, BatchIndicatorsResponse, SpikeFeedResponse,
+    ScenarioRequest, ScenarioResult, ScenariosResponse, CorrelationsResponse, CorrelationPeersResponse,
+)
+from app.services.market_intelligence import MarketDataUnavailable, MarketIntelligenceService
+from app.services.batch_indicators import BatchIndicatorService
+from app.services.market_poller import market_poller
+from app.services.market_stream import market_stream
+from app.services.spike_scanner import list_spike_events
+from app.services.correlation_service import correlation_service
+from app.services.scenario_engine import DROP, PRESETS, RISE, scenario_engine
+from app.services.indicator_series import get_indicator_series, to_columnar
+from app.services.downsampling import lttb_indices
+from app.services.timeframes import DERIVED_INTERVALS, can_derive, timeframe_resampler
+from app.services.claude_engine import AIEngine, get_ai_engine
 
+settings = Settings()
 router = APIRouter()
 
+MAX_BATCH_SYMBOLS = 200
+
+
+def _utc_timestamp(value: Optional[datetime]) -> Optional[pd.Timestamp]:
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+
+
+def _history(symbol: str, interval: Optional[str]) -> tuple[pd.DataFrame, str]:
+    """Latest history at `interval`, resampled from the poller's base-interval snapshot."""
+    snapshot = market_poller.get_snapshot(symbol)
+    if interval is None or interval == snapshot.interval:
+        return snapshot.history, snapshot.interval
+    if not can_derive(interval, snapshot.interval):
+        raise HTTPException(status_code=400, detail=f"Interval must be {snapshot.interval} or one of {', '.join(DERIVED_INTERVALS)}")
+    history = timeframe_resampler.resample(
+        symbol, snapshot.interval, snapshot.history, interval, settings.MARKET_HISTORY_PERIOD
+    )
+    return history, interval
+
+
+_INTERVAL_QUERY = Query(default=None, description="Candle interval (default: the base interval); 15m, 30m, 1h, 4h and 1d are derived from it")
+
 
 @router.get("", response_model=MarketResponse)
 async def get_market_data(
     symbol: str = Query(default="EURUSD=X", description="Trading symbol"),
     simulate_drop: bool = Query(default=False, description="Simulate a 3% market drop"),
     simulate_rise: bool = Query(default=False, description="Simulate an 8% market rise"),
-    include_coaching: bool = Query(default=True, description="Include coaching message")
+    include_coaching: bool = Query(default=True, description="Include coaching message"),
+    claude_engine: AIEngine = Depends(get_ai_engine),
 ):
     """
     Get current market data with AI-generated explanation.
@@ -27,23 +71,17 @@ async def get_market_data(
     """
     market_service = MarketIntelligenceService(symbol=symbol)
 
-    claude_engine = AIEngine()
-    # Update symbol if different
-    if symbol != market_service.symbol:
-        market_service.symbol = symbol
-
-    # Get market data
-    market_data = market_service.get_market_data(simulate_drop=simulate_drop, simulate_rise=simulate_rise)
-    market_data_with_news = market_service.get_market_with_news(simulate_drop=simulate_drop, simulate_rise=simulate_rise, news_limit=3)
+    # One market model per (symbol, candle, simulation mode), shared by the response and the prompts
+    market_data = await asyncio.to_thread(market_poller.get_market_model, symbol, simulate_drop, simulate_rise)
+    market_data_with_news = await asyncio.to_thread(
+        market_service.get_market_with_news, news_limit=3, market_model=market_data
+    )
 
-    # Run both LLM calls in parallel
+    # One fused completion for both texts (falls back to two parallel calls)
     if include_coaching:
-        explanation, coaching_message = await asyncio.gather(
-            asyncio.to_thread(claude_engine.explain_market_move, market_data_with_news),
-            asyncio.to_thread(claude_engine.generate_coaching_message, market_data_with_news),
-        )
+        explanation, coaching_message = await claude_engine.explain_with_coaching(market_data_with_news)
     else:
-        explanation = await asyncio.to_thread(claude_engine.explain_market_move, market_data_with_news)
+        explanation = await claude_engine.explain_market_move(market_data_with_news)
         coaching_message = None
 
     return MarketResponse(
@@ -54,13 +92,13 @@ async def get_market_data(
 
 
 @router.get("/indicators")
-def get_indicators(symbol: str = Query(default="EURUSD=X")):
+def get_indicators(symbol: str = Query(default="EURUSD=X"), interval: Optional[str] = _INTERVAL_QUERY):
     """Get raw technical indicators without explanation."""
-    market_service = MarketIntelligenceService(symbol=symbol)
-    if symbol != market_service.symbol:
-        market_service.symbol = symbol
-
-    market_data = market_service.get_market_data()
+    if interval is None or interval == market_poller.interval:
+        market_data = market_poller.get_snapshot(symbol).market_data
+    else:
+        history, interval = _history(symbol, interval)
+        market_data = MarketIntelligenceService(symbol=symbol).build_market_data(history, interval=interval)
 
     return {
         "symbol": market_data.symbol,
@@ -76,43 +114,173 @@ def get_indicators(symbol: str = Query(default="EURUSD=X")):
     }
 
 
+@router.get("/indicators/batch", response_model=BatchIndicatorsResponse)
+def get_indicators_batch(
+    symbols: str = Query(..., description="Comma-separated trading symbols, e.g. EURUSD=X,GBPUSD=X"),
+    interval: Optional[str] = _INTERVAL_QUERY,
+):
+    """Get raw technical indicators for many symbols in one request."""
+    symbol_list = list(dict.fromkeys(s.strip() for s in symbols.split(",") if s.strip()))
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    if len(symbol_list) > MAX_BATCH_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SYMBOLS} symbols per request")
+
+    interval = interval or market_poller.interval
+    if interval != market_poller.interval and not can_derive(interval, market_poller.interval):
+        raise HTTPException(status_code=400, detail=f"Interval must be {market_poller.interval} or one of {', '.join(DERIVED_INTERVALS)}")
+
+    return BatchIndicatorService().get_batch(symbol_list, interval=interval)
+
+
 @router.get("/chart")
 def get_chart_data(
     symbol: str = Query(default="EURUSD=X"),
     simulate_drop: bool = Query(default=False),
     simulate_rise: bool = Query(default=False),
-    points: int = Query(default=50, ge=10, le=100)
+    points: int = Query(default=50, ge=10, le=5000, description="Maximum number of points to return"),
+    start: Optional[datetime] = Query(default=None, description="Range start (ISO 8601, UTC if no offset)"),
+    end: Optional[datetime] = Query(default=None, description="Range end (ISO 8601, UTC if no offset)"),
+    format: str = Query(default="rows", pattern="^(rows|columns)$", description="rows: list of points; columns: parallel arrays"),
+    interval: Optional[str] = _INTERVAL_QUERY,
 ):
-    """Get historical price data for charting."""
+    """
+    Get historical price data for charting.
+
+    Without a range, returns the last `points` candles. With `start`/`end`, returns
+    every candle in the range (reaching into the local candle store for older history)
+    downsampled with Largest-Triangle-Three-Buckets to at most `points` points.
+    """
     market_service = MarketIntelligenceService(symbol=symbol)
-    if symbol != market_service.symbol:
-        market_service.symbol = symbol
-        market_service._cached_data = None
+    history, interval = _history(symbol, interval)
+
+    ranged = start is not None or end is not None
+    if ranged:
+        ts, close, volume = market_service.get_price_history_arrays(
+            history, interval, _utc_timestamp(start), _utc_timestamp(end)
+        )
+        keep = lttb_indices(ts, close, points)
+        ts, close, volume = ts[keep], close[keep], volume[keep]
+    else:
+        ts, close, volume = market_service.get_price_history_arrays(history)
+        ts, close, volume = ts[-points:], close[-points:], volume[-points:]
+
+    prices = np.round(close, 5)
+    volumes = np.where(np.nan_to_num(volume) > 0, np.nan_to_num(volume), 0).astype(np.int64)
+
+    # Simulations only touch the latest candle
+    includes_latest = len(ts) > 0 and len(history) > 0 and ts[-1] == history.index[-1].value
+    if includes_latest and (simulate_drop or simulate_rise):
+        shocked = scenario_engine.overlay(history, [DROP if simulate_drop else RISE])
+        prices[-1] = round(float(shocked["Close"][0, -1]), 5)
+        volumes[-1] = max(int(shocked["Volume"][0, -1]), 0)
+
+    index = pd.DatetimeIndex(ts, tz="UTC")
+    if history.index.tz is not None:
+        index = index.tz_convert(history.index.tz)
+    else:
+        index = index.tz_localize(None)
+    times = index.strftime("%Y-%m-%d %H:%M" if ranged else "%H:%M").tolist()
+    prices = prices.tolist()
+    volumes = volumes.tolist()
 
-    df = market_service.fetch_market_data()
+    if format == "columns":
+        data = {"time": times, "price": prices, "volume": volumes}
+    else:
+        data = [{"time": t, "price": p, "volume": v} for t, p, v in zip(times, prices, volumes)]
 
-    if simulate_drop:
-        df = market_service._simulate_drop(df)
-    elif simulate_rise:
-        df = market_service._simulate_rise(df)
+    return {
+        "symbol": symbol.replace("=X", ""),
+        "data": data
+    }
 
-    # Get last N points
-    df_subset = df.tail(points)
 
-    chart_data = []
-    for idx, row in df_subset.iterrows():
-        chart_data.append({
-            "time": idx.strftime("%H:%M") if hasattr(idx, 'strftime') else str(idx),
-            "price": round(float(row["Close"]), 5),
-            "volume": int(row["Volume"]) if row["Volume"] > 0 else 0
-        })
+@router.get("/series")
+def get_series(
+    symbol: str = Query(default="EURUSD=X"),
+    points: int = Query(default=200, ge=10, le=5000, description="Number of most recent candles"),
+    interval: Optional[str] = _INTERVAL_QUERY,
+):
+    """
+    Get aligned close, RSI, ATR and volume-ratio series for chart overlays.
+
+    Columns are parallel arrays; `time` is epoch milliseconds and indicator values are
+    null until their window has filled.
+    """
+    history, interval = _history(symbol, interval)
+    arrays = get_indicator_series(symbol, interval, history)
 
     return {
         "symbol": symbol.replace("=X", ""),
-        "data": chart_data
+        "interval": interval,
+        **to_columnar(arrays, points),
     }
 
 
+@router.post("/scenarios", response_model=ScenariosResponse)
+def evaluate_scenarios(request: ScenarioRequest):
+    """
+    Evaluate what-if shocks against the latest candles of a symbol in one pass.
+
+    Each scenario can combine a percentage move, a volatility burst, a volume
+    multiplier and a gap open over its last `candles` candles. With no scenarios,
+    the built-in drop and rise presets are evaluated.
+    """
+    history, interval = _history(request.symbol, request.interval)
+    scenarios = request.scenarios or list(PRESETS.values())
+    markets = scenario_engine.evaluate(history, scenarios, symbol=request.symbol)
+    base = MarketIntelligenceService(symbol=request.symbol).build_market_data(history, interval=interval)
+
+    return ScenariosResponse(
+        symbol=request.symbol.replace("=X", ""),
+        base=base,
+        results=[ScenarioResult(scenario=sc, market=m) for sc, m in zip(scenarios, markets)],
+        timestamp=datetime.now(),
+    )
+
+
+@router.get("/spikes", response_model=SpikeFeedResponse)
+async def get_spike_feed(
+    symbol: Optional[str] = Query(default=None),
+    direction: Optional[str] = Query(default=None, pattern="^(up|down)$"),
+    limit: int = Query(default=50, ge=1, le=500),
+    before_id: Optional[int] = Query(default=None, description="Return events older than this id (from next_before_id)"),
+):
+    """
+    Get spikes logged by the universe-wide scanner, newest first.
+
+    Page through history by passing the previous response's `next_before_id` as `before_id`.
+    """
+    return await list_spike_events(symbol=symbol, direction=direction, limit=limit, before_id=before_id)
+
+
+@router.get("/correlations", response_model=CorrelationsResponse)
+def get_correlations(
+    symbols: Optional[str] = Query(default=None, description="Comma-separated symbols (default: every tracked symbol)"),
+):
+    """
+    Get the rolling correlation matrix of candle returns across polled symbols.
+
+    Symbols the poller has not yet seen are left out of the matrix.
+    """
+    symbol_list = None
+    if symbols:
+        symbol_list = list(dict.fromkeys(s.strip() for s in symbols.split(",") if s.strip()))
+    return correlation_service.correlations(symbol_list)
+
+
+@router.get("/correlations/peers", response_model=CorrelationPeersResponse)
+def get_correlation_peers(
+    symbol: str = Query(default="EURUSD=X"),
+    top_k: Optional[int] = Query(default=None, ge=1, le=50),
+):
+    """Get the symbols whose returns move most closely with (or against) `symbol`."""
+    peers = correlation_service.peers(symbol, top_k)
+    if peers is None:
+        raise HTTPException(status_code=404, detail=f"{symbol} is not tracked by the poller yet")
+    return CorrelationPeersResponse(symbol=symbol, interval=correlation_service.interval, peers=peers)
+
+
 @router.get("/with-news", response_model=MarketWithNewsResponse)
 def get_market_with_news(
     symbol: str = Query(default="EURUSD=X", description="Trading symbol"),
@@ -122,10 +290,71 @@ def get_market_with_news(
 ):
     """Get current market data along with recent news headlines."""
     market_service = MarketIntelligenceService(symbol=symbol)
+    market_data = market_poller.get_market_model(symbol, simulate_drop, simulate_rise)
 
-    result = market_service.get_market_with_news(simulate_drop=simulate_drop, simulate_rise=simulate_rise, news_limit=news_limit)
+    return market_service.get_market_with_news(news_limit=news_limit, market_model=market_data)
 
-    return {
-        "market": result.market,
-        "news": result.news
-    }
+
+@router.get("/stream")
+async def stream_market_data(request: Request, symbol: str = Query(default="EURUSD=X")):
+    """
+    Server-Sent Events stream of MarketData for one symbol.
+
+    Sends the current snapshot on connect, then a `candle` event whenever a new candle
+    appears and a `spike` event when spike detection fires. Slow clients only ever
+    receive the most recent buffered updates.
+    """
+    snapshot = await asyncio.to_thread(market_poller.get_snapshot, symbol)
+
+    async def event_source():
+        # Subscribed only once the response starts streaming, so a client that goes away
+        # before the first iteration never leaves a subscription (and poller retain) behind.
+        subscription = market_stream.subscribe(symbol)
+        try:
+            yield market_stream.initial_event(snapshot).as_sse()
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=settings.MARKET_STREAM_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield event.as_sse()
+        finally:
+            market_stream.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def market_websocket(websocket: WebSocket, symbol: str = Query(default="EURUSD=X")):
+    """WebSocket variant of `/market/stream`; each message is `{"event": ..., "data": MarketData}`."""
+    await websocket.accept()
+    try:
+        snapshot = await asyncio.to_thread(market_poller.get_snapshot, symbol)
+    except MarketDataUnavailable as e:
+        await websocket.close(code=1011, reason=str(e))
+        return
+    subscription = market_stream.subscribe(symbol)
+
+    async def pump():
+        await websocket.send_text(market_stream.initial_event(snapshot).as_json())
+        while True:
+            event = await subscription.queue.get()
+            await websocket.send_text(event.as_json())
+
+    sender = asyncio.create_task(pump())
+    try:
+        # Incoming messages are ignored; receiving is how a disconnect is noticed.
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        market_stream.unsubscribe(subscription)
@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+
+from app.llm import llm_flights
+from app.services.alert_engine import alert_engine
+from app.services.claude_engine import chat_stream_timings, coaching_cache, commentary_stats, explanation_cache, llm_cache_usage
+from app.services.correlation_service import correlation_service
+from app.services.market_intelligence import ohlcv_cache
+from app.services.market_stream import market_stream
+from app.services.indicator_series import series_cache
+from app.services.news_service import news_service
+
+router = APIRouter()
+
+
+@router.get("")
+def get_metrics():
+    """Expose in-process cache counters (hits, misses, coalesced fetches, evictions)."""
+    return {
+        "market_cache": ohlcv_cache.stats(),
+        "market_stream": market_stream.stats(),
+        "series_cache": series_cache.stats(),
+        "news_cache": news_service.cache.stats(),
+        "correlations": correlation_service.stats(),
+        "alerts": alert_engine.stats(),
+        "chat_stream": chat_stream_timings.stats(),
+        "llm_cache": {
+            "market_explanation": explanation_cache.stats(),
+            "coaching_message": coaching_cache.stats(),
+            "by_endpoint": llm_cache_usage.stats(),
+        },
+        "market_commentary": dict(commentary_stats),
+        "llm_single_flight": llm_flights.stats(),
+    }
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1 import market, behavior, content, chat, insight, auth, history
+from app.api.v1 import market, behavior, content, chat, insight, auth, history, metrics, alerts
 
 api_router = APIRouter()
 
@@ -11,3 +11,5 @@ api_router.include_router(behavior.router, prefix="/behavior", tags=["behavior"]
 api_router.include_router(content.router, prefix="/content", tags=["content"])
 api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
 api_router.include_router(insight.router, prefix="/insight", tags=["insight"])
+api_router.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
@@ -16,5 +16,38 @@ class Settings:
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "dev-secret-change-in-production")
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRY_HOURS: int = 24
+    MARKET_HISTORY_PERIOD: str = os.getenv("MARKET_HISTORY_PERIOD", "5d")
+    MARKET_WATCHLIST: list = json.loads(os.getenv("MARKET_WATCHLIST", '["EURUSD=X"]'))
+    MARKET_POLL_INTERVAL: str = os.getenv("MARKET_POLL_INTERVAL", "5m")
+    MARKET_POLL_DELAY_SECONDS: float = float(os.getenv("MARKET_POLL_DELAY_SECONDS", "5"))
+    MARKET_POLL_IDLE_SECONDS: float = float(os.getenv("MARKET_POLL_IDLE_SECONDS", "1800"))
+    MARKET_POLL_CONCURRENCY: int = int(os.getenv("MARKET_POLL_CONCURRENCY", "8"))
+    MARKET_STREAM_POLL_SECONDS: float = float(os.getenv("MARKET_STREAM_POLL_SECONDS", "30"))
+    MARKET_STREAM_BUFFER: int = int(os.getenv("MARKET_STREAM_BUFFER", "16"))
+    MARKET_STREAM_KEEPALIVE_SECONDS: float = float(os.getenv("MARKET_STREAM_KEEPALIVE_SECONDS", "15"))
+    MARKET_DATA_SOURCE: str = os.getenv("MARKET_DATA_SOURCE", "yfinance")
+    SYNTHETIC_SEED: int = int(os.getenv("SYNTHETIC_SEED", "0"))
+    CANDLE_STORE_DIR: str = os.getenv("CANDLE_STORE_DIR", "")
+    SPIKE_UNIVERSE: list = json.loads(os.getenv("SPIKE_UNIVERSE", "[]")) or MARKET_WATCHLIST
+    SPIKE_Z_THRESHOLD: float = float(os.getenv("SPIKE_Z_THRESHOLD", "3.0"))
+    SPIKE_SCAN_CHUNK_SIZE: int = int(os.getenv("SPIKE_SCAN_CHUNK_SIZE", "200"))
+    CORRELATION_WINDOW: int = int(os.getenv("CORRELATION_WINDOW", "288"))
+    CORRELATION_MAX_SYMBOLS: int = int(os.getenv("CORRELATION_MAX_SYMBOLS", "256"))
+    CORRELATION_TOP_K: int = int(os.getenv("CORRELATION_TOP_K", "5"))
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    LLM_KEEPALIVE_SECONDS: float = float(os.getenv("LLM_KEEPALIVE_SECONDS", "60"))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+    CHAT_TOOL_TIMEOUT_SECONDS: float = float(os.getenv("CHAT_TOOL_TIMEOUT_SECONDS", "15"))
+    CHAT_TOOL_WORKERS: int = int(os.getenv("CHAT_TOOL_WORKERS", "8"))
+    CONTENT_MAX_CONCURRENCY: int = int(os.getenv("CONTENT_MAX_CONCURRENCY", "4"))
+    LLM_CACHE_TTL_SECONDS: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", "300"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+    ALERT_QUEUE_SIZE: int = int(os.getenv("ALERT_QUEUE_SIZE", "10000"))
+    NEWS_CACHE_TTL_SECONDS: float = float(os.getenv("NEWS_CACHE_TTL_SECONDS", "300"))
+    NEWS_DEADLINE_SECONDS: float = float(os.getenv("NEWS_DEADLINE_SECONDS", "2.0"))
+    MARKET_CACHE_TTL_SECONDS: float = float(os.getenv("MARKET_CACHE_TTL_SECONDS", "60"))
+    MARKET_CACHE_MAX_ENTRIES: int = int(os.getenv("MARKET_CACHE_MAX_ENTRIES", "256"))
+    MARKET_CACHE_MAX_BYTES: int = int(os.getenv("MARKET_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
 
 # settings = Settings()
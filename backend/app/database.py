@@ -56,6 +56,47 @@ async def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users(id)
         );
+
+        CREATE TABLE IF NOT EXISTS spike_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            candle_time TIMESTAMP NOT NULL,
+            direction TEXT NOT NULL,
+            change_pct REAL NOT NULL,
+            z_score REAL NOT NULL,
+            detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (symbol, candle_time)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_spike_events_symbol_id ON spike_events (symbol, id);
+        CREATE INDEX IF NOT EXISTS idx_spike_events_candle_time ON spike_events (candle_time);
+
+        CREATE TABLE IF NOT EXISTS alert_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            symbol TEXT NOT NULL,
+            indicator TEXT NOT NULL,
+            operator TEXT NOT NULL,
+            threshold REAL NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        );
+
+        CREATE TABLE IF NOT EXISTS alert_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            rule_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            symbol TEXT NOT NULL,
+            indicator TEXT NOT NULL,
+            operator TEXT NOT NULL,
+            threshold REAL NOT NULL,
+            value REAL NOT NULL,
+            triggered_at TIMESTAMP NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_alert_rules_user_id ON alert_rules (user_id);
+        CREATE INDEX IF NOT EXISTS idx_alert_events_user_id ON alert_events (user_id, id);
     """)
     await _db.commit()
 
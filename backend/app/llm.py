@@ -0,0 +1,62 @@
+import hashlib
+from importlib.util import find_spec
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.config import Settings
+from app.services.single_flight import SingleFlight
+
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]").
+HTTP2_ENABLED = find_spec("h2") is not None
+
+_client: AsyncOpenAI | None = None
+
+# Identical prompts in flight at the same time (e.g. everyone opening the dashboard
+# on a spike) share one upstream completion.
+llm_flights = SingleFlight()
+
+
+def prompt_key(model: str, prompt: str, max_tokens: int, *extra: str) -> tuple:
+    """Single-flight key for a one-shot completion: (model, prompt hash, max_tokens)."""
+    digest = hashlib.blake2b("\n".join((prompt, *extra)).encode("utf-8"), digest_size=16).hexdigest()
+    return (model, digest, max_tokens)
+
+
+def create_llm_client() -> AsyncOpenAI | None:
+    """A new `AsyncOpenAI` client on a tuned keep-alive pool, or None without an API key."""
+    settings = Settings()
+    if not settings.OPENAI_API_KEY:
+        return None
+    http_client = httpx.AsyncClient(
+        http2=HTTP2_ENABLED,
+        limits=httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_SECONDS,
+        ),
+        timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=10.0),
+    )
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.MODEL_BASE_URL or None,
+        http_client=http_client,
+    )
+
+
+async def init_llm():
+    global _client
+    if _client is None:
+        _client = create_llm_client()
+
+
+async def close_llm():
+    global _client
+    if _client:
+        await _client.close()
+        _client = None
+
+
+def get_llm_client() -> AsyncOpenAI | None:
+    """The process-wide client, or None when no API key is configured (callers fall back)."""
+    return _client
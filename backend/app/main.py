@@ -1,10 +1,17 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import Settings
 from app.api.v1.router import api_router
-from app.services.claude_engine import AIEngine
 from app.database import init_db, close_db
+from app.llm import HTTP2_ENABLED, init_llm, close_llm, get_llm_client
+from app.services.market_intelligence import MarketDataUnavailable
+from app.services.market_poller import market_poller
+from app.services.spike_scanner import spike_scanner
+from app.services.alert_engine import alert_engine
 
 settings = Settings()
 
@@ -22,26 +29,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(MarketDataUnavailable)
+async def market_data_unavailable_handler(request: Request, exc: MarketDataUnavailable):
+    """Failed market fetches surface as 503 rather than as fabricated data."""
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database and log API configuration on startup."""
+    """Initialize database and LLM client, start the market poller, spike scanner and alert engine, and log API configuration on startup."""
     await init_db()
+    await init_llm()
+    await asyncio.to_thread(market_poller.warm_start)
+    await market_poller.start()
+    await spike_scanner.start()
+    await alert_engine.start()
     print("\n" + "="*60)
     print("🚀 MarketMind API Startup")
     print("="*60)
-    claude_engine = AIEngine()
-    if claude_engine.client:
-        print(f"✓ AI Service: READY (Model: {claude_engine.model})")
+    if get_llm_client():
+        print(f"✓ AI Service: READY (Model: {settings.MODEL}, HTTP/2: {'on' if HTTP2_ENABLED else 'off'})")
     else:
         print(f"⚠ AI Service: OFFLINE - Using fallback responses")
         print(f"  → Set OPENAI_API_KEY environment variable to enable AI")
     print(f"✓ Database: READY")
+    print(f"✓ Market Poller: RUNNING ({market_poller.interval}, watchlist: {', '.join(market_poller.symbols) or 'empty'})")
+    print(f"✓ Alert Engine: RUNNING ({len(alert_engine.index)} rules)")
+    print(f"✓ Spike Scanner: {'RUNNING' if spike_scanner.universe else 'IDLE'} ({len(spike_scanner.universe)} symbols, z >= {spike_scanner.z_threshold})")
     print("="*60 + "\n")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Close database connection on shutdown."""
+    """Stop the market poller, spike scanner and alert engine, and close the LLM client and database connection on shutdown."""
+    await alert_engine.stop()
+    await spike_scanner.stop()
+    await market_poller.stop()
+    await close_llm()
     await close_db()
 
 app.include_router(api_router, prefix="/api/v1")
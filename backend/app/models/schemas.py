@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -48,6 +48,17 @@ class MarketIndicators(BaseModel):
     atr: float
     volume_ratio: float
     price_change_pct: float
+    ema_fast: Optional[float] = None
+    ema_slow: Optional[float] = None
+    macd: Optional[float] = None
+    macd_signal: Optional[float] = None
+    macd_histogram: Optional[float] = None
+    bollinger_upper: Optional[float] = None
+    bollinger_middle: Optional[float] = None
+    bollinger_lower: Optional[float] = None
+    vwap: Optional[float] = None
+    stoch_k: Optional[float] = None
+    stoch_d: Optional[float] = None
 
 
 class MarketData(BaseModel):
@@ -60,12 +71,132 @@ class MarketData(BaseModel):
     spike_direction: Optional[str] = None  # "up" or "down"
     timestamp: datetime
 
+
+class BatchIndicatorItem(BaseModel):
+    symbol: str
+    price: float
+    change_pct: float
+    indicators: MarketIndicators
+    is_spike: bool
+
+
+class BatchIndicatorsResponse(BaseModel):
+    count: int
+    results: list[BatchIndicatorItem]
+    unavailable: list[str] = Field(default_factory=list)  # requested symbols with no market data
+    timestamp: datetime
+
+
+class ScenarioSpec(BaseModel):
+    """What-if shocks applied to the last `candles` candles of a series."""
+    name: str = "scenario"
+    move_pct: float = Field(default=0.0, gt=-100, description="Total close-to-close move spread across the candles")
+    vol_multiplier: float = Field(default=1.0, gt=0, description="Scales returns and wicks inside the window")
+    volume_multiplier: float = Field(default=1.0, ge=0)
+    gap_pct: float = Field(default=0.0, gt=-100, description="Gap at the open of the first shocked candle")
+    candles: int = Field(default=1, ge=1, le=20)
+
+
+class ScenarioRequest(BaseModel):
+    symbol: str = "EURUSD=X"
+    interval: Optional[str] = None
+    scenarios: list[ScenarioSpec] = Field(default_factory=list, max_length=50)
+
+
+class ScenarioResult(BaseModel):
+    scenario: ScenarioSpec
+    market: MarketData
+
+
+class ScenariosResponse(BaseModel):
+    symbol: str
+    base: MarketData
+    results: list[ScenarioResult]
+    timestamp: datetime
+
+
+class SpikeEvent(BaseModel):
+    id: Optional[int] = None
+    symbol: str
+    candle_time: datetime
+    direction: str  # "up" or "down"
+    change_pct: float
+    z_score: float
+    detected_at: Optional[datetime] = None
+
+
+class SpikeFeedResponse(BaseModel):
+    events: list[SpikeEvent]
+    next_before_id: Optional[int] = None
+
+
+class CorrelationPeer(BaseModel):
+    symbol: str
+    correlation: float
+
+
+class CorrelationsResponse(BaseModel):
+    interval: str
+    window: int
+    observations: int  # candles currently in the rolling window
+    symbols: list[str]
+    matrix: list[list[float]]  # row/column order follows `symbols`
+    updated_at: Optional[datetime] = None
+
+
+class CorrelationPeersResponse(BaseModel):
+    symbol: str
+    interval: str
+    peers: list[CorrelationPeer]
+
+
+class AlertRuleCreate(BaseModel):
+    """Fires when `indicator` crosses `threshold` in the direction of `operator`."""
+    symbol: Optional[str] = None  # None: every symbol
+    indicator: str
+    operator: str = Field(pattern="^(<|>)$")
+    threshold: float
+
+
+class AlertRule(BaseModel):
+    id: int
+    user_id: int
+    symbol: str  # "*" for every symbol
+    indicator: str
+    operator: str
+    threshold: float
+    created_at: Optional[datetime] = None
+
+
+class AlertEvent(BaseModel):
+    id: Optional[int] = None
+    rule_id: int
+    user_id: int
+    symbol: str
+    indicator: str
+    operator: str
+    threshold: float
+    value: float
+    triggered_at: datetime
+
+
+class AlertEventsResponse(BaseModel):
+    events: list[AlertEvent]
+    next_before_id: Optional[int] = None
+
+
 class MarketResponse(BaseModel):
     market_data: MarketData
     explanation: str
     coaching_message: Optional[str] = None
 
 
+class MarketCommentary(BaseModel):
+    """Structured output of the fused explanation + coaching completion."""
+    explanation: str = Field(min_length=1)
+    coaching_message: str = Field(min_length=1)
+
+
 class NewsItem(BaseModel):
     title: str
     link: Optional[str] = None
@@ -126,6 +257,31 @@ class ContentResponse(BaseModel):
     char_count: int
 
 
+class ContentBatchRequest(BaseModel):
+    market_context: str
+    behavior_context: Optional[str] = None
+    coaching_insight: Optional[str] = None
+    personas: list[Persona] = Field(default_factory=lambda: list(Persona))
+    platforms: list[Platform] = Field(default_factory=lambda: list(Platform))
+    # Ask for every variant in one structured completion instead of one call each
+    single_prompt: bool = False
+
+
+class ContentBatchResponse(BaseModel):
+    results: list[ContentResponse]
+
+
+class ContentVariant(BaseModel):
+    persona: Persona
+    platform: Platform
+    content: str = Field(min_length=1)
+
+
+class ContentVariants(BaseModel):
+    """Structured output of the single-prompt batch completion."""
+    variants: list[ContentVariant]
+
+
 class ChatMessage(BaseModel):
     role: str  # "user" | "assistant" | "system"
     content: str
@@ -0,0 +1,324 @@
+import asyncio
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from app.config import Settings
+from app.database import get_db
+from app.models.schemas import AlertEvent, AlertEventsResponse, AlertRule, MarketIndicators
+from app.services.market_poller import MarketSnapshot, market_poller
+
+settings = Settings()
+
+# Rules without a symbol apply to every symbol.
+ANY_SYMBOL = "*"
+ALERT_INDICATORS = ("price", "change_pct", *MarketIndicators.model_fields)
+
+
+def market_values(snapshot: MarketSnapshot) -> dict[str, Optional[float]]:
+    """Every alertable value of a snapshot, keyed by indicator name."""
+    market = snapshot.market_data
+    values = market.indicators.model_dump()
+    values["price"] = market.current_price
+    values["change_pct"] = market.change_pct
+    return values
+
+
+class _Rule(NamedTuple):
+    """Compact in-memory copy of an `alert_rules` row."""
+    id: int
+    user_id: int
+    symbol: str
+    indicator: str
+    operator: str
+    threshold: float
+
+
+@dataclass
+class _Thresholds:
+    """Rules of one direction for one (symbol, indicator), sorted by threshold."""
+    thresholds: list[float] = field(default_factory=list)
+    rule_ids: list[int] = field(default_factory=list)
+
+    def add(self, threshold: float, rule_id: int) -> None:
+        pos = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(pos, threshold)
+        self.rule_ids.insert(pos, rule_id)
+
+    def remove(self, threshold: float, rule_id: int) -> None:
+        lo = bisect_left(self.thresholds, threshold)
+        hi = bisect_right(self.thresholds, threshold)
+        pos = self.rule_ids.index(rule_id, lo, hi)
+        del self.thresholds[pos]
+        del self.rule_ids[pos]
+
+
+@dataclass
+class _Bucket:
+    above: _Thresholds = field(default_factory=_Thresholds)  # ">" rules
+    below: _Thresholds = field(default_factory=_Thresholds)  # "<" rules
+
+    def __len__(self) -> int:
+        return len(self.above.rule_ids) + len(self.below.rule_ids)
+
+
+class AlertIndex:
+    """In-memory index of alert rules by (symbol, indicator) with sorted thresholds.
+
+    A rule fires when the indicator crosses its threshold: ">" rules when the value
+    rises from at or below the threshold to above it, "<" rules when it falls from
+    at or above to below. For a move from `old` to `new`, the crossed rules are one
+    contiguous slice of the sorted thresholds, located with two bisects, so the
+    cost of an update is O(log R) plus the number of rules that actually fire.
+    """
+
+    def __init__(self):
+        self.rules: dict[int, _Rule] = {}
+        self._buckets: dict[tuple[str, str], _Bucket] = {}
+        self._indicators: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def add(self, rule: _Rule) -> None:
+        key = (rule.symbol, rule.indicator)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket()
+            self._indicators.setdefault(rule.symbol, set()).add(rule.indicator)
+        side = bucket.above if rule.operator == ">" else bucket.below
+        side.add(rule.threshold, rule.id)
+        self.rules[rule.id] = rule
+
+    def load(self, rules: list[_Rule]) -> None:
+        """Replace the index with `rules`, sorting each bucket once."""
+        grouped: dict[tuple[str, str, str], list[tuple[float, int]]] = {}
+        for rule in rules:
+            grouped.setdefault((rule.symbol, rule.indicator, rule.operator), []).append((rule.threshold, rule.id))
+        self.rules = {rule.id: rule for rule in rules}
+        self._buckets = {}
+        self._indicators = {}
+        for (symbol, indicator, operator), entries in grouped.items():
+            entries.sort()
+            bucket = self._buckets.setdefault((symbol, indicator), _Bucket())
+            self._indicators.setdefault(symbol, set()).add(indicator)
+            side = bucket.above if operator == ">" else bucket.below
+            side.thresholds = [t for t, _ in entries]
+            side.rule_ids = [i for _, i in entries]
+
+    def remove(self, rule_id: int) -> Optional[_Rule]:
+        rule = self.rules.pop(rule_id, None)
+        if rule is None:
+            return None
+        key = (rule.symbol, rule.indicator)
+        bucket = self._buckets[key]
+        (bucket.above if rule.operator == ">" else bucket.below).remove(rule.threshold, rule.id)
+        if not bucket:
+            del self._buckets[key]
+            indicators = self._indicators[rule.symbol]
+            indicators.discard(rule.indicator)
+            if not indicators:
+                del self._indicators[rule.symbol]
+        return rule
+
+    def has_symbol(self, symbol: str) -> bool:
+        return symbol in self._indicators
+
+    def indicators(self, symbol: str) -> set[str]:
+        """Indicators with rules that apply to `symbol` (including symbol-less rules)."""
+        return self._indicators.get(symbol, set()) | self._indicators.get(ANY_SYMBOL, set())
+
+    def crossed(self, symbol: str, indicator: str, old: float, new: float) -> list[int]:
+        """Ids of rules for `symbol`/`indicator` whose threshold lies between `old` and `new`."""
+        fired: list[int] = []
+        for key in ((symbol, indicator), (ANY_SYMBOL, indicator)):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            if new > old:
+                # ">" rules with old <= threshold < new
+                side = bucket.above
+                lo, hi = bisect_left(side.thresholds, old), bisect_left(side.thresholds, new)
+            elif new < old:
+                # "<" rules with new < threshold <= old
+                side = bucket.below
+                lo, hi = bisect_right(side.thresholds, new), bisect_right(side.thresholds, old)
+            else:
+                continue
+            fired.extend(side.rule_ids[lo:hi])
+        return fired
+
+
+class AlertEngine:
+    """Evaluates stored alert rules against every snapshot the market poller publishes.
+
+    Rules live in SQLite and are mirrored in an `AlertIndex`. The last value of each
+    (symbol, indicator) is remembered so only rules crossed since the previous
+    snapshot fire; the first value seen for a symbol only sets the baseline.
+    Firings are put on a bounded queue, and a background task persists them in
+    batches as alert events. Symbols with rules are retained by the poller so they
+    are refreshed between candle boundaries.
+    """
+
+    def __init__(self, queue_size: int = 10_000):
+        self.index = AlertIndex()
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._lock = threading.Lock()
+        self._last_values: dict[str, dict[str, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+        self.dropped = 0
+
+    async def load(self) -> None:
+        db = get_db()
+        cursor = await db.execute("SELECT id, user_id, symbol, indicator, operator, threshold FROM alert_rules")
+        rules = [_Rule(*r) for r in await cursor.fetchall()]
+        with self._lock:
+            self.index.load(rules)
+        for symbol in {r.symbol for r in rules} - {ANY_SYMBOL}:
+            market_poller.retain(symbol)
+
+    async def add_rule(self, user_id: int, symbol: Optional[str], indicator: str, operator: str, threshold: float) -> AlertRule:
+        db = get_db()
+        cursor = await db.execute(
+            "INSERT INTO alert_rules (user_id, symbol, indicator, operator, threshold) VALUES (?, ?, ?, ?, ?)",
+            (user_id, symbol or ANY_SYMBOL, indicator, operator, threshold),
+        )
+        await db.commit()
+        cursor = await db.execute(
+            "SELECT id, user_id, symbol, indicator, operator, threshold, created_at FROM alert_rules WHERE id = ?",
+            (cursor.lastrowid,),
+        )
+        rule = AlertRule(**dict(await cursor.fetchone()))
+        with self._lock:
+            new_symbol = not self.index.has_symbol(rule.symbol)
+            self.index.add(_Rule(rule.id, rule.user_id, rule.symbol, rule.indicator, rule.operator, rule.threshold))
+        if new_symbol and rule.symbol != ANY_SYMBOL:
+            market_poller.retain(rule.symbol)
+        return rule
+
+    async def remove_rule(self, user_id: int, rule_id: int) -> bool:
+        with self._lock:
+            rule = self.index.rules.get(rule_id)
+            if rule is None or rule.user_id != user_id:
+                return False
+            self.index.remove(rule_id)
+            released = not self.index.has_symbol(rule.symbol)
+        if released and rule.symbol != ANY_SYMBOL:
+            market_poller.release(rule.symbol)
+        db = get_db()
+        await db.execute("DELETE FROM alert_rules WHERE id = ?", (rule_id,))
+        await db.commit()
+        return True
+
+    async def list_rules(self, user_id: int) -> list[AlertRule]:
+        db = get_db()
+        cursor = await db.execute(
+            "SELECT id, user_id, symbol, indicator, operator, threshold, created_at FROM alert_rules WHERE user_id = ? ORDER BY id",
+            (user_id,),
+        )
+        return [AlertRule(**dict(r)) for r in await cursor.fetchall()]
+
+    def evaluate(self, symbol: str, values: dict[str, Optional[float]]) -> list[AlertEvent]:
+        """Rules crossed by moving `symbol` to `values` since its previous evaluation."""
+        now = datetime.now()
+        events: list[AlertEvent] = []
+        with self._lock:
+            last = self._last_values.setdefault(symbol, {})
+            for indicator in self.index.indicators(symbol):
+                new = values.get(indicator)
+                if new is None:
+                    continue
+                old = last.get(indicator)
+                last[indicator] = new
+                if old is None:
+                    continue
+                for rule_id in self.index.crossed(symbol, indicator, old, new):
+                    rule = self.index.rules[rule_id]
+                    events.append(AlertEvent(
+                        rule_id=rule.id,
+                        user_id=rule.user_id,
+                        symbol=symbol,
+                        indicator=indicator,
+                        operator=rule.operator,
+                        threshold=rule.threshold,
+                        value=new,
+                        triggered_at=now,
+                    ))
+        return events
+
+    def on_snapshot(self, snapshot: MarketSnapshot) -> None:
+        """Poller listener: queue the firings caused by a new snapshot."""
+        if not (self.index.has_symbol(snapshot.symbol) or self.index.has_symbol(ANY_SYMBOL)):
+            return
+        for event in self.evaluate(snapshot.symbol, market_values(snapshot)):
+            self.fired += 1
+            if self._queue is None or self._queue.full():
+                self.dropped += 1
+                continue
+            self._queue.put_nowait(event)
+
+    async def _drain(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty() and len(batch) < 500:
+                batch.append(self._queue.get_nowait())
+            try:
+                db = get_db()
+                await db.executemany(
+                    "INSERT INTO alert_events (rule_id, user_id, symbol, indicator, operator, threshold, value, triggered_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(e.rule_id, e.user_id, e.symbol, e.indicator, e.operator, e.threshold, e.value, e.triggered_at.isoformat()) for e in batch],
+                )
+                await db.commit()
+            except Exception as e:
+                print(f"Alert engine failed to record {len(batch)} events: {e}")
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.load()
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._task = asyncio.create_task(self._drain())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._queue = None
+
+    def stats(self) -> dict:
+        return {
+            "rules": len(self.index),
+            "fired": self.fired,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+async def list_alert_events(user_id: int, limit: int = 50, before_id: Optional[int] = None) -> AlertEventsResponse:
+    """Newest-first page of a user's alert events; pass `next_before_id` back to get the next page."""
+    clauses, params = ["user_id = ?"], [user_id]
+    if before_id is not None:
+        clauses.append("id < ?")
+        params.append(before_id)
+
+    db = get_db()
+    cursor = await db.execute(
+        f"SELECT id, rule_id, user_id, symbol, indicator, operator, threshold, value, triggered_at FROM alert_events WHERE {' AND '.join(clauses)} ORDER BY id DESC LIMIT ?",
+        (*params, limit),
+    )
+    rows = await cursor.fetchall()
+    events = [AlertEvent(**dict(r)) for r in rows]
+    next_before_id = events[-1].id if len(events) == limit else None
+    return AlertEventsResponse(events=events, next_before_id=next_before_id)
+
+
+alert_engine = AlertEngine(queue_size=settings.ALERT_QUEUE_SIZE)
+market_poller.add_listener(alert_engine.on_snapshot)
+
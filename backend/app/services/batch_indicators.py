@@ -0,0 +1,101 @@
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.models.schemas import BatchIndicatorItem, BatchIndicatorsResponse, MarketIndicators
+from app.services.indicator_engine import MIN_CANDLES, VOLUME_PERIOD, default_indicators, extended_indicators
+from app.services.indicator_kernels import window_indicators
+from app.services.market_intelligence import fetch_market_data_bulk
+
+# Enough trailing candles for every window plus the previous close.
+WINDOW = VOLUME_PERIOD + 1
+
+
+def align_latest(
+    frames: dict[str, pd.DataFrame],
+    symbols: list[str],
+    window: int = WINDOW,
+    before: Optional[pd.Timestamp] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Right-align each symbol's trailing candles into (symbols x window) OHLCV arrays.
+
+    Symbols missing from `frames` get an all-NaN row. With `before`, candles at or
+    after that time are ignored (e.g. to look only at closed candles). Returns
+    (high, low, close, volume, enough_history, last_ts), with the OHLCV arrays padded
+    on the left with NaN and `last_ts` holding each row's latest candle in UTC ns
+    (0 when the row is empty).
+    """
+    shape = (len(symbols), window)
+    high = np.full(shape, np.nan)
+    low = np.full(shape, np.nan)
+    close = np.full(shape, np.nan)
+    volume = np.full(shape, np.nan)
+    enough_history = np.zeros(len(symbols), dtype=bool)
+    last_ts = np.zeros(len(symbols), dtype=np.int64)
+
+    for row, symbol in enumerate(symbols):
+        df = frames.get(symbol)
+        if df is None:
+            continue
+        if before is not None and len(df):
+            df = df[df.index < before]
+        tail = df[["High", "Low", "Close", "Volume"]].tail(window).to_numpy(dtype=np.float64)
+        n = len(tail)
+        if n == 0:
+            continue
+        high[row, window - n:] = tail[:, 0]
+        low[row, window - n:] = tail[:, 1]
+        close[row, window - n:] = tail[:, 2]
+        volume[row, window - n:] = tail[:, 3]
+        enough_history[row] = len(df) >= MIN_CANDLES
+        last_ts[row] = df.index[-1].value
+
+    return high, low, close, volume, enough_history, last_ts
+
+
+class BatchIndicatorService:
+    def __init__(self, spike_threshold_pct: float = 1.5):
+        self.spike_threshold_pct = spike_threshold_pct
+
+    def get_batch(self, symbols: list[str], period: Optional[str] = None, interval: Optional[str] = None) -> BatchIndicatorsResponse:
+        """Compute indicators for many symbols with one bulk fetch and one set of array ops.
+
+        The extended indicators (EMA/MACD/Bollinger/VWAP/Stochastics) depend on the
+        whole history, so they are folded per symbol with `FusedState.from_arrays`.
+        Symbols with no market data are left out of `results` and listed in `unavailable`.
+        """
+        frames = fetch_market_data_bulk(symbols, period=period, interval=interval)
+
+        high, low, close, volume, enough_history, _ = align_latest(frames, symbols)
+
+        values = window_indicators(high, low, close, volume)
+        change_pct = np.nan_to_num(values["price_change_pct"])
+        is_spike = np.abs(change_pct) >= self.spike_threshold_pct
+
+        results = []
+        unavailable = []
+        for row, symbol in enumerate(symbols):
+            if symbol not in frames:
+                unavailable.append(symbol)
+                continue
+            if enough_history[row] and not np.isnan(values["atr"][row]):
+                indicators = MarketIndicators(
+                    rsi=round(float(values["rsi"][row]), 2),
+                    atr=round(float(values["atr"][row]), 5),
+                    volume_ratio=round(float(values["volume_ratio"][row]), 2),
+                    price_change_pct=round(float(change_pct[row]), 2),
+                    **extended_indicators(frames[symbol]),
+                )
+            else:
+                indicators = default_indicators()
+            results.append(BatchIndicatorItem(
+                symbol=symbol.replace("=X", ""),
+                price=round(float(np.nan_to_num(close[row, -1])), 5),
+                change_pct=round(float(change_pct[row]), 2),
+                indicators=indicators,
+                is_spike=bool(is_spike[row]),
+            ))
+
+        return BatchIndicatorsResponse(count=len(results), results=results, unavailable=unavailable, timestamp=datetime.now())
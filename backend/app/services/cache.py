@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Optional
+
+
+class SharedCache:
+    """Process-wide TTL cache with LRU eviction and single-flight loading.
+
+    Entries are evicted least-recently-used first whenever either `max_entries` or
+    `max_bytes` (as measured by `sizeof`) is exceeded. Concurrent `get_or_load` calls
+    for the same missing key share one loader invocation; the other callers block on
+    its result and are counted as `coalesced`.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._lock = threading.Lock()
+        # key -> (value, expires_at, size)
+        self._entries: "OrderedDict[Hashable, tuple[Any, float, int]]" = OrderedDict()
+        self._inflight: dict[Hashable, Future] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _lookup(self, key: Hashable) -> tuple[bool, Any]:
+        """Return (found, value) for a live entry. Caller must hold the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        value, expires_at, size = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self._bytes -= size
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        """Insert an entry and evict until within limits. Caller must hold the lock."""
+        size = int(self._sizeof(value))
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds, size)
+        self._bytes += size
+
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1)
+        ):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for `key`, or None when missing or expired."""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, calling `loader` at most once across threads.
+
+        Exceptions raised by the loader are propagated to every waiting caller and
+        nothing is cached, so the next request retries.
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            future = self._inflight.get(key)
+            if future is None:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+                is_leader = True
+            else:
+                self.coalesced += 1
+                is_leader = False
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._store(key, value)
+        future.set_result(value)
+        return value
+
+    def get_or_load_many(
+        self,
+        keys: list[Hashable],
+        loader: Callable[[list[Hashable]], dict[Hashable, Any]],
+    ) -> dict[Hashable, Any]:
+        """Bulk `get_or_load`: one `loader(missing_keys)` call for every key not cached or in flight.
+
+        Keys already being loaded (by `get_or_load` or another bulk call) are waited on
+        instead of requested again. Keys the loader leaves out of its result, or whose
+        shared load failed, are missing from the returned dict and not cached. An
+        exception raised by this call's loader fails its keys for every waiter and is
+        propagated.
+        """
+        found: dict[Hashable, Any] = {}
+        owned: dict[Hashable, Future] = {}
+        waiting: dict[Hashable, Future] = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                hit, value = self._lookup(key)
+                if hit:
+                    self.hits += 1
+                    found[key] = value
+                elif key in self._inflight:
+                    self.coalesced += 1
+                    waiting[key] = self._inflight[key]
+                else:
+                    self.misses += 1
+                    owned[key] = self._inflight[key] = Future()
+
+        # Load our own keys before waiting on anyone else's, so two overlapping bulk
+        # calls can't end up waiting on each other.
+        if owned:
+            try:
+                loaded = loader(list(owned))
+            except BaseException as e:
+                with self._lock:
+                    for key in owned:
+                        self._inflight.pop(key, None)
+                for future in owned.values():
+                    future.set_exception(e)
+                raise
+
+            with self._lock:
+                for key in owned:
+                    self._inflight.pop(key, None)
+                    if key in loaded:
+                        self._store(key, loaded[key])
+            for key, future in owned.items():
+                if key in loaded:
+                    found[key] = loaded[key]
+                    future.set_result(loaded[key])
+                else:
+                    future.set_exception(LookupError(f"No value loaded for {key!r}"))
+
+        for key, future in waiting.items():
+            try:
+                found[key] = future.result()
+            except Exception:
+                pass
+        return found
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "in_flight": len(self._inflight),
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            }
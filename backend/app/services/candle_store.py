@@ -0,0 +1,174 @@
+import json
+import re
+import threading
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config import Settings
+
+settings = Settings()
+
+COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+_TS_FILE = "ts.i8"
+
+INTERVAL_SECONDS = {
+    "1m": 60,
+    "2m": 120,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "60m": 3600,
+    "1h": 3600,
+    "90m": 5400,
+    "4h": 14400,
+    "1d": 86400,
+}
+
+
+def period_to_timedelta(period: str) -> Optional[timedelta]:
+    """Translate a yfinance period string ("5d", "1mo", "1y", ...) into a timedelta.
+
+    Returns None for "max" or anything unrecognised, meaning "no lower bound".
+    """
+    match = re.fullmatch(r"(\d+)(m|h|d|wk|mo|y)", period.strip())
+    if not match:
+        return None
+    value, unit = int(match.group(1)), match.group(2)
+    days = {"d": 1, "wk": 7, "mo": 30, "y": 365}
+    if unit == "m":
+        return timedelta(minutes=value)
+    if unit == "h":
+        return timedelta(hours=value)
+    return timedelta(days=value * days[unit])
+
+
+class CandleStore:
+    """Append-only, per-(symbol, interval) columnar candle files on local disk.
+
+    Each series is a directory of raw little-endian column files (`ts.i8` holding
+    UTC nanoseconds plus one float64 file per OHLCV column). Columns are appended
+    before the timestamp file, so a torn write is ignored on read by trimming every
+    column to the shortest length and trimmed off disk before the next append.
+    Reads memory-map the files, so range reads are zero-copy slices located by
+    binary search over the time index.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._locks: dict[tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _series_dir(self, symbol: str, interval: str) -> Path:
+        safe_symbol = re.sub(r"[^A-Za-z0-9._-]", "_", symbol)
+        return self.root / safe_symbol / interval
+
+    def _lock(self, symbol: str, interval: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+
+    @staticmethod
+    def _column_file(column: str) -> str:
+        return f"{column.lower()}.f8"
+
+    def _map(self, path: Path, dtype) -> np.ndarray:
+        if not path.exists() or path.stat().st_size == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    def _timezone(self, series_dir: Path) -> str:
+        try:
+            return json.loads((series_dir / "meta.json").read_text())["tz"]
+        except Exception:
+            return "UTC"
+
+    def read_arrays(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+    ) -> dict[str, np.ndarray]:
+        """Return zero-copy column slices (plus "ts" in UTC ns) for `start <= t <= end`."""
+        series_dir = self._series_dir(symbol, interval)
+        ts = self._map(series_dir / _TS_FILE, "<i8")
+        columns = {c: self._map(series_dir / self._column_file(c), "<f8") for c in COLUMNS}
+        n = min([len(ts)] + [len(a) for a in columns.values()])
+
+        lo, hi = 0, n
+        ts = ts[:n]
+        if start is not None:
+            lo = int(np.searchsorted(ts, pd.Timestamp(start).value, side="left"))
+        if end is not None:
+            hi = int(np.searchsorted(ts, pd.Timestamp(end).value, side="right"))
+
+        arrays = {c: a[lo:hi] for c, a in columns.items()}
+        arrays["ts"] = ts[lo:hi]
+        return arrays
+
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+    ) -> pd.DataFrame:
+        """Return stored candles as a DataFrame indexed in the series' original timezone."""
+        arrays = self.read_arrays(symbol, interval, start, end)
+        index = pd.DatetimeIndex(arrays.pop("ts"), tz="UTC")
+        tz = self._timezone(self._series_dir(symbol, interval))
+        return pd.DataFrame(arrays, index=index.tz_convert(tz), columns=list(COLUMNS))
+
+    def last_timestamp(self, symbol: str, interval: str) -> Optional[pd.Timestamp]:
+        ts = self.read_arrays(symbol, interval)["ts"]
+        if len(ts) == 0:
+            return None
+        return pd.Timestamp(int(ts[-1]), tz="UTC")
+
+    def append(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """Append candles newer than the last stored one; returns how many were written."""
+        if df.empty:
+            return 0
+
+        index = df.index
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        ts = index.tz_convert("UTC").as_unit("ns").asi8
+
+        with self._lock(symbol, interval):
+            series_dir = self._series_dir(symbol, interval)
+            series_dir.mkdir(parents=True, exist_ok=True)
+            stored = self.read_arrays(symbol, interval)["ts"]
+            mask = ts > stored[-1] if len(stored) else np.ones(len(ts), dtype=bool)
+            if not mask.any():
+                return 0
+
+            # Drop any column bytes left behind by an interrupted append.
+            committed = len(stored) * 8
+            for column in COLUMNS:
+                path = series_dir / self._column_file(column)
+                if path.exists() and path.stat().st_size > committed:
+                    with open(path, "r+b") as f:
+                        f.truncate(committed)
+
+            meta = series_dir / "meta.json"
+            if not meta.exists():
+                meta.write_text(json.dumps({"tz": str(df.index.tz or "UTC")}))
+
+            for column in COLUMNS:
+                values = df[column].to_numpy(dtype="<f8")[mask]
+                with open(series_dir / self._column_file(column), "ab") as f:
+                    f.write(values.tobytes())
+            with open(series_dir / _TS_FILE, "ab") as f:
+                f.write(ts[mask].astype("<i8").tobytes())
+
+            return int(mask.sum())
+
+
+candle_store = CandleStore(
+    Path(settings.CANDLE_STORE_DIR) if settings.CANDLE_STORE_DIR
+    else Path(__file__).parent.parent / "data" / "candles"
+)
@@ -1,40 +1,248 @@
-from typing import Optional
-from openai import OpenAI
+import asyncio
+import hashlib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Hashable, Optional
+from fastapi import Request
+from openai import AsyncOpenAI
 import json
 
 from app.config import Settings
-from app.models.schemas import MarketData, BehaviorResponse, ChatMessage, ChatRequest, ChatResponse, MarketWithNewsResponse
+from app.llm import get_llm_client, llm_flights, prompt_key
+from pydantic import ValidationError
+
+from app.models.schemas import MarketData, BehaviorResponse, ChatMessage, ChatRequest, ChatResponse, MarketCommentary, MarketWithNewsResponse
+from app.services.cache import SharedCache
 from app.services.market_intelligence import MarketIntelligenceService
+from app.services.market_poller import market_poller
 
+settings = Settings()
+
+# Generated text per quantized market context, so viewers of the same symbol within
+# a candle share one completion. Only real completions are cached, never fallbacks.
+explanation_cache = SharedCache(ttl_seconds=settings.LLM_CACHE_TTL_SECONDS, max_entries=settings.LLM_CACHE_MAX_ENTRIES)
+coaching_cache = SharedCache(ttl_seconds=settings.LLM_CACHE_TTL_SECONDS, max_entries=settings.LLM_CACHE_MAX_ENTRIES)
+
+
+class CacheUsage:
+    """Hit/miss counts of the LLM caches broken down by calling endpoint."""
 
-class AIEngine:
     def __init__(self):
-        settings = Settings()
-        self.client = None
-        if settings.OPENAI_API_KEY:
-            if settings.MODEL_BASE_URL:
-                self.client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.MODEL_BASE_URL)
-            else:
-                self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self._lock = threading.Lock()
+        self._counts: dict[tuple[str, str], list[int]] = {}
+
+    def record(self, endpoint: str, cache: str, hit: bool) -> None:
+        with self._lock:
+            counts = self._counts.setdefault((endpoint, cache), [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats: dict[str, dict] = {}
+            for (endpoint, cache), (hits, misses) in sorted(self._counts.items()):
+                stats.setdefault(endpoint, {})[cache] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / (hits + misses), 4),
+                }
+            return stats
+
+
+llm_cache_usage = CacheUsage()
+
+# Chat tool runs (blocking market/news fetches) get their own bounded pool, so a burst of
+# chats can neither block the event loop nor starve the default executor other routes use.
+_tool_executor = ThreadPoolExecutor(max_workers=settings.CHAT_TOOL_WORKERS, thread_name_prefix="chat-tool")
+
+
+# How /market commentary was produced: one fused completion, or the two-call fallback.
+commentary_stats = {"fused": 0, "fallback": 0}
+
+_COMMENTARY_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "market_commentary", "strict": True, "schema": {
+        "type": "object",
+        "properties": {"explanation": {"type": "string"}, "coaching_message": {"type": "string"}},
+        "required": ["explanation", "coaching_message"],
+        "additionalProperties": False,
+    }},
+}
+
+
+def _digest(parts: list[str]) -> str:
+    return hashlib.blake2b("\n".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def market_context_key(market_data: MarketWithNewsResponse) -> tuple:
+    """Cache key for prompts built from `market_data`, with indicators bucketed.
+
+    Contexts whose RSI falls in the same 5-point band, ATR agrees to two significant
+    digits, volume ratio to 0.25x and change to 0.1%, with the same spike direction
+    and headlines, produce the same key.
+    """
+    market = market_data.market
+    indicators = market.indicators
+    return (
+        market.symbol,
+        int(indicators.rsi // 5),
+        float(f"{indicators.atr:.2g}"),
+        round(indicators.volume_ratio * 4) / 4,
+        round(market.change_pct, 1),
+        market.spike_direction,
+        _digest(sorted(n.title for n in market_data.news)),
+    )
+
+
+class StreamTimings:
+    """Time to first token over the most recent chat streams."""
+
+    def __init__(self, window: int = 1000):
+        self.streams = 0
+        self._first_token: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.streams += 1
+        self._first_token.append(seconds)
+
+    def stats(self) -> dict:
+        ordered = sorted(self._first_token)
+        if not ordered:
+            return {"streams": self.streams, "first_token_ms_p50": None, "first_token_ms_p95": None}
+        return {
+            "streams": self.streams,
+            "first_token_ms_p50": round(ordered[len(ordered) // 2] * 1000, 1),
+            "first_token_ms_p95": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000, 1),
+        }
+
+
+chat_stream_timings = StreamTimings()
+
+
+def _tool_arguments(payload: dict) -> tuple[Optional[str], bool, int]:
+    """(symbol, simulate_drop, news_limit) requested for the market tool."""
+    return payload.get("symbol") or None, bool(payload.get("simulate_drop", False)), int(payload.get("news_limit", 3))
+
+
+# Formal function/tool description so the model can call the market tool via the
+# function-calling / tools interface if supported.
+CHAT_TOOLS = [
+    {
+        "type": "function",
+        "name": "get_market_with_news",
+        "description": "Return latest market data and recent news for a symbol.",
+        "function": {
+            "name": "get_market_with_news",
+            "description": "Return latest market data and recent news for a symbol.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "symbol": {
+                        "type": "string",
+                        "description": "Symbol or ticker, e.g. BTC/USD or AAPL",
+                    },
+                    "news_limit": {
+                        "type": "integer",
+                        "description": "Number of news items to return",
+                    },
+                    "simulate_drop": {
+                        "type": "boolean",
+                        "description": "If true, simulate a market drop in the returned data",
+                    },
+                },
+                "required": [],
+                "additionalProperties": False,
+            }
+        },
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "symbol": {
+                    "type": "string",
+                    "description": "Symbol or ticker, e.g. BTC/USD or AAPL",
+                },
+                "news_limit": {
+                    "type": "integer",
+                    "description": "Number of news items to return",
+                },
+                "simulate_drop": {
+                    "type": "boolean",
+                    "description": "If true, simulate a market drop in the returned data",
+                },
+            },
+            "required": [],
+            "additionalProperties": False,
+        },
+        "strict": True,
+    }
+]
+
+
+class AIEngine:
+    """LLM-backed explanations, coaching and chat on a shared `AsyncOpenAI` client.
+
+    Without a client every method returns a canned fallback response. `endpoint`
+    labels this engine's cache lookups in `llm_cache_usage`; `completions` counts
+    the completion requests this engine actually sent (cache hits and calls joined
+    through single-flight don't count).
+    """
+
+    def __init__(self, client: Optional[AsyncOpenAI] = None, endpoint: str = "internal"):
+        self.client = client
         self.model = settings.MODEL
+        self.endpoint = endpoint
+        self.completions = 0
 
-    def _call_llm(self, prompt: str, max_tokens: int = 200) -> str:
-        """Make a call to OpenAI API."""
+    async def _complete(self, prompt: str, max_tokens: int, response_format: Optional[dict] = None) -> Optional[str]:
+        """Make a call to OpenAI API; None if it is unavailable or fails."""
         if not self.client:
-            return self._get_fallback_response(prompt)
+            return None
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                max_completion_tokens=max_tokens,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"Error calling OpenAI API: {e}")
+        extra = {"response_format": response_format} if response_format else {}
+
+        async def complete() -> Optional[str]:
+            self.completions += 1
+            try:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    max_completion_tokens=max_tokens,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ],
+                    **extra,
+                )
+                return response.choices[0].message.content
+            except Exception as e:
+                print(f"Error calling OpenAI API: {e}")
+                return None
+
+        key = prompt_key(self.model, prompt, max_tokens, json.dumps(response_format, sort_keys=True) if response_format else "")
+        return await llm_flights.do(key, complete)
+
+    async def _call_llm(self, prompt: str, max_tokens: int = 200, cache: Optional[SharedCache] = None, key: Optional[Hashable] = None) -> str:
+        """Complete `prompt`, reusing a cached completion for `key` when one is given."""
+        if cache is not None:
+            key = (self.model, max_tokens, key)
+            cached = self._lookup(cache, key)
+            if cached is not None:
+                return cached
+        return await self._generate(prompt, max_tokens, cache, key)
+
+    def _lookup(self, cache: SharedCache, key: Hashable) -> Optional[str]:
+        cached = cache.get(key)
+        name = "market_explanation" if cache is explanation_cache else "coaching_message"
+        llm_cache_usage.record(self.endpoint, name, cached is not None)
+        return cached
+
+    async def _generate(self, prompt: str, max_tokens: int, cache: Optional[SharedCache] = None, key: Optional[Hashable] = None) -> str:
+        """Complete `prompt` without a cache lookup, storing a real completion under `key`."""
+        content = await self._complete(prompt, max_tokens)
+        if not content:
             return self._get_fallback_response(prompt)
+        if cache is not None:
+            cache.put(key, content)
+        return content
 
     def _get_fallback_response(self, prompt: str) -> str:
         """Provide fallback responses when API is unavailable."""
@@ -44,9 +252,8 @@ class AIEngine:
             return "Markets moved sharply—this is when emotions run high. Take a breath before your next decision. Clarity over reactivity."
         return "Market conditions are evolving. Stay focused on your trading plan."
 
-    def explain_market_move(self, market_data: MarketWithNewsResponse) -> str:
-        """Generate a 1-2 sentence explanation of the market move."""
-        prompt = f"""You are a professional market analyst. Explain this market move in 1-2 concise sentences.
+    def _explanation_prompt(self, market_data: MarketWithNewsResponse) -> str:
+        return f"""You are a professional market analyst. Explain this market move in 1-2 concise sentences.
 
 Market Data:
 - Symbol: {market_data.market.symbol}
@@ -60,20 +267,13 @@ Recent News Headlines:
 
 Write a professional, clear explanation. No predictions. No trading advice. Just explain what happened and why it matters."""
 
-        return self._call_llm(prompt, max_tokens=1000)
-
-    def generate_coaching_message(
-        self,
-        market_data: MarketWithNewsResponse,
-        behavior: Optional[BehaviorResponse] = None
-    ) -> str:
-        """Generate a coaching message combining market context and behavior patterns."""
+    def _coaching_prompt(self, market_data: MarketWithNewsResponse, behavior: Optional[BehaviorResponse] = None) -> str:
         behavior_context = ""
         if behavior and behavior.patterns:
             patterns_desc = ", ".join([p.description for p in behavior.patterns])
             behavior_context = f"\nTrader Patterns: {patterns_desc}"
 
-        prompt = f"""You are a supportive trading coach. Write ONE brief, empathetic coaching sentence.
+        return f"""You are a supportive trading coach. Write ONE brief, empathetic coaching sentence.
 
 Market Event: {market_data.market.symbol} {"dropped" if market_data.market.change_pct < 0 else "rose"} {abs(market_data.market.change_pct)}%{behavior_context}
 Recent News Headlines: {chr(10).join([f"- {n.title}" for n in market_data.news])}
@@ -84,9 +284,89 @@ Guidelines:
 - Encourage mindfulness
 - Keep it under 30 words"""
 
-        return self._call_llm(prompt, max_tokens=1000)
+    async def explain_market_move(self, market_data: MarketWithNewsResponse) -> str:
+        """Generate a 1-2 sentence explanation of the market move."""
+        prompt = self._explanation_prompt(market_data)
+        return await self._call_llm(prompt, max_tokens=1000, cache=explanation_cache, key=market_context_key(market_data))
+
+    async def generate_coaching_message(
+        self,
+        market_data: MarketWithNewsResponse,
+        behavior: Optional[BehaviorResponse] = None
+    ) -> str:
+        """Generate a coaching message combining market context and behavior patterns."""
+        prompt = self._coaching_prompt(market_data, behavior)
+        return await self._call_llm(prompt, max_tokens=1000, cache=coaching_cache, key=self._coaching_key(market_data, behavior))
+
+    def _coaching_key(self, market_data: MarketWithNewsResponse, behavior: Optional[BehaviorResponse]) -> tuple:
+        return (market_context_key(market_data), _digest([p.description for p in behavior.patterns]) if behavior else None)
+
+    async def explain_with_coaching(
+        self,
+        market_data: MarketWithNewsResponse,
+        behavior: Optional[BehaviorResponse] = None
+    ) -> tuple[str, str]:
+        """Explanation and coaching message from a single structured-JSON completion.
+
+        Both results land in the same caches the single-purpose methods use. If one is
+        already cached only the other is generated; if the fused reply is missing or
+        does not validate against `MarketCommentary`, falls back to the two separate calls.
+        """
+        explanation_key = (self.model, 1000, market_context_key(market_data))
+        coaching_key = (self.model, 1000, self._coaching_key(market_data, behavior))
+        explanation, coaching = self._lookup(explanation_cache, explanation_key), self._lookup(coaching_cache, coaching_key)
+        if explanation is not None and coaching is not None:
+            return explanation, coaching
+        if explanation is not None:
+            return explanation, await self._generate(self._coaching_prompt(market_data, behavior), 1000, coaching_cache, coaching_key)
+        if coaching is not None:
+            return await self._generate(self._explanation_prompt(market_data), 1000, explanation_cache, explanation_key), coaching
+
+        market = market_data.market
+        behavior_context = ""
+        if behavior and behavior.patterns:
+            behavior_context = f"\n- Trader Patterns: {', '.join([p.description for p in behavior.patterns])}"
+        prompt = f"""You are a professional market analyst and a supportive trading coach. Reply with a JSON object with two fields.
+
+Market Data:
+- Symbol: {market.symbol}
+- Price Change: {market.change_pct}%
+- Direction: {"Dropped" if market.change_pct < 0 else "Rose"}
+- RSI: {market.indicators.rsi} {"(oversold)" if market.indicators.rsi < 30 else "(overbought)" if market.indicators.rsi > 70 else ""}
+- Volume Ratio: {market.indicators.volume_ratio}x average
+- ATR: {market.indicators.atr}{behavior_context}
+Recent News Headlines:
+{chr(10).join([f"- {n.title}" for n in market_data.news])}
+
+"explanation": explain this market move in 1-2 concise, professional sentences. No predictions. No trading advice. Just explain what happened and why it matters.
+
+"coaching_message": ONE brief, empathetic coaching sentence for the trader.
+- Be supportive, not directive
+- No predictions or signals
+- Acknowledge the situation
+- Encourage mindfulness
+- Keep it under 30 words"""
 
-    def generate_coaching_from_context(
+        content = await self._complete(prompt, max_tokens=2000, response_format=_COMMENTARY_FORMAT)
+        if content:
+            try:
+                commentary = MarketCommentary.model_validate_json(content)
+            except ValidationError as e:
+                print(f"Fused commentary did not match the schema ({e.error_count()} errors); using separate calls")
+            else:
+                commentary_stats["fused"] += 1
+                explanation_cache.put(explanation_key, commentary.explanation)
+                coaching_cache.put(coaching_key, commentary.coaching_message)
+                return commentary.explanation, commentary.coaching_message
+
+        commentary_stats["fallback"] += 1
+        explanation, coaching = await asyncio.gather(
+            self._generate(self._explanation_prompt(market_data), 1000, explanation_cache, explanation_key),
+            self._generate(self._coaching_prompt(market_data, behavior), 1000, coaching_cache, coaching_key),
+        )
+        return explanation, coaching
+
+    async def generate_coaching_from_context(
         self,
         market_context: str,
         behavior_context: Optional[str] = None,
@@ -103,7 +383,7 @@ Guidelines:
 - Acknowledge the situation
 - Encourage mindfulness
 - Keep it under 30 words"""
-        return self._call_llm(prompt, max_tokens=1000)
+        return await self._call_llm(prompt, max_tokens=1000)
 
     def _get_fallback_chat_response(self, user_prompt: str) -> str:
         """Provide a short fallback assistant response when the LLM is unavailable."""
@@ -125,6 +405,30 @@ Guidelines:
         else:
             return "I appreciate the question. While I'm having connection issues right now, here's what I know: the best traders aren't the ones who predict markets—they're the ones who manage emotions. Your discipline matters most."
 
+    def _run_market_tool(self, symbol: Optional[str], simulate_drop: bool, news_limit: int) -> str:
+        """Run the `get_market_with_news` tool and return its JSON result for the model."""
+        symbol = symbol or Settings.DEFAULT_SYMBOL
+        try:
+            market_model = market_poller.get_market_model(symbol, simulate_drop=simulate_drop)
+            market_service = MarketIntelligenceService(symbol=symbol)
+            return market_service.get_market_with_news(news_limit=news_limit, market_model=market_model).model_dump_json()
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+
+    async def _market_tool(self, symbol: Optional[str], simulate_drop: bool, news_limit: int) -> str:
+        """`_run_market_tool` off the event loop, bounded by CHAT_TOOL_TIMEOUT_SECONDS.
+
+        On timeout the model gets an error payload and answers without the data; the
+        worker thread finishes (or fails) on its own since it cannot be interrupted.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(_tool_executor, self._run_market_tool, symbol, simulate_drop, news_limit)
+        try:
+            return await asyncio.wait_for(future, timeout=settings.CHAT_TOOL_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            print(f"get_market_with_news timed out after {settings.CHAT_TOOL_TIMEOUT_SECONDS}s")
+            return json.dumps({"error": "market data is temporarily unavailable"})
+
     def _normalize_usage(self, usage: any) -> dict | None:
         """Normalize various usage objects into a plain dict for Pydantic validation."""
         if usage is None:
@@ -151,7 +455,7 @@ Guidelines:
         except Exception:
             return None
         
-    def chat(self, messages: list[ChatMessage], model: Optional[str] = None) -> ChatResponse:
+    async def chat(self, messages: list[ChatMessage], model: Optional[str] = None) -> ChatResponse:
         """Chat interface with basic tool support.
 
         The assistant can request the `get_market_with_news` tool by returning a message that
@@ -198,65 +502,13 @@ Guidelines:
                 return ChatResponse(message=ChatMessage(role="assistant", content=content), usage=self._normalize_usage(last_usage))
 
             try:
-                # Provide a formal function/tool description to the model so it can call it via the
-                # function-calling / tools interface if supported. We keep our legacy header-based
-                # "CALL_TOOL:get_market_with_news" parsing as a fallback for models that don't use
-                # function_call objects.
-                tools = [
-                    {
-                        "type": "function",
-                        "name": "get_market_with_news",
-                        "description": "Return latest market data and recent news for a symbol.",
-                        "function": {
-                            "name": "get_market_with_news",
-                            "description": "Return latest market data and recent news for a symbol.",
-                            "parameters": {
-                                "type": "object",
-                                "properties": {
-                                    "symbol": {
-                                        "type": "string",
-                                        "description": "Symbol or ticker, e.g. BTC/USD or AAPL",
-                                    },
-                                    "news_limit": {
-                                        "type": "integer",
-                                        "description": "Number of news items to return",
-                                    },
-                                    "simulate_drop": {
-                                        "type": "boolean",
-                                        "description": "If true, simulate a market drop in the returned data",
-                                    },
-                                },
-                                "required": [],
-                                "additionalProperties": False,
-                            }
-                        },
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "symbol": {
-                                    "type": "string",
-                                    "description": "Symbol or ticker, e.g. BTC/USD or AAPL",
-                                },
-                                "news_limit": {
-                                    "type": "integer",
-                                    "description": "Number of news items to return",
-                                },
-                                "simulate_drop": {
-                                    "type": "boolean",
-                                    "description": "If true, simulate a market drop in the returned data",
-                                },
-                            },
-                            "required": [],
-                            "additionalProperties": False,
-                        },
-                        "strict": True,
-                    }
-                ]
-
-                response = self.client.chat.completions.create(
+                # CHAT_TOOLS lets the model call the tool via function calling if supported. We keep
+                # our legacy header-based "CALL_TOOL:get_market_with_news" parsing as a fallback for
+                # models that don't use function_call objects.
+                response = await self.client.chat.completions.create(
                     model=model or self.model,
                     messages=api_messages,
-                    tools=tools,
+                    tools=CHAT_TOOLS,
                     tool_choice=None
                 )
             except Exception as e:
@@ -294,16 +546,9 @@ Guidelines:
                     payload = {}
 
                 if func_name == "get_market_with_news":
-                    symbol = payload.get("symbol") or None
-                    news_limit = int(payload.get("news_limit", 3))
-                    simulate_drop = bool(payload.get("simulate_drop", False))
+                    symbol, simulate_drop, news_limit = _tool_arguments(payload)
 
-                    try:
-                        market_service = MarketIntelligenceService(symbol=symbol or None)
-                        tool_result = market_service.get_market_with_news(simulate_drop=simulate_drop, news_limit=news_limit)
-                        tool_content = json.dumps(tool_result, default=str)
-                    except Exception as e:
-                        tool_content = json.dumps({"error": str(e)})
+                    tool_content = await self._market_tool(symbol, simulate_drop, news_limit)
 
                     # Append the model's original assistant message (which requested the function)
                     api_messages.append({"role": "assistant", "content": assistant_text})
@@ -332,11 +577,11 @@ Guidelines:
                     if isinstance(tool_call, dict):
                         fn = tool_call.get("function") or {}
                         func_name = fn.get("name")
-                        func_args = tool_call.get("arguments")
+                        func_args = fn.get("arguments")
                     else:
                         fn = getattr(tool_call, "function", None)
                         func_name = getattr(fn, "name", None) if fn else None
-                        func_args = getattr(tool_call, "arguments", None)
+                        func_args = getattr(fn, "arguments", None) if fn else None
 
                     try:
                         payload = json.loads(func_args) if isinstance(func_args, str) and func_args.strip() else {}
@@ -344,16 +589,9 @@ Guidelines:
                         payload = {}
 
                     if func_name == "get_market_with_news":
-                        symbol = payload.get("symbol") or None
-                        news_limit = int(payload.get("news_limit", 3))
-                        simulate_drop = bool(payload.get("simulate_drop", False))
+                        symbol, simulate_drop, news_limit = _tool_arguments(payload)
 
-                        try:
-                            market_service = MarketIntelligenceService(symbol=symbol or None)
-                            tool_result = market_service.get_market_with_news(simulate_drop=simulate_drop, news_limit=news_limit)
-                            tool_content = json.dumps(tool_result, default=str)
-                        except Exception as e:
-                            tool_content = json.dumps({"error": str(e)})
+                        tool_content = await self._market_tool(symbol, simulate_drop, news_limit)
 
                         # Append the model's original assistant message and a function message with the result
                         api_messages.append({"role": "assistant", "content": assistant_text})
@@ -380,18 +618,10 @@ Guidelines:
                         # ignore parse errors and use defaults
                         payload = {}
 
-                symbol = payload.get("symbol") or None
-                news_limit = int(payload.get("news_limit", 3))
-                simulate_drop = bool(payload.get("simulate_drop", False))
+                symbol, simulate_drop, news_limit = _tool_arguments(payload)
 
                 # Invoke tool
-                try:
-                    market_service = MarketIntelligenceService(symbol=symbol or None)
-                    tool_result = market_service.get_market_with_news(simulate_drop=simulate_drop, news_limit=news_limit)
-                    # Convert result to json string
-                    tool_content = json.dumps(tool_result, default=str)
-                except Exception as e:
-                    tool_content = json.dumps({"error": str(e)})
+                tool_content = await self._market_tool(symbol, simulate_drop, news_limit)
 
                 # Append assistant's tool request message and the tool response message
                 api_messages.append({"role": "assistant", "content": assistant_text})
@@ -406,3 +636,132 @@ Guidelines:
             last_response_content = assistant_text
             return ChatResponse(message=ChatMessage(role="assistant", content=last_response_content), usage=self._normalize_usage(last_usage))
 
+    async def chat_stream(self, messages: list[ChatMessage], model: Optional[str] = None) -> AsyncIterator[tuple[str, dict]]:
+        """Streaming variant of `chat`, yielding `(event, data)` pairs as the reply is generated.
+
+        - `token`: `{"content": ...}`, the next piece of the reply;
+        - `tool`: `{"name", "status": "started" | "completed", "arguments"}` around the market tool;
+        - `done`: the final ChatResponse (authoritative; text streamed before a tool call
+          is not part of it, matching `chat`).
+
+        Tool handling follows `chat` (one tool cycle). Text that may be a legacy
+        `CALL_TOOL:` header is held back until it is clearly not one.
+        """
+        started = time.perf_counter()
+        first_token_seen = False
+        header = "CALL_TOOL:get_market_with_news"
+
+        def token(content: str) -> tuple[str, dict]:
+            nonlocal first_token_seen
+            if not first_token_seen:
+                first_token_seen = True
+                chat_stream_timings.record(time.perf_counter() - started)
+            return "token", {"content": content}
+
+        if not self.client:
+            last_user = next((m for m in reversed(messages) if m.role == "user"), None)
+            content = self._get_fallback_chat_response(last_user.content if last_user else "")
+            yield token(content)
+            yield "done", ChatResponse(message=ChatMessage(role="assistant", content=content)).model_dump(mode="json")
+            return
+
+        api_messages = [{"role": m.role, "content": m.content} for m in messages]
+        tool_cycle = 0
+        max_tool_cycles = 1
+        usage = None
+        text = ""
+
+        for _ in range(max_tool_cycles + 1):
+            text = ""
+            held = tool_cycle < max_tool_cycles
+            calls: dict[int, dict] = {}
+            try:
+                stream = await self.client.chat.completions.create(
+                    model=model or self.model,
+                    messages=api_messages,
+                    tools=CHAT_TOOLS,
+                    tool_choice=None,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None):
+                        usage = chunk.usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+
+                    # Tool calls arrive as name/argument fragments, keyed by index.
+                    fragments = [(c.index, c.function) for c in (getattr(delta, "tool_calls", None) or [])]
+                    if getattr(delta, "function_call", None):
+                        fragments.append((-1, delta.function_call))
+                    for index, fn in fragments:
+                        call = calls.setdefault(index, {"name": "", "arguments": ""})
+                        if fn is not None:
+                            call["name"] += getattr(fn, "name", None) or ""
+                            call["arguments"] += getattr(fn, "arguments", None) or ""
+
+                    if delta.content:
+                        text += delta.content
+                        if held:
+                            stripped = text.lstrip()
+                            if header.startswith(stripped) or stripped.startswith(header):
+                                continue
+                            held = False
+                            yield token(text)
+                        else:
+                            yield token(delta.content)
+            except Exception as e:
+                print(f"Error streaming from OpenAI API: {e}")
+                if not text:
+                    last_user_content = messages[-1].content if messages else ""
+                    text = self._get_fallback_chat_response(last_user_content)
+                    yield token(text)
+                break
+
+            request = None
+            if tool_cycle < max_tool_cycles:
+                call = next((c for c in calls.values() if c["name"] == "get_market_with_news"), None)
+                if call is not None:
+                    try:
+                        payload = json.loads(call["arguments"]) if call["arguments"].strip() else {}
+                    except Exception:
+                        payload = {}
+                    request = (payload, {"role": "function", "name": "get_market_with_news"})
+                elif text.strip().startswith(header):
+                    payload = {}
+                    parts = text.split("\n", 1)
+                    if len(parts) > 1 and parts[1].strip():
+                        try:
+                            payload = json.loads(parts[1].strip())
+                        except Exception:
+                            payload = {}
+                    request = (payload, {"role": "tool"})
+
+            if request is None:
+                if held and text:
+                    yield token(text)
+                break
+
+            payload, result_message = request
+            symbol, simulate_drop, news_limit = _tool_arguments(payload)
+            arguments = {"symbol": symbol, "simulate_drop": simulate_drop, "news_limit": news_limit}
+            yield "tool", {"name": "get_market_with_news", "status": "started", "arguments": arguments}
+            tool_content = await self._market_tool(symbol, simulate_drop, news_limit)
+            yield "tool", {"name": "get_market_with_news", "status": "completed", "arguments": arguments}
+
+            api_messages.append({"role": "assistant", "content": text})
+            if result_message["role"] == "tool":
+                result_message["content"] = f"RESULT:get_market_with_news\n{tool_content}"
+            else:
+                result_message["content"] = tool_content
+            api_messages.append(result_message)
+            tool_cycle += 1
+
+        response = ChatResponse(message=ChatMessage(role="assistant", content=text), usage=self._normalize_usage(usage))
+        yield "done", response.model_dump(mode="json")
+
+
+def get_ai_engine(request: Request) -> AIEngine:
+    """FastAPI dependency: an engine on the process-wide LLM client, labelled with the request path."""
+    return AIEngine(get_llm_client(), endpoint=request.url.path)
@@ -1,8 +1,11 @@
-from typing import Optional
-from openai import OpenAI
+import asyncio
+from typing import AsyncIterator, Optional
+from openai import AsyncOpenAI
+from pydantic import ValidationError
 
 from app.config import Settings
-from app.models.schemas import Persona, Platform, ContentResponse
+from app.llm import get_llm_client, llm_flights, prompt_key
+from app.models.schemas import Persona, Platform, ContentResponse, ContentVariants
 
 
 PERSONA_PROMPTS = {
@@ -26,37 +29,74 @@ PLATFORM_LIMITS = {
 }
 
 
+# Single-prompt batch mode: every requested variant from one structured completion.
+_VARIANTS_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "content_variants", "strict": True, "schema": {
+        "type": "object",
+        "properties": {"variants": {"type": "array", "items": {
+            "type": "object",
+            "properties": {
+                "persona": {"type": "string", "enum": [p.value for p in Persona]},
+                "platform": {"type": "string", "enum": [p.value for p in Platform]},
+                "content": {"type": "string"},
+            },
+            "required": ["persona", "platform", "content"],
+            "additionalProperties": False,
+        }}},
+        "required": ["variants"],
+        "additionalProperties": False,
+    }},
+}
+
+
 class ContentGenerator:
-    def __init__(self):
-        self.client = None
+    def __init__(self, client: Optional[AsyncOpenAI] = None):
         settings = Settings()
-        if settings.OPENAI_API_KEY:
-            if settings.MODEL_BASE_URL:
-                self.client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.MODEL_BASE_URL)
-            else:
-                self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = client
         self.model = settings.MODEL
+        self.max_concurrency = settings.CONTENT_MAX_CONCURRENCY
+
+    async def _complete(
+        self,
+        prompt: str,
+        max_tokens: int,
+        response_format: Optional[dict] = None,
+    ) -> Optional[str]:
+        """Make a call to OpenAI API; None if it is unavailable, fails or returns nothing.
 
-    def _call_llm(self, prompt: str, platform: Platform, max_tokens: int = 400) -> str:
-        """Make a call to OpenAI API."""
+        Identical in-flight calls are coalesced on (model, prompt, max_tokens, response
+        format). The prompt already carries the platform guidance, and each caller applies
+        its own platform fallback afterwards.
+        """
         if not self.client:
-            return self._get_fallback_content(prompt, platform)
+            return None
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                max_completion_tokens=max_tokens,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            content = response.choices[0].message.content
-            if not content or not content.strip():
-                return self._get_fallback_content(prompt, platform)
-            return content
-        except Exception as e:
-            print(f"Error calling OpenAI API for content generation: {e}")
-            return self._get_fallback_content(prompt, platform)
+        extra = {"response_format": response_format} if response_format else {}
+
+        async def complete() -> Optional[str]:
+            try:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    max_completion_tokens=max_tokens,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ],
+                    **extra,
+                )
+                content = response.choices[0].message.content
+                return content if content and content.strip() else None
+            except Exception as e:
+                print(f"Error calling OpenAI API for content generation: {e}")
+                return None
+
+        key = prompt_key(self.model, prompt, max_tokens, "json" if response_format else "")
+        return await llm_flights.do(key, complete)
+
+    async def _call_llm(self, prompt: str, platform: Platform, max_tokens: int = 400) -> str:
+        """Make a call to OpenAI API, falling back to canned content for `platform`."""
+        content = await self._complete(prompt, max_tokens)
+        return content or self._get_fallback_content(prompt, platform)
 
     def _get_fallback_content(self, prompt: str, platform: Platform) -> str:
         """Provide fallback content when API is unavailable."""
@@ -77,34 +117,55 @@ class ContentGenerator:
                 return "I've seen this pattern hundreds of times. Sharp drop, high volume, everyone panicking.\n\nThis is exactly where discipline separates the professionals from the amateurs. The best traders I know? They're not trading right now. They're observing."
             return "Markets are moving. Stay focused on your process, not the noise."
 
-    def generate_content(
+    def _context_section(
         self,
         market_context: str,
-        persona: Persona,
-        platform: Platform,
         behavior_context: Optional[str] = None,
         coaching_insight: Optional[str] = None,
-    ) -> ContentResponse:
-        """Generate social media content for a specific persona and platform."""
-        persona_config = PERSONA_PROMPTS[persona]
-        char_limit = PLATFORM_LIMITS[platform]
-
-        # Build the context section — prefer coaching insight (from Step 3) over raw contexts
+    ) -> str:
+        # Prefer coaching insight (from Step 3) over raw contexts
         if coaching_insight:
-            context_section = f"""COACHING INSIGHT (personal):
+            return f"""COACHING INSIGHT (personal):
 {coaching_insight}
 
 ORIGINAL MARKET CONTEXT:
 {market_context}"""
-        else:
-            context_section = f"MARKET CONTEXT:\n{market_context}"
-            if behavior_context:
-                context_section += f"\nTrader Insight: {behavior_context}"
+        context_section = f"MARKET CONTEXT:\n{market_context}"
+        if behavior_context:
+            context_section += f"\nTrader Insight: {behavior_context}"
+        return context_section
 
+    def _platform_guidance(self, platform: Platform) -> str:
         if platform == Platform.X:
-            platform_guidance = "CRITICAL PLATFORM CONSTRAINT — X (Twitter): Write ONE single punchy tweet. MUST be under 280 characters total including hashtags. NO multi-paragraph content. NO line breaks. One concise, bold, conversation-starting statement with 2-3 hashtags."
-        else:
-            platform_guidance = "CRITICAL PLATFORM CONSTRAINT — LinkedIn: Write 2-3 short paragraphs, minimum 400 characters. Professional, authoritative tone. Include a call-to-action or reflection question at the end. Establish credibility."
+            return "CRITICAL PLATFORM CONSTRAINT — X (Twitter): Write ONE single punchy tweet. MUST be under 280 characters total including hashtags. NO multi-paragraph content. NO line breaks. One concise, bold, conversation-starting statement with 2-3 hashtags."
+        return "CRITICAL PLATFORM CONSTRAINT — LinkedIn: Write 2-3 short paragraphs, minimum 400 characters. Professional, authoritative tone. Include a call-to-action or reflection question at the end. Establish credibility."
+
+    def _finalize(self, persona: Persona, platform: Platform, content: str) -> ContentResponse:
+        """Extract hashtags and enforce the platform's character limit."""
+        hashtags = self._extract_hashtags(content)
+
+        char_limit = PLATFORM_LIMITS[platform]
+        if len(content) > char_limit:
+            content = self._truncate_content(content, char_limit)
+
+        return ContentResponse(
+            persona=persona,
+            platform=platform,
+            content=content.strip(),
+            hashtags=hashtags,
+            char_count=len(content.strip())
+        )
+
+    async def generate_content(
+        self,
+        market_context: str,
+        persona: Persona,
+        platform: Platform,
+        behavior_context: Optional[str] = None,
+        coaching_insight: Optional[str] = None,
+    ) -> ContentResponse:
+        """Generate social media content for a specific persona and platform."""
+        persona_config = PERSONA_PROMPTS[persona]
 
         prompt = f"""You are a social media content creator with the following persona:
 
@@ -112,11 +173,11 @@ PERSONA: {persona.value.replace("_", " ").title()}
 VOICE: {persona_config["voice"]}
 STYLE: {persona_config["style"]}
 
-{platform_guidance}
+{self._platform_guidance(platform)}
 
-{context_section}
+{self._context_section(market_context, behavior_context, coaching_insight)}
 
-CHARACTER LIMIT: {char_limit}
+CHARACTER LIMIT: {PLATFORM_LIMITS[platform]}
 
 Write engaging content that:
 1. Feels authentic (not AI-generated)
@@ -128,22 +189,102 @@ Write engaging content that:
 
 Output ONLY the post content with hashtags. No explanations."""
 
-        content = self._call_llm(prompt, platform, max_tokens=400)
+        content = await self._call_llm(prompt, platform, max_tokens=400)
+        return self._finalize(persona, platform, content)
 
-        # Extract hashtags from content
-        hashtags = self._extract_hashtags(content)
+    async def generate_batch(
+        self,
+        market_context: str,
+        personas: Optional[list[Persona]] = None,
+        platforms: Optional[list[Platform]] = None,
+        behavior_context: Optional[str] = None,
+        coaching_insight: Optional[str] = None,
+        single_prompt: bool = False,
+    ) -> AsyncIterator[ContentResponse]:
+        """Yield content for every persona × platform combination as each one finishes.
 
-        # Ensure we're within character limit
-        if len(content) > char_limit:
-            content = self._truncate_content(content, char_limit)
+        Variants are generated concurrently, at most `max_concurrency` completions at a
+        time. With `single_prompt`, one structured completion is asked for all of them
+        first; variants it leaves out or gets wrong are then generated individually.
+        """
+        personas = list(dict.fromkeys(personas or Persona))
+        platforms = list(dict.fromkeys(platforms or Platform))
+        pending = [(persona, platform) for persona in personas for platform in platforms]
 
-        return ContentResponse(
-            persona=persona,
-            platform=platform,
-            content=content.strip(),
-            hashtags=hashtags,
-            char_count=len(content.strip())
+        if single_prompt and self.client:
+            for response in await self._generate_variants(pending, market_context, behavior_context, coaching_insight):
+                pending.remove((response.persona, response.platform))
+                yield response
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def generate(persona: Persona, platform: Platform) -> ContentResponse:
+            async with semaphore:
+                return await self.generate_content(market_context, persona, platform, behavior_context, coaching_insight)
+
+        tasks = [asyncio.ensure_future(generate(persona, platform)) for persona, platform in pending]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _generate_variants(
+        self,
+        variants: list[tuple[Persona, Platform]],
+        market_context: str,
+        behavior_context: Optional[str],
+        coaching_insight: Optional[str],
+    ) -> list[ContentResponse]:
+        """Requested variants from one structured completion; [] if the reply doesn't validate."""
+        personas = list(dict.fromkeys(persona for persona, _ in variants))
+        platforms = list(dict.fromkeys(platform for _, platform in variants))
+        persona_section = "\n\n".join(
+            f"""PERSONA: {persona.value}
+VOICE: {PERSONA_PROMPTS[persona]["voice"]}
+STYLE: {PERSONA_PROMPTS[persona]["style"]}"""
+            for persona in personas
         )
+        platform_section = "\n\n".join(
+            f"{self._platform_guidance(platform)}\nCHARACTER LIMIT ({platform.value}): {PLATFORM_LIMITS[platform]}"
+            for platform in platforms
+        )
+
+        prompt = f"""You are a social media content creator writing in several personas. Write one post for each of these persona/platform pairs: {", ".join(f"{persona.value}/{platform.value}" for persona, platform in variants)}.
+
+{persona_section}
+
+{platform_section}
+
+{self._context_section(market_context, behavior_context, coaching_insight)}
+
+Write engaging content that:
+1. Feels authentic (not AI-generated)
+2. Provides value to traders
+3. Stays brand-safe (no predictions, no financial advice)
+4. Matches each persona voice exactly, with each persona clearly distinct
+5. Strictly respects the platform format and character limit
+6. Includes 2-3 relevant hashtags at the end
+
+Return a JSON object whose "variants" array holds one entry per pair, with the post content and hashtags only."""
+
+        content = await self._complete(prompt, max_tokens=400 * len(variants), response_format=_VARIANTS_FORMAT)
+        if not content:
+            return []
+        try:
+            parsed = ContentVariants.model_validate_json(content)
+        except ValidationError as e:
+            print(f"Batch content did not match the schema ({e.error_count()} errors); generating variants separately")
+            return []
+
+        wanted = set(variants)
+        results = []
+        for variant in parsed.variants:
+            if (variant.persona, variant.platform) in wanted:
+                wanted.discard((variant.persona, variant.platform))
+                results.append(self._finalize(variant.persona, variant.platform, variant.content))
+        return results
 
     def _extract_hashtags(self, content: str) -> list[str]:
         """Extract hashtags from content."""
@@ -168,4 +309,6 @@ Output ONLY the post content with hashtags. No explanations."""
         return truncated + "..."
 
 
-content_generator = ContentGenerator()
+def get_content_generator() -> ContentGenerator:
+    """FastAPI dependency: a generator on the process-wide LLM client."""
+    return ContentGenerator(get_llm_client())
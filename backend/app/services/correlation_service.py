@@ -0,0 +1,252 @@
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from app.config import Settings
+from app.models.schemas import CorrelationPeer, CorrelationsResponse
+from app.services.candle_store import INTERVAL_SECONDS
+from app.services.market_poller import MarketSnapshot, market_poller
+
+settings = Settings()
+
+# Running sums drift slightly with every add/subtract; re-sum the window this often.
+_RESYNC_EVERY = 1024
+
+
+class CorrelationService:
+    """Rolling correlation of candle log returns across every polled symbol.
+
+    Returns for the last `window` closed candles are kept in a ring buffer together
+    with running per-symbol sums and pairwise cross-products. Each closed candle
+    updates them with one O(N²) rank-one step instead of recomputing O(N²·T) from
+    the histories, and the correlation matrix (float32) and each symbol's top-k
+    peers are refreshed at the same time, so queries only read precomputed values.
+
+    Candles are committed once every active symbol (one that reported the last
+    committed candle) has reported them, or when a later candle arrives; a symbol
+    missing from a committed candle counts as flat. A symbol joining later is
+    backfilled from its own history, and its slot is freed again when the poller
+    stops polling it. At most `max_symbols` symbols are tracked, which bounds memory.
+    """
+
+    def __init__(self, interval: str = "5m", window: int = 288, max_symbols: int = 256, top_k: int = 5):
+        self.interval = interval
+        self.window = window
+        self.max_symbols = max_symbols
+        self.top_k = top_k
+        self._step_ns = INTERVAL_SECONDS.get(interval, 300) * 1_000_000_000
+        self._lock = threading.Lock()
+        self._slots: dict[str, int] = {}
+        self._symbols: list[str] = []
+        self._returns = np.zeros((window, max_symbols))
+        self._ts = np.zeros(window, dtype=np.int64)
+        self._head = 0
+        self._rows = 0
+        self._commits = 0
+        self._sum = np.zeros(max_symbols)
+        self._cross = np.zeros((max_symbols, max_symbols))
+        self._matrix = np.zeros((max_symbols, max_symbols), dtype=np.float32)
+        self._peers = np.zeros((max_symbols, top_k), dtype=np.int32)
+        self._peer_count = 0
+        self._last_reported = np.full(max_symbols, -1, dtype=np.int64)
+        self._pending: dict[int, dict[int, float]] = {}
+        self.updated_at: Optional[datetime] = None
+
+    @property
+    def _last_ts(self) -> int:
+        return int(self._ts[(self._head - 1) % self.window]) if self._rows else -1
+
+    def on_snapshot(self, snapshot: MarketSnapshot) -> None:
+        """Poller listener: queue the snapshot's newly closed candles."""
+        if snapshot.interval != self.interval:
+            return
+        history = snapshot.history
+        index = history.index if history.index.tz is None else history.index.tz_convert("UTC")
+        ts = index.as_unit("ns").asi8
+        closes = history["Close"].to_numpy(dtype=np.float64)
+        closed = ts + self._step_ns <= time.time_ns()
+        ts, closes = ts[closed], closes[closed]
+        if len(ts) < 2:
+            return
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.nan_to_num(np.log(closes[1:] / closes[:-1]), nan=0.0, posinf=0.0, neginf=0.0)
+        ts = ts[1:]
+
+        with self._lock:
+            slot = self._slots.get(snapshot.symbol)
+            if slot is None:
+                slot = self._adopt(snapshot.symbol, ts, returns)
+                if slot is None:
+                    return
+            fresh = ts > self._last_ts
+            for t, r in zip(ts[fresh].tolist(), returns[fresh].tolist()):
+                self._pending.setdefault(t, {})[slot] = r
+            self._last_reported[slot] = max(self._last_reported[slot], ts[-1])
+            self._commit_ready()
+
+    def drop(self, symbol: str) -> None:
+        """Poller drop listener: stop tracking `symbol` and free its slot.
+
+        The last slot is moved into the freed one so tracked symbols stay contiguous.
+        """
+        with self._lock:
+            slot = self._slots.pop(symbol, None)
+            if slot is None:
+                return
+            last = len(self._symbols) - 1
+            if slot != last:
+                moved = self._symbols[last]
+                self._symbols[slot] = moved
+                self._slots[moved] = slot
+                self._returns[:, slot] = self._returns[:, last]
+                self._last_reported[slot] = self._last_reported[last]
+            self._symbols.pop()
+            self._returns[:, last] = 0.0
+            self._last_reported[last] = -1
+            for t, reported in list(self._pending.items()):
+                reported.pop(slot, None)
+                if last in reported:
+                    reported[slot] = reported.pop(last)
+                if not reported:
+                    del self._pending[t]
+            self._resync()
+            self._refresh()
+            self._commit_ready()
+
+    def _adopt(self, symbol: str, ts: np.ndarray, returns: np.ndarray) -> Optional[int]:
+        """Start tracking `symbol`, filling its column from its own history."""
+        if len(self._symbols) >= self.max_symbols:
+            return None
+        slot = len(self._symbols)
+        self._symbols.append(symbol)
+        self._slots[symbol] = slot
+
+        if self._rows == 0:
+            # First symbol: its closed candles (minus the newest, which is committed
+            # through the pending path with everyone else's) define the window.
+            rows = min(len(ts) - 1, self.window)
+            if rows > 0:
+                self._ts[:rows] = ts[-rows - 1:-1]
+                self._returns[:rows, slot] = returns[-rows - 1:-1]
+                self._rows = rows
+                self._head = rows % self.window
+        else:
+            ring_ts = self._ts[:self._rows] if self._rows < self.window else self._ts
+            pos = np.searchsorted(ts, ring_ts)
+            found = pos < len(ts)
+            found[found] = ts[pos[found]] == ring_ts[found]
+            self._returns[: len(ring_ts), slot] = np.where(found, returns[np.minimum(pos, len(ts) - 1)], 0.0)
+        self._resync()
+        self._refresh()
+        return slot
+
+    def _commit_ready(self) -> None:
+        latest = max(self._pending, default=None)
+        for t in sorted(self._pending):
+            reported = self._pending[t]
+            # Symbols that missed the last committed candle (failed fetches, stale
+            # feeds) don't hold back the newest one.
+            active = np.flatnonzero(self._last_reported[:len(self._symbols)] >= self._last_ts)
+            if t != latest or all(slot in reported for slot in active.tolist()):
+                self._commit(t, self._pending.pop(t))
+            else:
+                break
+
+    def _commit(self, ts: int, reported: dict[int, float]) -> None:
+        n = len(self._symbols)
+        row = np.zeros(n)
+        row[list(reported)] = list(reported.values())
+        old = self._returns[self._head, :n]
+        if self._rows < self.window:
+            old = np.zeros(n)
+            self._rows += 1
+
+        self._sum[:n] += row - old
+        self._cross[:n, :n] += np.outer(row, row) - np.outer(old, old)
+        self._returns[self._head, :n] = row
+        self._ts[self._head] = ts
+        self._head = (self._head + 1) % self.window
+        self._commits += 1
+        if self._commits % _RESYNC_EVERY == 0:
+            self._resync()
+        self._refresh()
+
+    def _resync(self) -> None:
+        n = len(self._symbols)
+        returns = self._returns[:self._rows, :n]
+        self._sum[:n] = returns.sum(axis=0)
+        self._cross[:n, :n] = returns.T @ returns
+
+    def _refresh(self) -> None:
+        """Recompute the correlation matrix and top-k peers from the running sums."""
+        n, rows = len(self._symbols), self._rows
+        if rows < 2:
+            return
+        mean = self._sum[:n] / rows
+        cov = self._cross[:n, :n] / rows - np.outer(mean, mean)
+        std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(std, std)
+        corr = np.clip(np.nan_to_num(corr, nan=0.0), -1.0, 1.0)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, 0.0))
+        self._matrix[:n, :n] = corr
+
+        k = min(self.top_k, n - 1)
+        if k > 0:
+            strength = np.abs(corr)
+            np.fill_diagonal(strength, -1.0)
+            top = np.argpartition(-strength, k - 1, axis=1)[:, :k]
+            order = np.argsort(-np.take_along_axis(strength, top, axis=1), axis=1)
+            self._peers[:n, :k] = np.take_along_axis(top, order, axis=1)
+        self._peer_count = k
+        self.updated_at = datetime.now()
+
+    def peers(self, symbol: str, k: Optional[int] = None) -> Optional[list[CorrelationPeer]]:
+        """Most strongly (positively or negatively) correlated symbols, or None if untracked."""
+        with self._lock:
+            slot = self._slots.get(symbol)
+            if slot is None:
+                return None
+            count = self._peer_count if k is None else min(k, self._peer_count)
+            return [
+                CorrelationPeer(symbol=self._symbols[j], correlation=round(float(self._matrix[slot, j]), 4))
+                for j in self._peers[slot, :count].tolist()
+            ]
+
+    def correlations(self, symbols: Optional[list[str]] = None) -> CorrelationsResponse:
+        """Correlation matrix for `symbols` (default: every tracked symbol); untracked ones are omitted."""
+        with self._lock:
+            names = [s for s in (symbols or self._symbols) if s in self._slots]
+            slots = [self._slots[s] for s in names]
+            matrix = np.round(self._matrix[np.ix_(slots, slots)].astype(np.float64), 4)
+            return CorrelationsResponse(
+                interval=self.interval,
+                window=self.window,
+                observations=self._rows,
+                symbols=names,
+                matrix=matrix.tolist(),
+                updated_at=self.updated_at,
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "symbols": len(self._symbols),
+                "observations": self._rows,
+                "pending_candles": len(self._pending),
+                "matrix_bytes": self._matrix.nbytes,
+            }
+
+
+correlation_service = CorrelationService(
+    interval=settings.MARKET_POLL_INTERVAL,
+    window=settings.CORRELATION_WINDOW,
+    max_symbols=settings.CORRELATION_MAX_SYMBOLS,
+    top_k=settings.CORRELATION_TOP_K,
+)
+market_poller.add_listener(correlation_service.on_snapshot)
+market_poller.add_drop_listener(correlation_service.drop)
@@ -0,0 +1,39 @@
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices chosen by Largest-Triangle-Three-Buckets to keep `threshold` points.
+
+    The first and last points are always kept. Each bucket in between keeps the point
+    forming the largest triangle with the previously kept point and the average of
+    the next bucket, which preserves visual peaks and troughs far better than
+    striding. Returns every index when no reduction is needed.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+    # Bucket boundaries: bucket i spans [edges[i], edges[i + 1]).
+    edges = (np.floor(np.arange(threshold - 1) * every) + 1).astype(np.int64)
+    edges = np.append(edges, n - 1)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) - 1 else n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
@@ -0,0 +1,301 @@
+import threading
+from collections import deque
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.models.schemas import MarketIndicators
+from app.services.indicator_kernels import price_deltas, gains_losses, true_range, rsi_from_means
+from app.services.indicator_library import FusedState
+
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+VOLUME_PERIOD = 20
+MIN_CANDLES = 20
+
+# Running sums drift slightly with every add/subtract; re-sum the window this often.
+_RESYNC_EVERY = 1024
+
+
+def default_indicators() -> MarketIndicators:
+    return MarketIndicators(rsi=50.0, atr=0.001, volume_ratio=1.0, price_change_pct=0.0)
+
+
+def _ts_ns(ts) -> int:
+    """Candle timestamp as UTC nanoseconds (naive timestamps are taken as UTC)."""
+    return pd.Timestamp(ts).value if ts is not None else 0
+
+
+def _index_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    if index.tz is not None:
+        index = index.tz_convert("UTC")
+    return index.as_unit("ns").asi8
+
+
+def _rounded(fused: FusedState) -> dict[str, Optional[float]]:
+    """`fused`'s latest values, rounded as `MarketIndicators` reports them."""
+    return {
+        name: round(value, 2 if name.startswith("stoch") else 5) if value is not None else None
+        for name, value in fused.values().items()
+    }
+
+
+def _ohlcv(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    return tuple(df[column].to_numpy(dtype=np.float64) for column in ("High", "Low", "Close", "Volume"))
+
+
+def extended_indicators(df: pd.DataFrame) -> dict[str, Optional[float]]:
+    """EMA/MACD/Bollinger/VWAP/Stochastics for the latest candle of `df`, without shared state."""
+    return _rounded(FusedState.from_arrays(_index_ns(df.index), *_ohlcv(df)))
+
+
+def shocked_extended_indicators(df: pd.DataFrame, shocked: dict[str, np.ndarray]) -> list[dict[str, Optional[float]]]:
+    """Extended indicators for `df` with its trailing candles replaced by each row of `shocked`.
+
+    `shocked` holds (rows x W) High/Low/Close/Volume arrays right-aligned on the
+    latest candle (NaN left padding where `df` is shorter than W). The history before
+    the window is folded once and every row is appended to a copy of that state.
+    """
+    width = shocked["Close"].shape[1]
+    split = max(len(df) - width, 0)
+    ts = _index_ns(df.index)
+    prefix = FusedState.from_arrays(ts[:split], *(values[:split] for values in _ohlcv(df)))
+    offset = width - (len(df) - split)
+
+    results = []
+    for row in range(shocked["Close"].shape[0]):
+        state = prefix.copy()
+        for col in range(offset, width):
+            state.update(
+                int(ts[split + col - offset]),
+                float(shocked["High"][row, col]),
+                float(shocked["Low"][row, col]),
+                float(shocked["Close"][row, col]),
+                float(shocked["Volume"][row, col]),
+            )
+        results.append(_rounded(state))
+    return results
+
+
+class RollingWindow:
+    """Fixed-size window with a running sum. The most recent push can be undone."""
+
+    __slots__ = ("size", "total", "_values", "_last_evicted", "_pushes")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.total = 0.0
+        self._values: deque[float] = deque()
+        self._last_evicted: Optional[float] = None
+        self._pushes = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def full(self) -> bool:
+        return len(self._values) >= self.size
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self._values) if self._values else 0.0
+
+    def seed(self, values) -> None:
+        self._values = deque(float(v) for v in values[-self.size:])
+        self.total = float(sum(self._values))
+        self._last_evicted = None
+        self._pushes = 0
+
+    def push(self, value: float) -> None:
+        self._values.append(value)
+        self.total += value
+        self._last_evicted = None
+        if len(self._values) > self.size:
+            self._last_evicted = self._values.popleft()
+            self.total -= self._last_evicted
+        self._pushes += 1
+        if self._pushes % _RESYNC_EVERY == 0:
+            self.total = float(sum(self._values))
+
+    def replace_last(self, value: float) -> None:
+        """Swap the most recently pushed value for `value`."""
+        if self._values:
+            self.total -= self._values.pop()
+            if self._last_evicted is not None:
+                self._values.appendleft(self._last_evicted)
+                self.total += self._last_evicted
+        self.push(value)
+
+
+class IndicatorState:
+    """Running RSI/ATR/volume-ratio state for one (symbol, interval) series.
+
+    `update` folds in one new candle in constant time and `replace_last` revises the
+    still-forming candle. `rebuild` reseeds the windows from a full frame with
+    vectorized NumPy and is only needed when the history itself is replaced.
+    EMA/MACD/Bollinger/VWAP/Stochastics are carried alongside in a `FusedState`.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.gains = RollingWindow(RSI_PERIOD)
+        self.losses = RollingWindow(RSI_PERIOD)
+        self.true_ranges = RollingWindow(ATR_PERIOD)
+        self.volumes = RollingWindow(VOLUME_PERIOD)
+        self.count = 0
+        self.last_ts = None
+        self._last: Optional[tuple[float, float, float, float]] = None  # high, low, close, volume
+        self._prev_close: Optional[float] = None
+        self.extended = FusedState()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "IndicatorState":
+        state = cls()
+        state.rebuild(df)
+        return state
+
+    def rebuild(self, df: pd.DataFrame) -> None:
+        """Reseed every window from `df` using vectorized kernels."""
+        high = df["High"].to_numpy(dtype=np.float64)
+        low = df["Low"].to_numpy(dtype=np.float64)
+        close = df["Close"].to_numpy(dtype=np.float64)
+        volume = df["Volume"].to_numpy(dtype=np.float64)
+
+        gains, losses = gains_losses(price_deltas(close))
+        # The first delta has no previous close and never enters a full window.
+        self.gains.seed(gains[1:])
+        self.losses.seed(losses[1:])
+        self.true_ranges.seed(true_range(high, low, close))
+        self.volumes.seed(volume)
+        self.extended = FusedState.from_arrays(_index_ns(df.index), high, low, close, volume)
+
+        self.count = len(df)
+        self.last_ts = df.index[-1] if len(df) else None
+        self._last = (high[-1], low[-1], close[-1], volume[-1]) if len(df) else None
+        self._prev_close = float(close[-2]) if len(df) > 1 else None
+
+    def _push(self, high: float, low: float, close: float, volume: float, replace: bool) -> None:
+        prev_close = self._prev_close
+        if prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+        if replace:
+            self.true_ranges.replace_last(tr)
+            self.volumes.replace_last(volume)
+            if prev_close is not None:
+                delta = close - prev_close
+                self.gains.replace_last(max(delta, 0.0))
+                self.losses.replace_last(max(-delta, 0.0))
+        else:
+            self.true_ranges.push(tr)
+            self.volumes.push(volume)
+            if prev_close is not None:
+                delta = close - prev_close
+                self.gains.push(max(delta, 0.0))
+                self.losses.push(max(-delta, 0.0))
+            self.count += 1
+        self._last = (high, low, close, volume)
+
+    def update(self, ts, high: float, low: float, close: float, volume: float) -> None:
+        """Fold a newly opened candle into the running state."""
+        if self._last is not None:
+            self._prev_close = self._last[2]
+        self._push(high, low, close, volume, replace=False)
+        self.extended.update(_ts_ns(ts), high, low, close, volume)
+        self.last_ts = ts
+
+    def replace_last(self, high: float, low: float, close: float, volume: float) -> None:
+        """Revise the latest (still forming) candle in place."""
+        if self._last is None:
+            self.update(self.last_ts, high, low, close, volume)
+            return
+        self._push(high, low, close, volume, replace=True)
+        self.extended.replace_last(_ts_ns(self.last_ts), high, low, close, volume)
+
+    def sync(self, df: pd.DataFrame) -> None:
+        """Bring the state up to date with `df`, rebuilding only if history was replaced."""
+        if len(df) == 0:
+            return
+        index = df.index
+        if self.last_ts is None:
+            self.rebuild(df)
+            return
+
+        pos = int(index.searchsorted(self.last_ts))
+        if pos >= len(index) or index[pos] != self.last_ts:
+            self.rebuild(df)
+            return
+
+        new_rows = len(index) - pos - 1
+        if new_rows > VOLUME_PERIOD:
+            # A long gap is cheaper to absorb with one vectorized pass.
+            self.rebuild(df)
+            return
+
+        tail = df.iloc[pos:][["High", "Low", "Close", "Volume"]].to_numpy(dtype=np.float64)
+        current = tuple(tail[0])
+        if self._last is None or current != self._last:
+            self.replace_last(*current)
+        for ts, row in zip(index[pos + 1:], tail[1:]):
+            self.update(ts, *row)
+
+    def snapshot(self) -> MarketIndicators:
+        if self.count < MIN_CANDLES or self._last is None:
+            return default_indicators()
+
+        if self.gains.full:
+            rsi = float(rsi_from_means(self.gains.mean, self.losses.mean))
+        else:
+            rsi = 50.0
+
+        atr = self.true_ranges.mean if self.count > ATR_PERIOD else 0.001
+
+        current_volume = self._last[3]
+        avg_volume = self.volumes.mean
+        volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1.0
+
+        current_price = self._last[2]
+        prev_price = self._prev_close if self._prev_close is not None else current_price
+        price_change_pct = ((current_price - prev_price) / prev_price) * 100 if prev_price > 0 else 0.0
+
+        extended = _rounded(self.extended)
+        return MarketIndicators(
+            rsi=round(rsi, 2),
+            atr=round(atr, 5),
+            volume_ratio=round(volume_ratio, 2),
+            price_change_pct=round(price_change_pct, 2),
+            **extended,
+        )
+
+
+class IndicatorEngine:
+    """Registry of per-(symbol, interval) incremental indicator state."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: dict[tuple[str, str], IndicatorState] = {}
+
+    def _state(self, symbol: str, interval: str) -> IndicatorState:
+        key = (symbol, interval)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = IndicatorState()
+                self._states[key] = state
+            return state
+
+    def indicators_for(self, symbol: str, interval: str, df: pd.DataFrame) -> MarketIndicators:
+        state = self._state(symbol, interval)
+        with state.lock:
+            state.sync(df)
+            return state.snapshot()
+
+    def discard(self, symbol: str, interval: str) -> None:
+        with self._lock:
+            self._states.pop((symbol, interval), None)
+
+
+indicator_engine = IndicatorEngine()
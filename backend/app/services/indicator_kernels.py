@@ -0,0 +1,108 @@
+import numpy as np
+
+
+def price_deltas(close: np.ndarray) -> np.ndarray:
+    """Close-to-close change along the last axis, with NaN in the first column."""
+    deltas = np.full(close.shape, np.nan, dtype=np.float64)
+    deltas[..., 1:] = close[..., 1:] - close[..., :-1]
+    return deltas
+
+
+def gains_losses(deltas: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Split deltas into non-negative gains and losses (NaN deltas count as zero)."""
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+    return gains, losses
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range along the last axis; the first column falls back to high - low."""
+    tr = high - low
+    prev_close = close[..., :-1]
+    tr[..., 1:] = np.maximum(
+        tr[..., 1:],
+        np.maximum(np.abs(high[..., 1:] - prev_close), np.abs(low[..., 1:] - prev_close)),
+    )
+    return tr
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` samples along the last axis; the first window-1 are NaN."""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan, dtype=np.float64)
+    if values.shape[-1] < window:
+        return out
+    csum = np.cumsum(values, axis=-1)
+    out[..., window - 1] = csum[..., window - 1]
+    out[..., window:] = csum[..., window:] - csum[..., :-window]
+    out[..., window - 1:] /= window
+    return out
+
+
+def rsi_from_means(avg_gain, avg_loss):
+    """RSI from average gain/loss; flat windows read 50 and loss-free windows read 100."""
+    avg_gain = np.asarray(avg_gain, dtype=np.float64)
+    avg_loss = np.asarray(avg_loss, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    rsi = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), rsi)
+    return np.where(np.isnan(rsi), 50.0, rsi)
+
+
+def window_indicators(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    rsi_period: int = 14,
+    atr_period: int = 14,
+    volume_period: int = 20,
+) -> dict[str, np.ndarray]:
+    """Latest RSI, ATR, volume ratio and % change for every row of (rows x time) arrays.
+
+    Only the trailing windows are touched, so the cost is independent of how much
+    history each row carries. Rows must be right-aligned on their latest candle.
+    """
+    deltas = close[:, -rsi_period:] - close[:, -rsi_period - 1:-1]
+    gains, losses = gains_losses(deltas)
+    rsi = rsi_from_means(gains.mean(axis=1), losses.mean(axis=1))
+
+    tr = true_range(high[:, -atr_period - 1:], low[:, -atr_period - 1:], close[:, -atr_period - 1:])[:, 1:]
+    atr = tr.mean(axis=1)
+
+    avg_volume = volume[:, -volume_period:].mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_ratio = np.where(avg_volume > 0, volume[:, -1] / avg_volume, 1.0)
+        prev = close[:, -2]
+        price_change_pct = np.where(prev > 0, (close[:, -1] - prev) / prev * 100, 0.0)
+
+    return {
+        "rsi": rsi,
+        "atr": atr,
+        "volume_ratio": volume_ratio,
+        "price_change_pct": price_change_pct,
+    }
+
+
+def indicator_series(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    rsi_period: int = 14,
+    atr_period: int = 14,
+    volume_period: int = 20,
+) -> dict[str, np.ndarray]:
+    """Full RSI, ATR and volume-ratio series (NaN until each window fills) in one pass."""
+    gains, losses = gains_losses(price_deltas(close))
+    avg_gain = rolling_mean(gains, rsi_period)
+    avg_loss = rolling_mean(losses, rsi_period)
+    rsi = np.where(np.isnan(avg_gain), np.nan, rsi_from_means(avg_gain, avg_loss))
+
+    atr = rolling_mean(true_range(high, low, close), atr_period)
+
+    avg_volume = rolling_mean(volume, volume_period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_ratio = np.where(avg_volume > 0, volume / avg_volume, np.where(np.isnan(avg_volume), np.nan, 1.0))
+
+    return {"rsi": rsi, "atr": atr, "volume_ratio": volume_ratio}
@@ -0,0 +1,227 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+EMA_FAST = 12
+EMA_SLOW = 26
+MACD_SIGNAL = 9
+BOLLINGER_PERIOD = 20
+BOLLINGER_WIDTH = 2.0
+STOCH_PERIOD = 14
+STOCH_SMOOTH = 3
+
+EXTENDED_FIELDS = (
+    "ema_fast", "ema_slow", "macd", "macd_signal", "macd_histogram",
+    "bollinger_upper", "bollinger_middle", "bollinger_lower",
+    "vwap", "stoch_k", "stoch_d",
+)
+
+_DAY_NS = 86_400 * 1_000_000_000
+# Running sums drift slightly with every add/subtract; re-sum the window this often.
+_RESYNC_EVERY = 1024
+
+
+def _ema(values: np.ndarray, span: int) -> np.ndarray:
+    """Recursive EMA seeded with the first value, as `FusedState.update` computes it."""
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+class FusedState:
+    """EMA, MACD, Bollinger Bands, session VWAP and Stochastics advanced in one pass.
+
+    Every indicator is updated together, one candle at a time, from a fixed set of
+    scalars and preallocated ring buffers, so adding an indicator adds constant
+    work per candle and no per-indicator intermediate arrays. `replace_last`
+    revises the latest candle by undoing its update and applying the new values.
+    `from_arrays` builds the state for a whole history with vectorized warm-up.
+    VWAP sessions start at UTC midnight.
+    """
+
+    __slots__ = (
+        "count", "ema_fast", "ema_slow", "signal",
+        "_closes", "_close_sum", "_close_sq_sum",
+        "_highs", "_lows", "_ks", "_k_sum",
+        "_session", "_pv_sum", "_v_sum",
+        "_undo", "_outputs",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.ema_fast = self.ema_slow = self.signal = 0.0
+        self._closes = [0.0] * BOLLINGER_PERIOD
+        self._close_sum = self._close_sq_sum = 0.0
+        self._highs = [0.0] * STOCH_PERIOD
+        self._lows = [0.0] * STOCH_PERIOD
+        self._ks = [0.0] * STOCH_SMOOTH
+        self._k_sum = 0.0
+        self._session = None
+        self._pv_sum = self._v_sum = 0.0
+        self._undo = None
+        self._outputs: tuple = (None,) * len(EXTENDED_FIELDS)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        ts: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+    ) -> "FusedState":
+        """State after every candle (`ts` in UTC ns), without a per-candle Python loop.
+
+        All but the last candle are absorbed with array ops; the last one goes through
+        `update` so that it can still be revised with `replace_last`.
+        """
+        state = cls()
+        n = len(close)
+        if n == 0:
+            return state
+        if n > 1:
+            state._warm(ts[:-1], high[:-1], low[:-1], close[:-1], volume[:-1])
+        state.update(int(ts[-1]), float(high[-1]), float(low[-1]), float(close[-1]), float(volume[-1]))
+        return state
+
+    def copy(self) -> "FusedState":
+        """Independent copy, e.g. to append alternative candles to the same history."""
+        clone = FusedState.__new__(FusedState)
+        for name in self.__slots__:
+            setattr(clone, name, getattr(self, name))
+        clone._closes = list(self._closes)
+        clone._highs = list(self._highs)
+        clone._lows = list(self._lows)
+        clone._ks = list(self._ks)
+        return clone
+
+    def _warm(self, ts: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> None:
+        """Set the running state of a fresh instance as if `update` had seen every candle."""
+        n = len(close)
+        ema_fast = _ema(close, EMA_FAST)
+        ema_slow = _ema(close, EMA_SLOW)
+        self.ema_fast = float(ema_fast[-1])
+        self.ema_slow = float(ema_slow[-1])
+        self.signal = float(_ema(ema_fast - ema_slow, MACD_SIGNAL)[-1])
+
+        # Ring buffers hold the trailing windows at the slots `update` would have used.
+        for i in range(max(0, n - BOLLINGER_PERIOD), n):
+            self._closes[i % BOLLINGER_PERIOD] = float(close[i])
+        window = close[max(0, n - BOLLINGER_PERIOD):]
+        self._close_sum = float(window.sum())
+        self._close_sq_sum = float(window @ window)
+
+        for i in range(max(0, n - STOCH_PERIOD), n):
+            self._highs[i % STOCH_PERIOD] = float(high[i])
+            self._lows[i % STOCH_PERIOD] = float(low[i])
+        for i in range(max(STOCH_PERIOD - 1, n - STOCH_SMOOTH), n):
+            highest = float(high[i - STOCH_PERIOD + 1:i + 1].max())
+            lowest = float(low[i - STOCH_PERIOD + 1:i + 1].min())
+            k = (float(close[i]) - lowest) / (highest - lowest) * 100.0 if highest > lowest else 50.0
+            self._ks[i % STOCH_SMOOTH] = k
+            self._k_sum += k
+
+        self._session = int(ts[-1]) // _DAY_NS
+        in_session = (ts // _DAY_NS == self._session) & (volume > 0)
+        typical = (high[in_session] + low[in_session] + close[in_session]) / 3.0
+        self._pv_sum = float(typical @ volume[in_session])
+        self._v_sum = float(volume[in_session].sum())
+        self.count = n
+
+    def update(self, ts_ns: int, high: float, low: float, close: float, volume: float) -> None:
+        n = self.count
+        bb_slot = n % BOLLINGER_PERIOD
+        stoch_slot = n % STOCH_PERIOD
+        k_slot = n % STOCH_SMOOTH
+        self._undo = (
+            n, self.ema_fast, self.ema_slow, self.signal,
+            self._close_sum, self._close_sq_sum, self._k_sum,
+            self._session, self._pv_sum, self._v_sum, self._outputs,
+            self._closes[bb_slot], self._highs[stoch_slot], self._lows[stoch_slot], self._ks[k_slot],
+        )
+
+        # EMAs and MACD (recursive, seeded with the first close).
+        if n == 0:
+            self.ema_fast = self.ema_slow = close
+        else:
+            self.ema_fast += (close - self.ema_fast) * (2.0 / (EMA_FAST + 1))
+            self.ema_slow += (close - self.ema_slow) * (2.0 / (EMA_SLOW + 1))
+        macd = self.ema_fast - self.ema_slow
+        if n == 0:
+            self.signal = macd
+        else:
+            self.signal += (macd - self.signal) * (2.0 / (MACD_SIGNAL + 1))
+
+        # Bollinger Bands from a running sum and sum of squares.
+        evicted = self._closes[bb_slot] if n >= BOLLINGER_PERIOD else 0.0
+        self._closes[bb_slot] = close
+        self._close_sum += close - evicted
+        self._close_sq_sum += close * close - evicted * evicted
+        if (n + 1) % _RESYNC_EVERY == 0:
+            window = self._closes[:min(n + 1, BOLLINGER_PERIOD)]
+            self._close_sum = sum(window)
+            self._close_sq_sum = sum(c * c for c in window)
+
+        # Session VWAP on typical price.
+        session = ts_ns // _DAY_NS
+        if session != self._session:
+            self._session = session
+            self._pv_sum = self._v_sum = 0.0
+        if volume > 0:
+            self._pv_sum += (high + low + close) / 3.0 * volume
+            self._v_sum += volume
+
+        # Stochastic %K over the high/low range and %D as its moving average.
+        self._highs[stoch_slot] = high
+        self._lows[stoch_slot] = low
+        k = None
+        if n + 1 >= STOCH_PERIOD:
+            highest = max(self._highs)
+            lowest = min(self._lows)
+            k = (close - lowest) / (highest - lowest) * 100.0 if highest > lowest else 50.0
+            evicted_k = self._ks[k_slot] if n + 1 >= STOCH_PERIOD + STOCH_SMOOTH else 0.0
+            self._ks[k_slot] = k
+            self._k_sum += k - evicted_k
+
+        self.count = n + 1
+        self._outputs = self._compute(macd, k)
+
+    def _compute(self, macd: float, k: Optional[float]) -> tuple:
+        n = self.count
+        ema_fast = self.ema_fast if n >= EMA_FAST else None
+        ema_slow = self.ema_slow if n >= EMA_SLOW else None
+        if n >= EMA_SLOW + MACD_SIGNAL - 1:
+            macd_out, signal, histogram = macd, self.signal, macd - self.signal
+        else:
+            macd_out = signal = histogram = None
+
+        upper = middle = lower = None
+        if n >= BOLLINGER_PERIOD:
+            middle = self._close_sum / BOLLINGER_PERIOD
+            variance = max(self._close_sq_sum / BOLLINGER_PERIOD - middle * middle, 0.0)
+            band = BOLLINGER_WIDTH * variance ** 0.5
+            upper, lower = middle + band, middle - band
+
+        vwap = self._pv_sum / self._v_sum if self._v_sum > 0 else None
+        stoch_d = self._k_sum / STOCH_SMOOTH if n >= STOCH_PERIOD + STOCH_SMOOTH - 1 else None
+        return (ema_fast, ema_slow, macd_out, signal, histogram, upper, middle, lower, vwap, k, stoch_d)
+
+    def replace_last(self, ts_ns: int, high: float, low: float, close: float, volume: float) -> None:
+        """Revise the most recent candle in place."""
+        if self._undo is None:
+            self.update(ts_ns, high, low, close, volume)
+            return
+        (n, self.ema_fast, self.ema_slow, self.signal,
+         self._close_sum, self._close_sq_sum, self._k_sum,
+         self._session, self._pv_sum, self._v_sum, self._outputs,
+         old_close, old_high, old_low, old_k) = self._undo
+        self.count = n
+        self._closes[n % BOLLINGER_PERIOD] = old_close
+        self._highs[n % STOCH_PERIOD] = old_high
+        self._lows[n % STOCH_PERIOD] = old_low
+        self._ks[n % STOCH_SMOOTH] = old_k
+        self.update(ts_ns, high, low, close, volume)
+
+    def values(self) -> dict[str, Optional[float]]:
+        """Latest value of every extended indicator (None until its window has filled)."""
+        return dict(zip(EXTENDED_FIELDS, self._outputs))
+
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from app.services.cache import SharedCache
+from app.services.indicator_kernels import indicator_series
+
+SERIES_COLUMNS = ("close", "rsi", "atr", "volume_ratio")
+_DECIMALS = {"close": 5, "rsi": 2, "atr": 5, "volume_ratio": 2}
+
+# Keyed by the latest candle, so entries only go stale through eviction.
+series_cache = SharedCache(
+    ttl_seconds=3600,
+    max_entries=128,
+    max_bytes=32 * 1024 * 1024,
+    sizeof=lambda arrays: sum(a.nbytes for a in arrays.values()),
+)
+
+
+def _compute(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    high = df["High"].to_numpy(dtype=np.float64)
+    low = df["Low"].to_numpy(dtype=np.float64)
+    close = df["Close"].to_numpy(dtype=np.float64)
+    volume = df["Volume"].to_numpy(dtype=np.float64)
+
+    arrays = indicator_series(high, low, close, volume)
+    arrays["close"] = close
+    arrays["time"] = df.index.as_unit("ms").asi8 if isinstance(df.index, pd.DatetimeIndex) else np.arange(len(df))
+    return arrays
+
+
+def get_indicator_series(symbol: str, interval: str, df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Aligned close/RSI/ATR/volume-ratio arrays for `df`, cached per latest candle.
+
+    The key includes the latest candle's close and volume so a still-forming candle
+    that gets revised produces a fresh entry instead of a stale one.
+    """
+    if df.empty:
+        return _compute(df)
+    last = df.iloc[-1]
+    key = (symbol, interval, df.index[-1], float(last["Close"]), float(last["Volume"]), len(df))
+    return series_cache.get_or_load(key, lambda: _compute(df))
+
+
+def to_columnar(arrays: dict[str, np.ndarray], points: int) -> dict[str, list]:
+    """Slice the last `points` samples into JSON-ready columns (NaN becomes null)."""
+    columns: dict[str, list] = {"time": arrays["time"][-points:].tolist()}
+    for name in SERIES_COLUMNS:
+        values = np.round(arrays[name][-points:], _DECIMALS[name])
+        columns[name] = np.where(np.isnan(values), None, values).tolist()
+    return columns
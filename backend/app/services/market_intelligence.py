@@ -1,119 +1,232 @@
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional
-from newsapi import NewsApiClient
 from app.models.schemas import MarketData, MarketIndicators, MarketWithNewsResponse
 from app.config import Settings
+from app.services.cache import SharedCache
+from app.services.candle_store import candle_store, period_to_timedelta, COLUMNS as CANDLE_COLUMNS
+from app.services.synthetic_market import synthetic_market
+from app.services.news_service import news_service
+from app.services.scenario_engine import DROP, RISE, scenario_engine
+from app.services.timeframes import can_derive, timeframe_resampler
+from app.services.indicator_engine import IndicatorState, indicator_engine, default_indicators, MIN_CANDLES
+
+
+settings = Settings()
+
+# Shared across every MarketIntelligenceService instance so that per-request services
+# (one per route call) still reuse each other's upstream fetches.
+ohlcv_cache = SharedCache(
+    ttl_seconds=settings.MARKET_CACHE_TTL_SECONDS,
+    max_entries=settings.MARKET_CACHE_MAX_ENTRIES,
+    max_bytes=settings.MARKET_CACHE_MAX_BYTES,
+    sizeof=lambda df: int(df.memory_usage(deep=True).sum()),
+)
+
+
+def fetch_market_data_bulk(
+    symbols: list[str],
+    period: Optional[str] = None,
+    interval: Optional[str] = None,
+    refresh: bool = False,
+) -> dict[str, pd.DataFrame]:
+    """Fetch history for many symbols, downloading all cache misses in one yfinance call.
+
+    Frames are shared through `ohlcv_cache` under the same keys, and with the same
+    single-flight, as `MarketIntelligenceService.fetch_market_data`, so symbols another
+    request is already loading are waited on rather than downloaded again. Closed
+    downloaded candles are appended to `candle_store`. Symbols with no data are omitted.
+    `refresh=True` ignores cached entries and downloads every symbol.
+    `interval` defaults to `MARKET_POLL_INTERVAL`; intervals derivable from it are
+    resampled from base candles.
+    """
+    period = period or settings.MARKET_HISTORY_PERIOD
+    base_interval = settings.MARKET_POLL_INTERVAL
+    interval = interval or base_interval
+    if can_derive(interval, base_interval):
+        frames = fetch_market_data_bulk(symbols, period, base_interval, refresh)
+        return {s: timeframe_resampler.resample(s, base_interval, df, interval, period) for s, df in frames.items()}
+
+    keys = {symbol: (symbol, period, interval) for symbol in symbols}
+    if refresh:
+        for key in keys.values():
+            ohlcv_cache.invalidate(key)
+
+    def load(missing: list[tuple]) -> dict[tuple, pd.DataFrame]:
+        frames = _load_bulk([symbol for symbol, _, _ in missing], period, interval)
+        return {keys[symbol]: df for symbol, df in frames.items()}
+
+    loaded = ohlcv_cache.get_or_load_many(list(keys.values()), load)
+    return {symbol: loaded[key] for symbol, key in keys.items() if key in loaded}
+
+
+def _load_bulk(symbols: list[str], period: str, interval: str) -> dict[str, pd.DataFrame]:
+    if settings.MARKET_DATA_SOURCE == "synthetic":
+        return synthetic_market.history(symbols, period, interval)
+
+    try:
+        raw = yf.download(
+            symbols, period=period, interval=interval, group_by="ticker",
+            auto_adjust=True, threads=True, progress=False,
+        )
+    except Exception:
+        return {}
+
+    frames: dict[str, pd.DataFrame] = {}
+    for symbol in symbols:
+        if isinstance(raw.columns, pd.MultiIndex):
+            if symbol not in raw.columns.get_level_values(0):
+                continue
+            df = raw[symbol]
+        elif len(symbols) == 1:
+            df = raw
+        else:
+            continue
+        df = df.dropna(subset=["Close"])
+        if df.empty:
+            continue
+        # Same columns as `MarketIntelligenceService._download`, whichever path filled the cache.
+        df = df[list(CANDLE_COLUMNS)]
+        candle_store.append(symbol, interval, df.iloc[:-1])
+        frames[symbol] = df
+    return frames
+
+
+class MarketDataUnavailable(Exception):
+    """No real market data could be loaded for a symbol (the fetch failed or returned nothing)."""
 
 
 class MarketIntelligenceService:
     def __init__(self, symbol: str = "EURUSD=X"):
         self.symbol = symbol
-        self._cached_data: Optional[pd.DataFrame] = None
-        self._cache_time: Optional[datetime] = None
-        self._cache_duration = timedelta(minutes=1)
-
-    def fetch_market_data(self, period: str = "5d", interval: str = "5m") -> pd.DataFrame:
-        """Fetch historical market data using yfinance."""
-        now = datetime.now()
-        if (self._cached_data is not None and
-            self._cache_time is not None and
-            now - self._cache_time < self._cache_duration):
-            return self._cached_data
+
+    def fetch_market_data(
+        self,
+        period: Optional[str] = None,
+        interval: Optional[str] = None,
+        refresh: bool = False,
+        fallback: bool = True,
+    ) -> pd.DataFrame:
+        """Fetch historical market data from yfinance (or the synthetic generator).
+
+        Results are served from the process-wide `ohlcv_cache`; concurrent requests for
+        the same (symbol, period, interval) share a single upstream download.
+        `refresh=True` drops the cached entry first to force a new download.
+        With `MARKET_DATA_SOURCE=synthetic` history comes from `synthetic_market`
+        instead, so nothing touches the network or `candle_store`.
+        `interval` defaults to the base `MARKET_POLL_INTERVAL`; intervals derivable from
+        it (e.g. 15m/1h/4h/1d from 5m) are resampled incrementally from the base series,
+        without another upstream fetch.
+        The returned frame is shared, so callers must copy before mutating it.
+        If the fetch fails a synthetic fallback series is returned, or with
+        `fallback=False` `MarketDataUnavailable` is raised instead.
+        """
+        period = period or settings.MARKET_HISTORY_PERIOD
+        base_interval = settings.MARKET_POLL_INTERVAL
+        interval = interval or base_interval
+        if can_derive(interval, base_interval):
+            base = self.fetch_market_data(period, base_interval, refresh, fallback)
+            return timeframe_resampler.resample(self.symbol, base_interval, base, interval, period)
+        if refresh:
+            ohlcv_cache.invalidate((self.symbol, period, interval))
+        try:
+            return ohlcv_cache.get_or_load(
+                (self.symbol, period, interval),
+                lambda: self._load(period, interval),
+            )
+        except Exception as e:
+            if not fallback:
+                raise MarketDataUnavailable(f"Market data for {self.symbol} is unavailable") from e
+            return self._get_fallback_data()
+
+    def _load(self, period: str, interval: str) -> pd.DataFrame:
+        if settings.MARKET_DATA_SOURCE == "synthetic":
+            return synthetic_market.history([self.symbol], period, interval)[self.symbol]
+        return self._download(period, interval)
+
+    def _download(self, period: str, interval: str) -> pd.DataFrame:
+        """Load OHLCV history, fetching from yfinance only the tail missing from `candle_store`.
+
+        Closed candles are appended to the store; the last (possibly still forming)
+        candle always comes from upstream. If upstream is unavailable the stored history
+        is returned as-is. Raises if neither source has data.
+        """
+        lookback = period_to_timedelta(period)
+        start = pd.Timestamp.now(tz="UTC") - lookback if lookback else None
+        stored = candle_store.read(self.symbol, interval, start=start)
 
         try:
             ticker = yf.Ticker(self.symbol)
-            df = ticker.history(period=period, interval=interval)
-            if df.empty:
-                return self._get_fallback_data()
-            self._cached_data = df
-            self._cache_time = now
-            return df
+            if len(stored):
+                upstream = ticker.history(start=stored.index[-1], interval=interval)
+            else:
+                upstream = ticker.history(period=period, interval=interval)
+            upstream = upstream.dropna(subset=["Close"])
         except Exception:
-            return self._get_fallback_data()
+            upstream = pd.DataFrame()
+
+        if upstream.empty:
+            if stored.empty:
+                raise ValueError(f"No market data returned for {self.symbol}")
+            return stored
+
+        upstream = upstream[list(CANDLE_COLUMNS)]
+        candle_store.append(self.symbol, interval, upstream.iloc[:-1])
+        if stored.empty:
+            return upstream
+        return pd.concat([stored[stored.index < upstream.index[0]], upstream])
+
+    def get_price_history_arrays(
+        self,
+        history: pd.DataFrame,
+        interval: Optional[str] = None,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (UTC-ns timestamps, close, volume) arrays for `start <= t <= end`.
+
+        Ranges reaching back before the in-memory `history` are filled from
+        `candle_store` (memory-mapped slices of the `interval` series, default
+        `MARKET_POLL_INTERVAL`), followed by the newer in-memory candles.
+        """
+        h_ts = history.index.as_unit("ns").asi8
+        h_close = history["Close"].to_numpy(dtype=np.float64)
+        h_volume = history["Volume"].to_numpy(dtype=np.float64)
+
+        lo = int(np.searchsorted(h_ts, start.value, side="left")) if start is not None else 0
+        hi = int(np.searchsorted(h_ts, end.value, side="right")) if end is not None else len(h_ts)
+        if start is None or (len(h_ts) and start.value >= h_ts[0]):
+            return h_ts[lo:hi], h_close[lo:hi], h_volume[lo:hi]
+
+        stored = candle_store.read_arrays(self.symbol, interval or settings.MARKET_POLL_INTERVAL, start, end)
+        cutoff = int(np.searchsorted(stored["ts"], h_ts[0])) if len(h_ts) else len(stored["ts"])
+        return (
+            np.concatenate([stored["ts"][:cutoff], h_ts[lo:hi]]),
+            np.concatenate([stored["Close"][:cutoff], h_close[lo:hi]]),
+            np.concatenate([stored["Volume"][:cutoff], h_volume[lo:hi]]),
+        )
 
     def _get_fallback_data(self) -> pd.DataFrame:
-        """Return fallback data when yfinance fails."""
-        dates = pd.date_range(end=datetime.now(), periods=100, freq="5min")
-        base_price = 1.0850
-        prices = [base_price + (i % 20 - 10) * 0.0001 for i in range(100)]
-        return pd.DataFrame({
-            "Open": prices,
-            "High": [p + 0.0005 for p in prices],
-            "Low": [p - 0.0005 for p in prices],
-            "Close": prices,
-            "Volume": [1000000 + i * 10000 for i in range(100)]
-        }, index=dates)
-
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> float:
-        """Calculate RSI (Relative Strength Index)."""
-        if len(prices) < period + 1:
-            return 50.0
-
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-
-        current_rsi = rsi.iloc[-1]
-        if pd.isna(current_rsi):
-            return 50.0
-        return float(current_rsi)
-
-    def _calculate_atr(self, high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> float:
-        """Calculate ATR (Average True Range)."""
-        if len(close) < period + 1:
-            return 0.001
-
-        prev_close = close.shift(1)
-        tr1 = high - low
-        tr2 = abs(high - prev_close)
-        tr3 = abs(low - prev_close)
-
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=period).mean()
-
-        current_atr = atr.iloc[-1]
-        if pd.isna(current_atr):
-            return 0.001
-        return float(current_atr)
-
-    def calculate_indicators(self, df: pd.DataFrame) -> MarketIndicators:
-        """Calculate RSI, ATR, and Volume Ratio."""
-        if len(df) < 20:
-            return MarketIndicators(
-                rsi=50.0,
-                atr=0.001,
-                volume_ratio=1.0,
-                price_change_pct=0.0
-            )
+        """Return fallback data when yfinance fails: a seeded synthetic series for this symbol."""
+        return synthetic_market.generate([self.symbol], 100, start_price=1.0850)[self.symbol]
 
-        # RSI (14 periods)
-        current_rsi = self._calculate_rsi(df["Close"], period=14)
+    def calculate_indicators(self, df: pd.DataFrame, interval: Optional[str] = None, incremental: bool = True) -> MarketIndicators:
+        """Calculate RSI, ATR, and Volume Ratio.
 
-        # ATR (14 periods)
-        current_atr = self._calculate_atr(df["High"], df["Low"], df["Close"], period=14)
-
-        # Volume Ratio (current vs 20-period average)
-        current_volume = float(df["Volume"].iloc[-1])
-        avg_volume = float(df["Volume"].tail(20).mean())
-        volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1.0
+        With `incremental=True` the per-symbol running state in `indicator_engine` is
+        advanced by only the candles added since the last call; `interval` (default
+        `MARKET_POLL_INTERVAL`) names the series that state belongs to. Pass
+        `incremental=False` for frames that must not touch shared state (e.g.
+        simulated scenarios).
+        """
+        if len(df) < MIN_CANDLES:
+            return default_indicators()
 
-        # Price change percentage
-        current_price = float(df["Close"].iloc[-1])
-        prev_price = float(df["Close"].iloc[-2]) if len(df) > 1 else current_price
-        price_change_pct = ((current_price - prev_price) / prev_price) * 100 if prev_price > 0 else 0.0
-
-        return MarketIndicators(
-            rsi=round(current_rsi, 2),
-            atr=round(current_atr, 5),
-            volume_ratio=round(volume_ratio, 2),
-            price_change_pct=round(price_change_pct, 2)
-        )
+        if incremental:
+            return indicator_engine.indicators_for(self.symbol, interval or settings.MARKET_POLL_INTERVAL, df)
+        return IndicatorState.from_frame(df).snapshot()
 
     def detect_spike(self, df: pd.DataFrame, threshold_pct: float = 1.5) -> tuple[bool, Optional[str]]:
         """Detect if there's a significant price spike (>threshold% in recent candle)."""
@@ -133,142 +246,63 @@ class MarketIntelligenceService:
     def get_market_data(self, simulate_drop: bool = False, simulate_rise: bool = False) -> MarketData:
         """Get current market data with indicators."""
         df = self.fetch_market_data()
-
-        if simulate_drop:
-            df = self._simulate_drop(df)
-        elif simulate_rise:
-            df = self._simulate_rise(df)
-
-        indicators = self.calculate_indicators(df)
+        return self.build_market_data(df, simulate_drop=simulate_drop, simulate_rise=simulate_rise)
+
+    def build_market_data(
+        self,
+        df: pd.DataFrame,
+        simulate_drop: bool = False,
+        simulate_rise: bool = False,
+        interval: Optional[str] = None,
+    ) -> MarketData:
+        """Compute indicators and spike state for an already fetched history.
+
+        Simulations are evaluated by `scenario_engine` as an overlay on the latest
+        candle; `df` itself is never copied or modified.
+        """
+        if simulate_drop or simulate_rise:
+            market = scenario_engine.evaluate(df, [DROP if simulate_drop else RISE], symbol=self.symbol)[0]
+            return market.model_copy(update={
+                "is_spike": True,
+                "spike_direction": market.spike_direction or ("down" if simulate_drop else "up"),
+            })
+
+        indicators = self.calculate_indicators(df, interval=interval)
         is_spike, spike_direction = self.detect_spike(df)
 
         current_price = float(df["Close"].iloc[-1])
         previous_price = float(df["Close"].iloc[-2]) if len(df) > 1 else current_price
         change_pct = ((current_price - previous_price) / previous_price) * 100 if previous_price > 0 else 0.0
 
-        simulated = simulate_drop or simulate_rise
-        sim_direction = "down" if simulate_drop else ("up" if simulate_rise else None)
-
         return MarketData(
             symbol=self.symbol.replace("=X", ""),
             current_price=round(current_price, 5),
             previous_price=round(previous_price, 5),
             change_pct=round(change_pct, 2),
             indicators=indicators,
-            is_spike=is_spike or simulated,
-            spike_direction=spike_direction or sim_direction,
+            is_spike=is_spike,
+            spike_direction=spike_direction,
             timestamp=datetime.now()
         )
 
-    def get_market_with_news(self, simulate_drop: bool = False, simulate_rise: bool = False, news_limit: int = 3) -> MarketWithNewsResponse:
+    def get_market_with_news(
+        self,
+        simulate_drop: bool = False,
+        simulate_rise: bool = False,
+        news_limit: int = 3,
+        market_model: Optional[MarketData] = None,
+    ) -> MarketWithNewsResponse:
         """Return a MarketWithNewsResponse combining current market data and recent news headlines.
 
         - `simulate_drop`: whether to apply the 3% demo drop to the most recent candle
         - `news_limit`: maximum number of news items to return
+        - `market_model`: an already computed market model to attach instead of
+          recomputing it (see `MarketPoller.get_market_model`)
         """
-        # Fetch market model (already includes indicators)
-        market_model = self.get_market_data(simulate_drop=simulate_drop, simulate_rise=simulate_rise)
-
-        # Fetch news: prefer NewsAPI (if key present), otherwise fall back to yfinance
-        news_items = []
-
-        # Try NewsAPI first when configured
-        try:
-            settings = Settings()
-            if settings.NEWSAPI_KEY:
-                try:
-                    client = NewsApiClient(api_key=settings.NEWSAPI_KEY)
-                    # Use a simple query based on symbol (strip =X and replace slashes)
-                    q = self.symbol.replace("=X", "").replace("/", " ")
-                    resp = client.get_everything(q=q, language="en", page_size=news_limit, sort_by="publishedAt")
-                    articles = resp.get("articles", []) if isinstance(resp, dict) else []
-
-                    for art in articles:
-                        news_items.append({
-                            "title": art.get("title", ""),
-                            "link": art.get("url", ""),
-                            "publisher": (art.get("source") or {}).get("name", "") if isinstance(art.get("source"), dict) else art.get("source", ""),
-                            "time": art.get("publishedAt"),
-                            "summary": art.get("description") or art.get("content") or "",
-                        })
-                except Exception:
-                    # If NewsAPI fails, fall back to yfinance below
-                    news_items = []
-        except Exception:
-            pass
-
-        # Fall back to yfinance news when NewsAPI not available or returned nothing
-        if not news_items:
-            try:
-                ticker = yf.Ticker(self.symbol)
-                raw_news = getattr(ticker, "news", None)
-                if raw_news:
-                    for item in raw_news[:news_limit]:
-                        # yfinance news items vary by provider; be defensive
-                        provider_time = item.get("providerPublishTime") or item.get("time") or None
-                        published_at = None
-                        try:
-                            if provider_time:
-                                # provider_time is usually epoch seconds
-                                published_at = datetime.fromtimestamp(int(provider_time)).isoformat()
-                        except Exception:
-                            published_at = None
-
-                        news_items.append({
-                            "title": item.get("title") or item.get("headline") or "",
-                            "link": item.get("link") or item.get("url") or "",
-                            "publisher": item.get("publisher") or item.get("source") or "",
-                            "time": published_at,
-                            "summary": item.get("summary") or item.get("snippet") or "",
-                        })
-            except Exception:
-                # On any failure, return empty list for news
-                news_items = []
-
-        # Convert market model to primitive dict (pydantic v2 model_dump fallback to dict)
-        try:
-            market_dict = market_model.model_dump()
-        except Exception:
-            try:
-                market_dict = market_model.dict()
-            except Exception:
-                market_dict = {
-                    "symbol": market_model.symbol,
-                    "current_price": market_model.current_price,
-                    "change_pct": market_model.change_pct,
-                }
-
-        return MarketWithNewsResponse(market=market_dict, news=news_items)
-    
-    def _simulate_drop(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Simulate a 3% market drop for demo purposes."""
-        df = df.copy()
-        if len(df) < 2:
-            return df
-
-        # Simulate 3% drop
-        drop_factor = 0.97
-        df.iloc[-1, df.columns.get_loc("Close")] *= drop_factor
-        df.iloc[-1, df.columns.get_loc("Low")] *= drop_factor
-
-        # Simulate volume spike
-        df.iloc[-1, df.columns.get_loc("Volume")] *= 2.5
-
-        return df
-
-    def _simulate_rise(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Simulate an 8% market rise for demo purposes."""
-        df = df.copy()
-        if len(df) < 2:
-            return df
-
-        # Simulate 8% rise
-        rise_factor = 1.08
-        df.iloc[-1, df.columns.get_loc("Close")] *= rise_factor
-        df.iloc[-1, df.columns.get_loc("High")] *= rise_factor
-
-        # Simulate volume spike
-        df.iloc[-1, df.columns.get_loc("Volume")] *= 3.0
+        if market_model is None:
+            market_model = self.get_market_data(simulate_drop=simulate_drop, simulate_rise=simulate_rise)
 
-        return df
+        news_items = news_service.get_news(self.symbol, limit=news_limit)
 
+        # Both parts are already validated models; skip re-validation.
+        return MarketWithNewsResponse.model_construct(market=market_model, news=news_items)
@@ -0,0 +1,255 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+import pandas as pd
+
+from app.config import Settings
+from app.models.schemas import MarketData
+from app.services.cache import SharedCache
+from app.services.candle_store import INTERVAL_SECONDS, candle_store, period_to_timedelta
+from app.services.market_intelligence import MarketIntelligenceService
+
+settings = Settings()
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """Precomputed market state for one symbol as of its latest candle.
+
+    Snapshots are shared between requests and must be treated as read-only,
+    including the `history` frame.
+    """
+    symbol: str
+    interval: str
+    history: pd.DataFrame
+    market_data: MarketData
+    candle_time: datetime
+    computed_at: float
+
+
+class MarketPoller:
+    """Background scheduler that refreshes watchlist snapshots on each candle boundary.
+
+    Symbols in the configured watchlist are always polled. Any other symbol requested
+    through `get_snapshot` is adopted into the watchlist and dropped again once it has
+    not been requested for `idle_seconds`. Retained symbols (e.g. ones with open
+    streams) are additionally refreshed every `hot_poll_seconds` between boundaries,
+    and every published snapshot is handed to the registered listeners. Drop
+    listeners are told when a symbol leaves the poll set.
+    """
+
+    def __init__(
+        self,
+        watchlist: list[str],
+        interval: str = "5m",
+        delay_seconds: float = 5.0,
+        idle_seconds: float = 1800.0,
+        concurrency: int = 8,
+        hot_poll_seconds: float = 30.0,
+    ):
+        self.interval = interval
+        self.interval_seconds = INTERVAL_SECONDS.get(interval, 300)
+        self.delay_seconds = delay_seconds
+        self.idle_seconds = idle_seconds
+        self.concurrency = concurrency
+        self.hot_poll_seconds = hot_poll_seconds
+        self._pinned = set(watchlist)
+        self._retained: dict[str, int] = {}
+        self._listeners: list[Callable[[MarketSnapshot], None]] = []
+        self._drop_listeners: list[Callable[[str], None]] = []
+        self._last_access: dict[str, float] = {}
+        self._snapshots: dict[str, MarketSnapshot] = {}
+        self._simulated = SharedCache(ttl_seconds=2 * self.interval_seconds, max_entries=256)
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def symbols(self) -> list[str]:
+        with self._lock:
+            return sorted(self._pinned | set(self._last_access) | set(self._retained))
+
+    def retain(self, symbol: str) -> None:
+        """Keep `symbol` polled (and hot) until a matching `release`."""
+        with self._lock:
+            self._retained[symbol] = self._retained.get(symbol, 0) + 1
+
+    def release(self, symbol: str) -> None:
+        with self._lock:
+            count = self._retained.get(symbol, 0) - 1
+            if count > 0:
+                self._retained[symbol] = count
+            else:
+                self._retained.pop(symbol, None)
+                self._last_access.setdefault(symbol, time.monotonic())
+
+    def add_listener(self, listener: Callable[[MarketSnapshot], None]) -> None:
+        """Register a callback invoked on the event loop for every polled snapshot."""
+        self._listeners.append(listener)
+
+    def add_drop_listener(self, listener: Callable[[str], None]) -> None:
+        """Register a callback invoked on the event loop when a symbol stops being polled."""
+        self._drop_listeners.append(listener)
+
+    def refresh(self, symbol: str, force: bool = False) -> MarketSnapshot:
+        """Fetch the latest history for `symbol` and publish a new snapshot.
+
+        Raises `MarketDataUnavailable` if the fetch fails; synthetic fallback data is
+        never published or handed to listeners.
+        """
+        service = MarketIntelligenceService(symbol=symbol)
+        df = service.fetch_market_data(interval=self.interval, refresh=force, fallback=False)
+        return self._publish(symbol, df)
+
+    def _publish(self, symbol: str, df: pd.DataFrame) -> MarketSnapshot:
+        service = MarketIntelligenceService(symbol=symbol)
+        snapshot = MarketSnapshot(
+            symbol=symbol,
+            interval=self.interval,
+            history=df,
+            market_data=service.build_market_data(df, interval=self.interval),
+            candle_time=df.index[-1].to_pydatetime(),
+            computed_at=time.monotonic(),
+        )
+        self._snapshots[symbol] = snapshot
+        return snapshot
+
+    def warm_start(self) -> None:
+        """Publish snapshots for the watchlist from `candle_store` without any network fetch."""
+        lookback = period_to_timedelta(settings.MARKET_HISTORY_PERIOD)
+        start = pd.Timestamp.now(tz="UTC") - lookback if lookback else None
+        for symbol in self.symbols:
+            df = candle_store.read(symbol, self.interval, start=start)
+            if len(df):
+                self._publish(symbol, df)
+
+    def get_snapshot(self, symbol: str) -> MarketSnapshot:
+        """Return the latest snapshot, computing it inline only on first use or if stale.
+
+        A symbol is adopted into the poll set only once a real fetch has succeeded, so
+        unknown tickers raise `MarketDataUnavailable` without being polled afterwards.
+        """
+        now = time.monotonic()
+        snapshot = self._snapshots.get(symbol)
+        # If the scheduler isn't running (or fell behind), don't serve stale data forever.
+        if snapshot is None or now - snapshot.computed_at > 2 * self.interval_seconds:
+            snapshot = self.refresh(symbol)
+
+        with self._lock:
+            if symbol not in self._pinned:
+                self._last_access[symbol] = now
+        return snapshot
+
+    def peek(self, symbol: str) -> Optional[MarketSnapshot]:
+        """The latest published snapshot for `symbol`, without fetching or adopting it."""
+        return self._snapshots.get(symbol)
+
+    def get_market_model(self, symbol: str, simulate_drop: bool = False, simulate_rise: bool = False) -> MarketData:
+        """Market model for the latest candle, computed once per (symbol, candle, simulation mode).
+
+        The unsimulated model is the snapshot's own; simulated variants are built from
+        the snapshot history on first use and shared until the candle changes.
+        """
+        snapshot = self.get_snapshot(symbol)
+        if not (simulate_drop or simulate_rise):
+            return snapshot.market_data
+
+        mode = "drop" if simulate_drop else "rise"
+        # The close is part of the key so revisions of a forming candle are not missed.
+        key = (symbol, snapshot.candle_time, snapshot.market_data.current_price, mode)
+        return self._simulated.get_or_load(
+            key,
+            lambda: MarketIntelligenceService(symbol=symbol).build_market_data(
+                snapshot.history,
+                simulate_drop=simulate_drop,
+                simulate_rise=simulate_rise,
+                interval=self.interval,
+            ),
+        )
+
+    def _age_out_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_seconds
+        dropped = []
+        with self._lock:
+            idle = [s for s, seen in self._last_access.items() if seen < cutoff]
+            for symbol in idle:
+                del self._last_access[symbol]
+                if symbol not in self._retained:
+                    self._snapshots.pop(symbol, None)
+                    if symbol not in self._pinned:
+                        dropped.append(symbol)
+        for symbol in dropped:
+            for listener in self._drop_listeners:
+                try:
+                    listener(symbol)
+                except Exception as e:
+                    print(f"Market poller drop listener failed for {symbol}: {e}")
+
+    async def poll_once(self, symbols: Optional[list[str]] = None) -> None:
+        """Refresh `symbols` (default: every active symbol), at most `concurrency` at a time."""
+        if symbols is None:
+            self._age_out_idle()
+            symbols = self.symbols
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _refresh(symbol: str) -> None:
+            async with semaphore:
+                try:
+                    snapshot = await asyncio.to_thread(self.refresh, symbol, True)
+                except Exception as e:
+                    print(f"Market poller failed to refresh {symbol}: {e}")
+                    return
+            for listener in self._listeners:
+                try:
+                    listener(snapshot)
+                except Exception as e:
+                    print(f"Market poller listener failed for {symbol}: {e}")
+
+        await asyncio.gather(*(_refresh(symbol) for symbol in symbols))
+
+    def _seconds_until_next_candle(self) -> float:
+        now = time.time()
+        next_boundary = (now // self.interval_seconds + 1) * self.interval_seconds
+        return next_boundary - now + self.delay_seconds
+
+    async def _run(self) -> None:
+        next_candle = 0.0
+        while True:
+            if time.time() >= next_candle:
+                await self.poll_once()
+                next_candle = time.time() + self._seconds_until_next_candle()
+            else:
+                with self._lock:
+                    hot = sorted(self._retained)
+                if hot:
+                    await self.poll_once(hot)
+            wait = next_candle - time.time()
+            if self._retained:
+                wait = min(wait, self.hot_poll_seconds)
+            await asyncio.sleep(max(wait, 0.0))
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+market_poller = MarketPoller(
+    watchlist=settings.MARKET_WATCHLIST,
+    interval=settings.MARKET_POLL_INTERVAL,
+    delay_seconds=settings.MARKET_POLL_DELAY_SECONDS,
+    idle_seconds=settings.MARKET_POLL_IDLE_SECONDS,
+    concurrency=settings.MARKET_POLL_CONCURRENCY,
+    hot_poll_seconds=settings.MARKET_STREAM_POLL_SECONDS,
+)
@@ -0,0 +1,123 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.config import Settings
+from app.services.market_poller import MarketSnapshot, market_poller
+
+settings = Settings()
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    """One serialized market update, shared by every subscriber of a symbol."""
+    event: str  # "snapshot" | "candle" | "spike"
+    data: str   # MarketData as JSON
+
+    def as_sse(self) -> str:
+        return f"event: {self.event}\ndata: {self.data}\n\n"
+
+    def as_json(self) -> str:
+        return f'{{"event": {json.dumps(self.event)}, "data": {self.data}}}'
+
+
+@dataclass(eq=False)
+class Subscription:
+    """Per-connection bounded buffer. When full, the oldest update is dropped."""
+    symbol: str
+    queue: asyncio.Queue
+    dropped: int = field(default=0)
+
+    def offer(self, event: StreamEvent) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class MarketStreamHub:
+    """Fans poller snapshots out to streaming subscribers.
+
+    A symbol is pushed only when a new candle appears or `detect_spike` starts firing,
+    and the payload is serialized once per update regardless of subscriber count.
+    Subscribed symbols are retained by the poller so they are refreshed between candle
+    boundaries and never aged out while someone is listening.
+    """
+
+    def __init__(self, buffer_size: int = 16):
+        self.buffer_size = buffer_size
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._last_state: dict[str, tuple] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, symbol: str) -> Subscription:
+        subscription = Subscription(symbol=symbol, queue=asyncio.Queue(maxsize=self.buffer_size))
+        subscribers = self._subscribers.setdefault(symbol, set())
+        if not subscribers:
+            market_poller.retain(symbol)
+        subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.symbol)
+        if not subscribers:
+            return
+        subscribers.discard(subscription)
+        self.dropped += subscription.dropped
+        if not subscribers:
+            del self._subscribers[subscription.symbol]
+            self._last_state.pop(subscription.symbol, None)
+            market_poller.release(subscription.symbol)
+
+    def subscriber_count(self, symbol: Optional[str] = None) -> int:
+        if symbol is not None:
+            return len(self._subscribers.get(symbol, ()))
+        return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, snapshot: MarketSnapshot) -> None:
+        """Poller listener; must run on the event loop."""
+        subscribers = self._subscribers.get(snapshot.symbol)
+        if not subscribers:
+            return
+
+        market = snapshot.market_data
+        state = (snapshot.candle_time, market.is_spike, market.spike_direction)
+        previous = self._last_state.get(snapshot.symbol)
+        if previous == state:
+            return
+        self._last_state[snapshot.symbol] = state
+
+        if previous is not None and previous[0] == snapshot.candle_time:
+            if not market.is_spike:
+                # Same candle and the spike cleared; nothing worth pushing.
+                return
+            event_type = "spike"
+        else:
+            event_type = "spike" if market.is_spike else "candle"
+
+        event = StreamEvent(event=event_type, data=market.model_dump_json())
+        for subscription in subscribers:
+            subscription.offer(event)
+        self.published += 1
+
+    def initial_event(self, snapshot: MarketSnapshot) -> StreamEvent:
+        """Event sent on connect; later pushes are relative to this state."""
+        market = snapshot.market_data
+        self._last_state.setdefault(snapshot.symbol, (snapshot.candle_time, market.is_spike, market.spike_direction))
+        return StreamEvent(event="snapshot", data=snapshot.market_data.model_dump_json())
+
+    def stats(self) -> dict:
+        return {
+            "symbols": len(self._subscribers),
+            "subscribers": self.subscriber_count(),
+            "published": self.published,
+            "dropped": self.dropped + sum(
+                s.dropped for subs in self._subscribers.values() for s in subs
+            ),
+        }
+
+
+market_stream = MarketStreamHub(buffer_size=settings.MARKET_STREAM_BUFFER)
+market_poller.add_listener(market_stream.publish)
@@ -0,0 +1,142 @@
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+import yfinance as yf
+from newsapi import NewsApiClient
+
+from app.config import Settings
+from app.models.schemas import NewsItem
+from app.services.cache import SharedCache
+
+settings = Settings()
+
+
+def _headline_key(item: NewsItem) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", item.title.lower()).strip()
+
+
+def _unique(items: Iterable[NewsItem]) -> list[NewsItem]:
+    """`items` without untitled or repeated headlines, first occurrence kept."""
+    seen: set[str] = set()
+    unique = []
+    for item in items:
+        key = _headline_key(item)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(item)
+    return unique
+
+
+def _result(future: Future) -> list[NewsItem]:
+    try:
+        return future.result()
+    except Exception:
+        return []
+
+
+class NewsService:
+    """Recent headlines per symbol from NewsAPI and yfinance, cached per symbol.
+
+    Both providers are queried concurrently. The first provider to return `limit`
+    distinct headlines answers on its own and the other is cancelled (or, if it
+    already started, left to finish in the background and ignored). Short results
+    are merged in completion order and deduplicated by headline once every provider
+    has answered or the deadline passes.
+    Only non-empty results are cached, so a provider outage is retried on the
+    next request rather than pinned for the whole TTL.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, deadline_seconds: float = 2.0, max_workers: int = 8):
+        self.deadline_seconds = deadline_seconds
+        self.cache = SharedCache(ttl_seconds=ttl_seconds, max_entries=512)
+        self._client = NewsApiClient(api_key=settings.NEWSAPI_KEY) if settings.NEWSAPI_KEY else None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="news")
+
+    def get_news(self, symbol: str, limit: int = 3) -> list[NewsItem]:
+        try:
+            return self.cache.get_or_load((symbol, limit), lambda: self._fetch(symbol, limit))
+        except LookupError:
+            return []
+
+    def _providers(self) -> list[Callable[[str, int], list[NewsItem]]]:
+        providers = [self._from_yfinance]
+        if self._client is not None:
+            # NewsAPI first so it wins ties when both finish together.
+            providers.insert(0, self._from_newsapi)
+        return providers
+
+    def _fetch(self, symbol: str, limit: int) -> list[NewsItem]:
+        deadline = time.monotonic() + self.deadline_seconds
+        futures = [self._executor.submit(provider, symbol, limit) for provider in self._providers()]
+        pending = set(futures)
+        short: list[NewsItem] = []
+
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            # Provider order among futures that finished together.
+            for future in sorted(done, key=futures.index):
+                items = _unique(_result(future))
+                if len(items) >= limit:
+                    for other in pending:
+                        other.cancel()
+                    return items[:limit]
+                short.extend(items)
+
+        items = _unique(short)
+        if not items:
+            raise LookupError(f"No news for {symbol}")
+        return items[:limit]
+
+    def _from_newsapi(self, symbol: str, limit: int) -> list[NewsItem]:
+        # Use a simple query based on symbol (strip =X and replace slashes)
+        q = symbol.replace("=X", "").replace("/", " ")
+        resp = self._client.get_everything(q=q, language="en", page_size=limit, sort_by="publishedAt")
+        articles = resp.get("articles", []) if isinstance(resp, dict) else []
+
+        items = []
+        for art in articles:
+            source = art.get("source")
+            items.append(NewsItem(
+                title=art.get("title") or "",
+                link=art.get("url") or "",
+                publisher=(source or {}).get("name", "") if isinstance(source, dict) else (source or ""),
+                time=art.get("publishedAt"),
+                summary=art.get("description") or art.get("content") or "",
+            ))
+        return items
+
+    def _from_yfinance(self, symbol: str, limit: int) -> list[NewsItem]:
+        raw_news = getattr(yf.Ticker(symbol), "news", None) or []
+
+        items = []
+        for item in raw_news[:limit]:
+            # yfinance news items vary by provider; be defensive
+            provider_time = item.get("providerPublishTime") or item.get("time") or None
+            published_at: Optional[str] = None
+            try:
+                if provider_time:
+                    # provider_time is usually epoch seconds
+                    published_at = datetime.fromtimestamp(int(provider_time)).isoformat()
+            except Exception:
+                published_at = None
+
+            items.append(NewsItem(
+                title=item.get("title") or item.get("headline") or "",
+                link=item.get("link") or item.get("url") or "",
+                publisher=item.get("publisher") or item.get("source") or "",
+                time=published_at,
+                summary=item.get("summary") or item.get("snippet") or "",
+            ))
+        return items
+
+
+news_service = NewsService(
+    ttl_seconds=settings.NEWS_CACHE_TTL_SECONDS,
+    deadline_seconds=settings.NEWS_DEADLINE_SECONDS,
+)
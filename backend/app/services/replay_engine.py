@@ -0,0 +1,232 @@
+import asyncio
+import time
+from bisect import insort
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.llm import create_llm_client
+from app.models.schemas import MarketData, MarketWithNewsResponse, Trade
+from app.services.behavior_engine import BehaviorEngine
+from app.services.candle_store import INTERVAL_SECONDS, candle_store
+from app.services.claude_engine import AIEngine
+from app.services.indicator_engine import MIN_CANDLES, IndicatorState
+from app.services.market_intelligence import MarketIntelligenceService
+from app.services.synthetic_market import SyntheticMarket
+
+STAGES = ("indicators", "spike", "behavior", "llm")
+
+
+@dataclass
+class ReplayReport:
+    symbol: str
+    interval: str
+    candles: int = 0
+    trades: int = 0
+    spikes: int = 0
+    behavior_runs: int = 0
+    llm_calls: int = 0
+    elapsed_seconds: float = 0.0
+    stage_seconds: dict[str, float] = field(default_factory=lambda: dict.fromkeys(STAGES, 0.0))
+
+    @property
+    def candles_per_sec(self) -> float:
+        return self.candles / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def trades_per_sec(self) -> float:
+        return self.trades / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "symbol": self.symbol,
+            "interval": self.interval,
+            "candles": self.candles,
+            "trades": self.trades,
+            "spikes": self.spikes,
+            "behavior_runs": self.behavior_runs,
+            "llm_calls": self.llm_calls,
+            "elapsed_seconds": round(self.elapsed_seconds, 4),
+            "candles_per_sec": round(self.candles_per_sec, 1),
+            "trades_per_sec": round(self.trades_per_sec, 1),
+            "stage_seconds": {k: round(v, 4) for k, v in self.stage_seconds.items()},
+        }
+
+    def format(self) -> str:
+        lines = [
+            f"Replay {self.symbol} {self.interval}: {self.candles} candles, {self.trades} trades in {self.elapsed_seconds:.3f}s",
+            f"  {self.candles_per_sec:,.0f} candles/sec, {self.trades_per_sec:,.0f} trades/sec",
+            f"  {self.spikes} spikes, {self.behavior_runs} behavior runs, {self.llm_calls} LLM calls",
+        ]
+        for stage, seconds in self.stage_seconds.items():
+            share = seconds / self.elapsed_seconds * 100 if self.elapsed_seconds else 0.0
+            lines.append(f"  {stage:<10} {seconds:8.3f}s  {share:5.1f}%")
+        return "\n".join(lines)
+
+
+def synthetic_trades(candles: pd.DataFrame, count: int, symbol: str, seed: int = 0) -> list[Trade]:
+    """Seeded closed trades entered and exited on candle closes within `candles`."""
+    rng = np.random.default_rng(seed)
+    n = len(candles)
+    if n < 2 or count <= 0:
+        return []
+
+    close = candles["Close"].to_numpy(dtype=np.float64)
+    index = candles.index
+    entries = np.sort(rng.integers(0, n - 1, count))
+    holds = rng.integers(1, 12, count)
+    exits = np.minimum(entries + holds, n - 1)
+    sides = rng.random(count) < 0.5
+    sizes = rng.choice([0.5, 1.0, 1.0, 1.0, 2.0, 3.0], count)
+
+    trades = []
+    for i in range(count):
+        entry, exit_ = close[entries[i]], close[exits[i]]
+        direction = 1.0 if sides[i] else -1.0
+        trades.append(Trade(
+            id=f"replay-{i}",
+            symbol=symbol,
+            side="buy" if sides[i] else "sell",
+            size=float(sizes[i]),
+            entry_price=float(entry),
+            exit_price=float(exit_),
+            pnl=round(float((exit_ - entry) * direction * sizes[i] * 100000), 2),
+            timestamp=index[entries[i]].to_pydatetime(),
+            closed_at=index[exits[i]].to_pydatetime(),
+        ))
+    return trades
+
+
+class ReplayEngine:
+    """Streams historical candles and trades through the live market and behavior code.
+
+    Each candle is appended to a private `IndicatorState` (the incremental state
+    `indicator_engine` keeps per live series, so live state is never touched) and
+    checked with `detect_spike`. A trade becomes
+    visible once it has closed by the replayed candle's time, which re-runs
+    `analyze_trades` over the most recent `trade_window` visible trades. With an
+    LLM mode other than "off", every spike also requests an explanation and a
+    coaching message; "stub" uses the engine's offline fallbacks. `llm_calls` in the
+    report counts completions actually sent, so it is zero for "stub" and drops when
+    spikes share a cached or in-flight commentary.
+    """
+
+    def __init__(
+        self,
+        symbol: str = "EURUSD=X",
+        interval: str = "5m",
+        trade_window: int = 50,
+        spike_threshold_pct: float = 1.5,
+        llm: str = "off",
+    ):
+        if llm not in ("off", "stub", "live"):
+            raise ValueError(f"Unknown LLM mode: {llm}")
+        self.symbol = symbol
+        self.interval = interval
+        self.trade_window = trade_window
+        self.spike_threshold_pct = spike_threshold_pct
+        self.behavior_engine = BehaviorEngine()
+        self.llm = llm
+
+    def run(self, candles: pd.DataFrame, trades: Optional[list[Trade]] = None) -> ReplayReport:
+        report = ReplayReport(symbol=self.symbol, interval=self.interval)
+        stages = report.stage_seconds
+        service = MarketIntelligenceService(self.symbol)
+
+        pending = sorted(trades or [], key=lambda t: t.closed_at or t.timestamp)
+        pending_times = [t.closed_at or t.timestamp for t in pending]
+        visible: list[Trade] = []
+        next_trade = 0
+        behavior = None
+
+        candle_times = candles.index.to_pydatetime()
+        index = candles.index
+        high, low, close, volume = (
+            candles[column].to_numpy(dtype=np.float64).tolist() for column in ("High", "Low", "Close", "Volume")
+        )
+        # Seeded from the first MIN_CANDLES candles, then advanced one candle at a time.
+        first = max(min(MIN_CANDLES, len(candles)) - 1, 0)
+        state = IndicatorState()
+        # LLM calls run on one private event loop (and client) for the whole replay.
+        runner = asyncio.Runner() if self.llm != "off" else None
+        ai_engine = AIEngine(create_llm_client() if self.llm == "live" else None, endpoint="replay")
+
+        clock = time.perf_counter
+        started = clock()
+        try:
+            for i in range(first, len(candles)):
+                window = candles.iloc[:i + 1]
+
+                t0 = clock()
+                if i == first:
+                    state.rebuild(window)
+                else:
+                    state.update(index[i], high[i], low[i], close[i], volume[i])
+                indicators = state.snapshot()
+                t1 = clock()
+                is_spike, direction = service.detect_spike(window, threshold_pct=self.spike_threshold_pct)
+                t2 = clock()
+                stages["indicators"] += t1 - t0
+                stages["spike"] += t2 - t1
+                report.candles += 1
+
+                candle_close = candle_times[i] + timedelta(seconds=INTERVAL_SECONDS.get(self.interval, 300))
+                admitted = 0
+                while next_trade < len(pending) and pending_times[next_trade] <= candle_close:
+                    insort(visible, pending[next_trade], key=lambda t: t.timestamp)
+                    next_trade += 1
+                    admitted += 1
+                if admitted:
+                    del visible[:-self.trade_window]
+                    t3 = clock()
+                    behavior = self.behavior_engine.analyze_trades(visible)
+                    stages["behavior"] += clock() - t3
+                    report.trades += admitted
+                    report.behavior_runs += 1
+
+                if is_spike:
+                    report.spikes += 1
+                    if runner is not None:
+                        t4 = clock()
+                        runner.run(self._narrate(ai_engine, window, indicators, direction, behavior, candle_times[i]))
+                        stages["llm"] += clock() - t4
+        finally:
+            if runner is not None:
+                if ai_engine.client is not None:
+                    runner.run(ai_engine.client.close())
+                runner.close()
+
+        report.elapsed_seconds = clock() - started
+        report.llm_calls = ai_engine.completions
+        return report
+
+    async def _narrate(self, ai_engine: AIEngine, window: pd.DataFrame, indicators, direction: Optional[str], behavior, at: datetime) -> None:
+        current = float(window["Close"].iloc[-1])
+        previous = float(window["Close"].iloc[-2])
+        market = MarketWithNewsResponse(
+            market=MarketData(
+                symbol=self.symbol.replace("=X", ""),
+                current_price=round(current, 5),
+                previous_price=round(previous, 5),
+                change_pct=round((current - previous) / previous * 100, 2),
+                indicators=indicators,
+                is_spike=True,
+                spike_direction=direction,
+                timestamp=at,
+            ),
+            news=[],
+        )
+        await ai_engine.explain_with_coaching(market, behavior)
+
+
+def load_candles(symbol: str, interval: str, source: str, periods: int, seed: int = 0) -> pd.DataFrame:
+    """Candles for a replay: the last `periods` from `candle_store`, or a seeded synthetic series."""
+    if source == "store":
+        return candle_store.read(symbol, interval).iloc[-periods:]
+    if source == "synthetic":
+        return SyntheticMarket(seed=seed).generate([symbol], periods, interval)[symbol]
+    raise ValueError(f"Unknown candle source: {source}")
+
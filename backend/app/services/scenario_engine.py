@@ -0,0 +1,146 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app.models.schemas import MarketData, MarketIndicators, ScenarioSpec
+from app.services.indicator_engine import MIN_CANDLES, VOLUME_PERIOD, default_indicators, shocked_extended_indicators
+from app.services.indicator_kernels import window_indicators
+
+# Enough trailing candles for every indicator window plus the previous close.
+WINDOW = VOLUME_PERIOD + 1
+
+DROP = ScenarioSpec(name="drop", move_pct=-3.0, volume_multiplier=2.5)
+RISE = ScenarioSpec(name="rise", move_pct=8.0, volume_multiplier=3.0)
+PRESETS = {"drop": DROP, "rise": RISE}
+
+
+def _tail(df: pd.DataFrame, window: int) -> dict[str, np.ndarray]:
+    """Last `window` OHLCV rows as 1-D arrays, left-padded with NaN."""
+    tail = df[["Open", "High", "Low", "Close", "Volume"]].tail(window).to_numpy(dtype=np.float64)
+    padded = np.full((window, 5), np.nan)
+    if len(tail):
+        padded[window - len(tail):] = tail
+    return {c: padded[:, i] for i, c in enumerate(("Open", "High", "Low", "Close", "Volume"))}
+
+
+def overlay(base: dict[str, np.ndarray], scenarios: list[ScenarioSpec]) -> dict[str, np.ndarray]:
+    """Apply every scenario to the same trailing candles at once.
+
+    `base` holds 1-D OHLCV arrays for the last W candles; the result holds
+    (scenarios x W) arrays. Candles before each scenario's window are shared
+    unchanged. Within the window, shocks are applied in order:
+
+    - `vol_multiplier` scales each close/open's log distance from the close just
+      before the window, and each wick, by the multiplier;
+    - `move_pct` ramps geometrically from the window's first open to its last close;
+    - `gap_pct` shifts the whole window, so its first open gaps from the prior close;
+    - `volume_multiplier` scales volume.
+    """
+    width = len(base["Close"])
+    available = max(int(np.isfinite(base["Close"]).sum()), 1)
+    s = len(scenarios)
+    spec = np.array(
+        [(sc.move_pct, sc.vol_multiplier, sc.volume_multiplier, sc.gap_pct, min(sc.candles, available)) for sc in scenarios],
+        dtype=np.float64,
+    ).reshape(s, 5)
+    move, vol, volume_mult, gap, candles = (spec[:, i:i + 1] for i in range(5))
+
+    # Position within each scenario's window: 0..candles-1, negative before it.
+    k = np.arange(width)[None, :] - (width - candles)
+    inside = k >= 0
+
+    open_ = np.broadcast_to(base["Open"], (s, width))
+    high = np.broadcast_to(base["High"], (s, width))
+    low = np.broadcast_to(base["Low"], (s, width))
+    close = np.broadcast_to(base["Close"], (s, width))
+
+    # Volatility burst around the close preceding the window (or the window's first open).
+    start = (width - candles).astype(np.int64).ravel()
+    anchor_close = base["Close"][np.maximum(start - 1, 0)]
+    anchor = np.where((start > width - available) & np.isfinite(anchor_close), anchor_close, base["Open"][start])[:, None]
+    bursting = inside & (vol != 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        burst_open = anchor * np.exp(vol * np.log(open_ / anchor))
+        burst_close = anchor * np.exp(vol * np.log(close / anchor))
+    upper_wick = (high - np.maximum(open_, close)) * vol
+    lower_wick = (np.minimum(open_, close) - low) * vol
+    open_ = np.where(bursting, burst_open, open_)
+    close = np.where(bursting, burst_close, close)
+    high = np.where(bursting, np.maximum(open_, close) + upper_wick, high)
+    low = np.where(bursting, np.minimum(open_, close) - lower_wick, low)
+
+    # Geometric ramp of the total move: factor at each candle's open and close.
+    growth = 1.0 + move / 100.0
+    at_close = np.where(inside, growth ** ((k + 1) / candles), 1.0)
+    at_open = np.where(inside, growth ** (k / candles), 1.0)
+    level = np.where(inside, 1.0 + gap / 100.0, 1.0)
+
+    return {
+        "Open": open_ * at_open * level,
+        "High": high * np.maximum(at_open, at_close) * level,
+        "Low": low * np.minimum(at_open, at_close) * level,
+        "Close": close * at_close * level,
+        "Volume": np.where(inside, base["Volume"] * volume_mult, base["Volume"]),
+    }
+
+
+class ScenarioEngine:
+    """Evaluates what-if shocks on the latest candles of a history.
+
+    Only the trailing `WINDOW` candles that the indicators read are materialised;
+    the base history is never copied or modified. Many scenarios are evaluated
+    together as one (scenarios x WINDOW) array pass. The extended indicators
+    (EMA/MACD/Bollinger/VWAP/Stochastics) fold the unshocked history once and
+    append each scenario's window to a copy of that state.
+    """
+
+    def __init__(self, spike_threshold_pct: float = 1.5):
+        self.spike_threshold_pct = spike_threshold_pct
+
+    def overlay(self, df: pd.DataFrame, scenarios: list[ScenarioSpec]) -> dict[str, np.ndarray]:
+        return overlay(_tail(df, WINDOW), scenarios)
+
+    def evaluate(self, df: pd.DataFrame, scenarios: list[ScenarioSpec], symbol: str) -> list[MarketData]:
+        """Market model for `df` under each scenario, in the order given."""
+        if not scenarios:
+            return []
+        shocked = self.overlay(df, scenarios)
+        close = shocked["Close"]
+        enough_history = len(df) >= MIN_CANDLES
+        values = window_indicators(shocked["High"], shocked["Low"], close, shocked["Volume"])
+        extended = shocked_extended_indicators(df, shocked) if enough_history else None
+
+        now = datetime.now()
+        results = []
+        for row in range(len(scenarios)):
+            current_price = float(close[row, -1])
+            previous_price = float(close[row, -2]) if len(df) > 1 else current_price
+            change_pct = ((current_price - previous_price) / previous_price) * 100 if previous_price > 0 else 0.0
+
+            if enough_history and np.isfinite(values["atr"][row]):
+                indicators = MarketIndicators(
+                    rsi=round(float(values["rsi"][row]), 2),
+                    atr=round(float(values["atr"][row]), 5),
+                    volume_ratio=round(float(values["volume_ratio"][row]), 2),
+                    price_change_pct=round(float(values["price_change_pct"][row]), 2),
+                    **extended[row],
+                )
+            else:
+                indicators = default_indicators()
+
+            is_spike = abs(change_pct) >= self.spike_threshold_pct
+            results.append(MarketData(
+                symbol=symbol.replace("=X", ""),
+                current_price=round(current_price, 5),
+                previous_price=round(previous_price, 5),
+                change_pct=round(change_pct, 2),
+                indicators=indicators,
+                is_spike=is_spike,
+                spike_direction=("up" if change_pct > 0 else "down") if is_spike else None,
+                timestamp=now,
+            ))
+        return results
+
+
+scenario_engine = ScenarioEngine()
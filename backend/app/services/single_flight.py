@@ -0,0 +1,73 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent identical async calls into one.
+
+    The first `do(key, fn)` for a key starts `fn()` as a task; every call for the same
+    key arriving before it finishes awaits that task instead of starting its own, and
+    all of them receive its result or exception. Nothing is kept once the call
+    completes, so the next request starts a fresh one (pair with `SharedCache` for that).
+
+    Cancelling one caller never cancels the shared call while others still wait on it.
+    When the last waiter goes away the call is cancelled, since nobody can use its result.
+    Keys are only coalesced within one event loop.
+    """
+
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.abandoned = 0
+        self.peak_waiters = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _, key=key, flight=flight: self._finish(key, flight))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        self.peak_waiters = max(self.peak_waiters, flight.waiters)
+
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done():
+                self.cancelled += 1
+                if flight.waiters == 1:
+                    flight.task.cancel()
+                    self.abandoned += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _finish(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> dict:
+        lookups = self.calls + self.coalesced
+        return {
+            "in_flight": len(self._flights),
+            "waiters": sum(flight.waiters for flight in self._flights.values()),
+            "peak_waiters": self.peak_waiters,
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "cancelled_waiters": self.cancelled,
+            "abandoned_calls": self.abandoned,
+            "coalesce_rate": round(self.coalesced / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,190 @@
+import asyncio
+import math
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config import Settings
+from app.database import get_db
+from app.models.schemas import SpikeEvent, SpikeFeedResponse
+from app.services.batch_indicators import WINDOW, align_latest
+from app.services.candle_store import INTERVAL_SECONDS
+from app.services.indicator_kernels import window_indicators
+from app.services.market_intelligence import fetch_market_data_bulk
+from app.services.market_poller import market_poller
+
+settings = Settings()
+
+
+def scan_period(interval_seconds: int, candles: int = WINDOW + 1) -> str:
+    """Shortest history period (whole days) holding `candles` candles across a weekend close."""
+    return f"{math.ceil(2 * candles * interval_seconds / 86_400) + 2}d"
+
+
+class SpikeScanner:
+    """Sweeps a symbol universe once per candle and logs volatility-normalised spikes.
+
+    For each symbol the last closed candle's move is divided by its ATR; moves of at
+    least `z_threshold` ATRs are recorded in the `spike_events` table. Symbols the
+    poller has already refreshed past the candle close reuse its snapshot history and
+    ATR. The rest are fetched `chunk_size` at a time with bulk downloads of a short
+    `scan_period`, under cache keys of their own so the poller's entries are never
+    touched, and scored with array ops.
+    """
+
+    def __init__(
+        self,
+        universe: list[str],
+        interval: str = "5m",
+        z_threshold: float = 3.0,
+        chunk_size: int = 200,
+        delay_seconds: float = 5.0,
+    ):
+        self.universe = list(dict.fromkeys(universe))
+        self.interval = interval
+        self.interval_seconds = INTERVAL_SECONDS.get(interval, 300)
+        self.period = scan_period(self.interval_seconds)
+        self.z_threshold = z_threshold
+        self.chunk_size = chunk_size
+        self.delay_seconds = delay_seconds
+        self.last_sweep_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def scan(self, now: Optional[pd.Timestamp] = None) -> list[SpikeEvent]:
+        """Score the latest closed candle of every symbol in the universe."""
+        now = now or pd.Timestamp.now(tz="UTC")
+        forming_open = now.floor(f"{self.interval_seconds}s")
+        events: list[SpikeEvent] = []
+
+        for i in range(0, len(self.universe), self.chunk_size):
+            chunk = self.universe[i:i + self.chunk_size]
+            frames, known_atr = self._histories(chunk, forming_open)
+            symbols = [s for s in chunk if s in frames]
+            if not symbols:
+                continue
+
+            high, low, close, volume, enough_history, last_ts = align_latest(frames, symbols, before=forming_open)
+            atr = np.array([known_atr.get(s, np.nan) for s in symbols])
+            missing = np.isnan(atr)
+            if missing.any():
+                atr[missing] = window_indicators(high[missing], low[missing], close[missing], volume[missing])["atr"]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                z_scores = (close[:, -1] - close[:, -2]) / atr
+                change_pct = (close[:, -1] - close[:, -2]) / close[:, -2] * 100
+            flagged = enough_history & np.isfinite(z_scores) & (np.abs(z_scores) >= self.z_threshold)
+
+            for row in np.flatnonzero(flagged):
+                events.append(SpikeEvent(
+                    symbol=symbols[row],
+                    candle_time=pd.Timestamp(int(last_ts[row]), tz="UTC").to_pydatetime(),
+                    direction="up" if z_scores[row] > 0 else "down",
+                    change_pct=round(float(change_pct[row]), 2),
+                    z_score=round(float(z_scores[row]), 2),
+                ))
+
+        return events
+
+    def _histories(self, symbols: list[str], forming_open: pd.Timestamp) -> tuple[dict[str, pd.DataFrame], dict[str, float]]:
+        """Histories for `symbols`, plus the ATR of those taken from poller snapshots.
+
+        A snapshot is only used once it holds a candle opened at or after
+        `forming_open`, i.e. the candle being scored is complete in its history.
+        """
+        frames: dict[str, pd.DataFrame] = {}
+        atr: dict[str, float] = {}
+        fetch = []
+        for symbol in symbols:
+            snapshot = market_poller.peek(symbol)
+            if snapshot is not None and snapshot.interval == self.interval and snapshot.history.index[-1] >= forming_open:
+                frames[symbol] = snapshot.history
+                atr[symbol] = snapshot.market_data.indicators.atr
+            else:
+                fetch.append(symbol)
+        if fetch:
+            # Cached under `self.period`, which only the scanner uses, so the poller's
+            # histories are never replaced; entries expire long before the next candle.
+            frames.update(fetch_market_data_bulk(fetch, period=self.period, interval=self.interval))
+        return frames, atr
+
+    async def record(self, events: list[SpikeEvent]) -> None:
+        """Persist events; re-detections of the same (symbol, candle) are ignored."""
+        if not events:
+            return
+        db = get_db()
+        await db.executemany(
+            "INSERT OR IGNORE INTO spike_events (symbol, candle_time, direction, change_pct, z_score) VALUES (?, ?, ?, ?, ?)",
+            [(e.symbol, e.candle_time.isoformat(), e.direction, e.change_pct, e.z_score) for e in events],
+        )
+        await db.commit()
+
+    async def sweep_once(self) -> list[SpikeEvent]:
+        started = time.perf_counter()
+        events = await asyncio.to_thread(self.scan)
+        await self.record(events)
+        self.last_sweep_seconds = time.perf_counter() - started
+        return events
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep_once()
+            except Exception as e:
+                print(f"Spike scanner sweep failed: {e}")
+            now = time.time()
+            next_boundary = (now // self.interval_seconds + 1) * self.interval_seconds
+            await asyncio.sleep(next_boundary - now + self.delay_seconds)
+
+    async def start(self) -> None:
+        if self._task is None and self.universe:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def list_spike_events(
+    symbol: Optional[str] = None,
+    direction: Optional[str] = None,
+    limit: int = 50,
+    before_id: Optional[int] = None,
+) -> SpikeFeedResponse:
+    """Newest-first page of spike events; pass `next_before_id` back to get the next page."""
+    clauses, params = [], []
+    if symbol:
+        clauses.append("symbol = ?")
+        params.append(symbol)
+    if direction:
+        clauses.append("direction = ?")
+        params.append(direction)
+    if before_id is not None:
+        clauses.append("id < ?")
+        params.append(before_id)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    db = get_db()
+    cursor = await db.execute(
+        f"SELECT id, symbol, candle_time, direction, change_pct, z_score, detected_at FROM spike_events {where} ORDER BY id DESC LIMIT ?",
+        (*params, limit),
+    )
+    rows = await cursor.fetchall()
+    events = [SpikeEvent(**dict(r)) for r in rows]
+    next_before_id = events[-1].id if len(events) == limit else None
+    return SpikeFeedResponse(events=events, next_before_id=next_before_id)
+
+
+spike_scanner = SpikeScanner(
+    universe=settings.SPIKE_UNIVERSE,
+    interval=settings.MARKET_POLL_INTERVAL,
+    z_threshold=settings.SPIKE_Z_THRESHOLD,
+    chunk_size=settings.SPIKE_SCAN_CHUNK_SIZE,
+    # Sweep after the poller's boundary refresh so tracked symbols reuse its snapshots.
+    delay_seconds=2 * settings.MARKET_POLL_DELAY_SECONDS,
+)
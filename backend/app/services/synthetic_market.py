@@ -0,0 +1,182 @@
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config import Settings
+from app.services.candle_store import INTERVAL_SECONDS, period_to_timedelta
+
+settings = Settings()
+
+_SECONDS_PER_YEAR = 365 * 24 * 3600
+# Retained per live series; older candles are dropped as the series grows.
+_MAX_LIVE_CANDLES = 20_000
+
+
+@dataclass(frozen=True)
+class JumpDiffusion:
+    """Merton jump-diffusion parameters, annualised where relevant."""
+    drift: float = 0.0
+    volatility: float = 0.10
+    jumps_per_day: float = 0.5
+    jump_mean: float = 0.0
+    jump_std: float = 0.004
+    base_volume: float = 1_000_000.0
+
+
+@dataclass
+class _Path:
+    """Random streams and latest close of one generated series."""
+    normals: np.random.Generator
+    uniforms: np.random.Generator
+    close: float
+
+
+def _simulate(paths: list[_Path], periods: int, step_seconds: int, params: JumpDiffusion, ts: np.ndarray) -> dict[str, np.ndarray]:
+    """Advance every path by `periods` candles; returns 2-D (symbols, periods) columns.
+
+    Each path draws from its own streams in candle order, so a series is identical
+    whether it is generated in one call or extended a few candles at a time.
+    """
+    n = len(paths)
+    dt = step_seconds / _SECONDS_PER_YEAR
+    sigma_dt = params.volatility * np.sqrt(dt)
+    jump_prob = min(params.jumps_per_day * step_seconds / 86400, 1.0)
+
+    z = np.empty((n, periods, 4))
+    u = np.empty((n, periods))
+    for row, path in enumerate(paths):
+        z[row] = path.normals.standard_normal((periods, 4))
+        u[row] = path.uniforms.random(periods)
+
+    jumps = np.where(u < jump_prob, params.jump_mean + params.jump_std * z[:, :, 1], 0.0)
+    log_returns = (params.drift - 0.5 * params.volatility ** 2) * dt + sigma_dt * z[:, :, 0] + jumps
+
+    start = np.array([p.close for p in paths])[:, None]
+    close = start * np.exp(np.cumsum(log_returns, axis=1))
+    open_ = np.concatenate([start, close[:, :-1]], axis=1)
+    high = np.maximum(open_, close) * np.exp(0.5 * sigma_dt * np.abs(z[:, :, 2]))
+    low = np.minimum(open_, close) * np.exp(-0.5 * sigma_dt * np.abs(z[:, :, 3]))
+
+    # Intraday seasonality peaking at the London/New York overlap, with activity
+    # rising on large moves and lognormal noise on top.
+    hours = (ts // 1_000_000_000 % 86400) / 3600.0
+    seasonality = 1.0 + 0.5 * np.cos(2 * np.pi * (hours - 14.0) / 24.0)
+    surprise = np.abs(log_returns) / sigma_dt
+    noise = np.exp(0.35 * (u * 2.0 - 1.0) + 0.25 * z[:, :, 2])
+    volume = np.round(params.base_volume * seasonality * (1.0 + 0.5 * surprise) * noise)
+
+    for row, path in enumerate(paths):
+        path.close = float(close[row, -1])
+
+    return {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}
+
+
+class SyntheticMarket:
+    """Seeded, vectorised OHLCV generator for offline load tests and benchmarks.
+
+    Prices follow a jump-diffusion per symbol; volume follows an intraday curve
+    and scales with the size of each move. Output depends only on the seed, the
+    symbol, the interval and the requested candle range, and many symbols are
+    simulated together as 2-D arrays.
+
+    `generate` is pure. `history` backs the "synthetic" market data source: series
+    are extended forward as time passes, so a symbol's past candles never change
+    between refreshes (which keeps incremental indicator state valid).
+    """
+
+    def __init__(self, seed: int = 0, params: JumpDiffusion = JumpDiffusion()):
+        self.seed = seed
+        self.params = params
+        self._lock = threading.Lock()
+        self._live: dict[tuple[str, str], tuple[pd.DataFrame, _Path]] = {}
+
+    def _path(self, symbol: str, interval: str, start_price: Optional[float] = None) -> _Path:
+        entropy = [self.seed, zlib.crc32(symbol.encode()), zlib.crc32(interval.encode())]
+        normals, uniforms, level = (np.random.default_rng(s) for s in np.random.SeedSequence(entropy).spawn(3))
+        if start_price is None:
+            start_price = float(np.exp(level.uniform(np.log(0.5), np.log(500.0))))
+        return _Path(normals=normals, uniforms=uniforms, close=start_price)
+
+    @staticmethod
+    def _timestamps(periods: int, step_seconds: int, end: Optional[pd.Timestamp]) -> np.ndarray:
+        step_ns = step_seconds * 1_000_000_000
+        end = end or pd.Timestamp.now(tz="UTC")
+        last = pd.Timestamp(end).value // step_ns * step_ns
+        return last - step_ns * np.arange(periods - 1, -1, -1, dtype=np.int64)
+
+    def generate_arrays(
+        self,
+        symbols: list[str],
+        periods: int,
+        interval: str = "5m",
+        end: Optional[pd.Timestamp] = None,
+        start_price: Optional[float] = None,
+    ) -> dict[str, np.ndarray]:
+        """2-D (symbols, periods) OHLCV columns plus "ts" (UTC ns) ending at `end`."""
+        step_seconds = INTERVAL_SECONDS.get(interval, 300)
+        ts = self._timestamps(periods, step_seconds, end)
+        paths = [self._path(s, interval, start_price) for s in symbols]
+        arrays = _simulate(paths, periods, step_seconds, self.params, ts)
+        arrays["ts"] = ts
+        return arrays
+
+    def generate(
+        self,
+        symbols: list[str],
+        periods: int,
+        interval: str = "5m",
+        end: Optional[pd.Timestamp] = None,
+        start_price: Optional[float] = None,
+    ) -> dict[str, pd.DataFrame]:
+        """One OHLCV frame per symbol, `periods` candles ending at `end` (default: now)."""
+        arrays = self.generate_arrays(symbols, periods, interval, end, start_price)
+        index = pd.DatetimeIndex(arrays.pop("ts"), tz="UTC")
+        return {
+            symbol: pd.DataFrame({c: a[row] for c, a in arrays.items()}, index=index)
+            for row, symbol in enumerate(symbols)
+        }
+
+    def history(self, symbols: list[str], period: str, interval: str = "5m") -> dict[str, pd.DataFrame]:
+        """Live-source history for `period` up to the latest candle boundary."""
+        step_seconds = INTERVAL_SECONDS.get(interval, 300)
+        step_ns = step_seconds * 1_000_000_000
+        lookback = period_to_timedelta(period) or pd.Timedelta(days=60)
+        periods = max(int(lookback.total_seconds() // step_seconds), 2)
+        now_ns = pd.Timestamp.now(tz="UTC").value // step_ns * step_ns
+
+        with self._lock:
+            # Group series by how far they lag so each group advances in one pass.
+            pending: dict[int, list[str]] = {}
+            for symbol in symbols:
+                live = self._live.get((symbol, interval))
+                if live is None:
+                    lag = periods
+                else:
+                    lag = int((now_ns - live[0].index[-1].value) // step_ns)
+                if lag > 0:
+                    pending.setdefault(min(lag, _MAX_LIVE_CANDLES), []).append(symbol)
+
+            for lag, group in pending.items():
+                ts = now_ns - step_ns * np.arange(lag - 1, -1, -1, dtype=np.int64)
+                paths = []
+                for symbol in group:
+                    live = self._live.get((symbol, interval))
+                    paths.append(live[1] if live is not None else self._path(symbol, interval))
+                arrays = _simulate(paths, lag, step_seconds, self.params, ts)
+                index = pd.DatetimeIndex(ts, tz="UTC")
+                for row, symbol in enumerate(group):
+                    frame = pd.DataFrame({c: a[row] for c, a in arrays.items()}, index=index)
+                    live = self._live.get((symbol, interval))
+                    if live is not None:
+                        frame = pd.concat([live[0], frame]).iloc[-_MAX_LIVE_CANDLES:]
+                    self._live[(symbol, interval)] = (frame, paths[row])
+
+            return {s: self._live[(s, interval)][0].iloc[-periods:] for s in symbols}
+
+
+synthetic_market = SyntheticMarket(seed=settings.SYNTHETIC_SEED)
+
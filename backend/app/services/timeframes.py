@@ -0,0 +1,181 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.candle_store import COLUMNS, INTERVAL_SECONDS, candle_store, period_to_timedelta
+from app.services.indicator_engine import MIN_CANDLES
+
+DERIVED_INTERVALS = ("15m", "30m", "1h", "4h", "1d")
+_COLUMNS = pd.Index(COLUMNS)
+
+
+def can_derive(interval: str, base_interval: str) -> bool:
+    """Whether `interval` bars can be built from `base_interval` candles."""
+    base = INTERVAL_SECONDS.get(base_interval)
+    target = INTERVAL_SECONDS.get(interval)
+    return (
+        interval in DERIVED_INTERVALS and base is not None and target is not None
+        and target > base and target % base == 0
+    )
+
+
+def aggregate(ts: np.ndarray, ohlcv: np.ndarray, bucket_ns: int) -> tuple[np.ndarray, np.ndarray]:
+    """Fold sorted base candles into UTC-aligned buckets.
+
+    `ts` holds UTC ns and `ohlcv` the matching (rows x 5) Open/High/Low/Close/Volume
+    values. Returns (bucket start ns, bucketed rows x 5).
+    """
+    if len(ts) == 0:
+        return np.empty(0, dtype=np.int64), np.empty((0, 5))
+    buckets = ts // bucket_ns * bucket_ns
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+
+    bars = np.empty((len(starts), 5))
+    bars[:, 0] = ohlcv[starts, 0]
+    bars[:, 1] = np.fmax.reduceat(ohlcv[:, 1], starts)
+    bars[:, 2] = np.fmin.reduceat(ohlcv[:, 2], starts)
+    bars[:, 3] = ohlcv[ends, 3]
+    bars[:, 4] = np.add.reduceat(np.nan_to_num(ohlcv[:, 4]), starts)
+    return buckets[starts], bars
+
+
+def _ohlcv(df: pd.DataFrame, start: int) -> np.ndarray:
+    """Rows from `start` on as (rows x 5) floats, without copying the columns before it."""
+    return np.column_stack([df[column].to_numpy(dtype=np.float64)[start:] for column in COLUMNS])
+
+
+@dataclass
+class _Timeframe:
+    """Bars of one derived series: rows [0, count) have closed, row `count` is still forming.
+
+    Rows live in preallocated buffers, so closing a bar is an in-place write.
+    """
+    ts: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    bars: np.ndarray = field(default_factory=lambda: np.empty((0, 5)))
+    count: int = 0
+    seen: Optional[tuple] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class TimeframeResampler:
+    """Derives higher-timeframe candles from one base-interval series per symbol.
+
+    Bars that have closed are kept and never recomputed; each update only re-folds
+    the base candles belonging to the current (forming) bar and appends the bars it
+    closes, so the work per base candle is bounded by the bar size rather than the
+    history length. Returned frames are views over the stored bars, cut to the
+    requested `period` but never shorter than the bars the indicators need (at most
+    `max_bars` closed bars are kept). If the base history alone spans too few bars
+    for the indicators, older base candles are read from `candle_store` when the
+    series is first built. Buckets are aligned to UTC.
+    """
+
+    def __init__(self, max_bars: int = 2000):
+        self.max_bars = max_bars
+        self._lock = threading.Lock()
+        self._states: dict[tuple[str, str, str], _Timeframe] = {}
+
+    def _state(self, key: tuple[str, str, str]) -> _Timeframe:
+        with self._lock:
+            return self._states.setdefault(key, _Timeframe())
+
+    def resample(
+        self,
+        symbol: str,
+        base_interval: str,
+        df: pd.DataFrame,
+        interval: str,
+        period: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """`df` (base candles) as `interval` bars covering `period`, updated incrementally across calls.
+
+        The frame shares memory with the resampler: its last (forming) row is revised
+        in place by later updates, so callers must copy to keep a snapshot.
+        """
+        if df.empty:
+            return df
+        bucket_ns = INTERVAL_SECONDS[interval] * 1_000_000_000
+        index = df.index if df.index.tz is not None else df.index.tz_localize("UTC")
+        ts = index.tz_convert("UTC").as_unit("ns").asi8
+        last = df.iloc[-1]
+
+        state = self._state((symbol, base_interval, interval))
+        with state.lock:
+            seen = (int(ts[-1]), float(last["Close"]), float(last["Volume"]), len(ts))
+            if state.seen != seen:
+                current_start = state.ts[state.count] if state.seen is not None else None
+                if current_start is None or ts[0] > current_start or ts[-1] < current_start:
+                    values = _ohlcv(df, 0)
+                    self._rebuild(state, symbol, base_interval, ts, values, bucket_ns)
+                else:
+                    pos = int(np.searchsorted(ts, current_start))
+                    values = _ohlcv(df, pos)
+                    bar_ts, bars = aggregate(ts[pos:], values, bucket_ns)
+                    self._close_bars(state, bar_ts, bars)
+                state.seen = seen
+            return self._frame(state, index.tz, int(ts[-1]), period)
+
+    def _rebuild(self, state: _Timeframe, symbol: str, base_interval: str, ts: np.ndarray, values: np.ndarray, bucket_ns: int) -> None:
+        first_bucket = ts[0] // bucket_ns * bucket_ns
+        bars_available = (ts[-1] - first_bucket) // bucket_ns + 1
+        if bars_available <= MIN_CANDLES:
+            # Backfill from local history (no network) so indicators have enough bars.
+            start = pd.Timestamp(int(first_bucket - (MIN_CANDLES + 1) * bucket_ns), tz="UTC")
+            end = pd.Timestamp(int(ts[0]) - 1, tz="UTC")
+            stored = candle_store.read_arrays(symbol, base_interval, start, end)
+            if len(stored["ts"]):
+                older = np.column_stack([stored[c] for c in COLUMNS])
+                ts = np.concatenate([stored["ts"], ts])
+                values = np.concatenate([older, values])
+
+        bar_ts, bars = aggregate(ts, values, bucket_ns)
+        if ts[0] % bucket_ns and len(bar_ts) > 1:
+            # The oldest bar would only hold part of its bucket.
+            bar_ts, bars = bar_ts[1:], bars[1:]
+        # Fresh buffers, so frames handed out earlier keep their rows.
+        state.ts = np.empty(0, dtype=np.int64)
+        state.bars = np.empty((0, 5))
+        state.count = 0
+        self._close_bars(state, bar_ts, bars)
+
+    def _close_bars(self, state: _Timeframe, bar_ts: np.ndarray, bars: np.ndarray) -> None:
+        """Write all but the last bar as closed; the last one becomes the forming bar.
+
+        `bar_ts[0]` is either the current forming bar or a new one after it.
+        """
+        bar_ts, bars = bar_ts[-(self.max_bars + 1):], bars[-(self.max_bars + 1):]
+        end = state.count + len(bar_ts)
+        if end > len(state.ts):
+            # Out of room: carry the newest closed bars over to new buffers. Copying
+            # (rather than shifting in place) leaves earlier frames untouched.
+            keep = max(0, min(state.count, self.max_bars + 1 - len(bar_ts)))
+            capacity = 2 * (self.max_bars + 1)
+            ts_buffer = np.empty(capacity, dtype=np.int64)
+            bar_buffer = np.empty((capacity, 5))
+            ts_buffer[:keep] = state.ts[state.count - keep:state.count]
+            bar_buffer[:keep] = state.bars[state.count - keep:state.count]
+            state.ts, state.bars, state.count = ts_buffer, bar_buffer, keep
+            end = keep + len(bar_ts)
+        state.ts[state.count:end] = bar_ts
+        state.bars[state.count:end] = bars
+        state.count = end - 1
+
+    def _frame(self, state: _Timeframe, tz, latest_ns: int, period: Optional[str]) -> pd.DataFrame:
+        """View of the bars covering `period` before `latest_ns`, with at least MIN_CANDLES + 1 bars."""
+        end = state.count + 1
+        start = max(0, state.count - self.max_bars)
+        lookback = period_to_timedelta(period) if period else None
+        if lookback is not None:
+            cutoff = latest_ns - int(lookback.total_seconds() * 1_000_000_000)
+            # The first bar is the one containing the cutoff.
+            first = start + max(0, int(np.searchsorted(state.ts[start:end], cutoff, side="right")) - 1)
+            start = max(start, min(first, end - (MIN_CANDLES + 1)))
+        index = pd.DatetimeIndex(state.ts[start:end], tz="UTC").tz_convert(tz)
+        return pd.DataFrame(state.bars[start:end], index=index, columns=_COLUMNS, copy=False)
+
+
+timeframe_resampler = TimeframeResampler()
@@ -0,0 +1,39 @@
+"""Benchmark alert rule evaluation: `python -m scripts.bench_alerts` from `backend/`."""
+import argparse
+import random
+import time
+from typing import Optional
+
+from app.services.alert_engine import AlertIndex, _Rule
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark alert rule evaluation.")
+    parser.add_argument("--rules", type=int, default=1_000_000)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--updates", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    index = AlertIndex()
+    index.load([
+        _Rule(i, 0, rng.choice(symbols), "rsi", rng.choice("<>"), round(rng.uniform(0, 100), 1))
+        for i in range(args.rules)
+    ])
+
+    values = {s: 50.0 for s in symbols}
+    fired = 0
+    started = time.perf_counter()
+    for _ in range(args.updates):
+        symbol = rng.choice(symbols)
+        new = min(max(values[symbol] + rng.gauss(0, 0.5), 0.0), 100.0)
+        fired += len(index.crossed(symbol, "rsi", values[symbol], new))
+        values[symbol] = new
+    elapsed = time.perf_counter() - started
+    print(f"{args.rules:,} rules, {args.updates:,} updates in {elapsed:.3f}s: "
+          f"{elapsed / args.updates * 1e6:.2f} µs/update, {fired:,} firings")
+
+
+if __name__ == "__main__":
+    main()
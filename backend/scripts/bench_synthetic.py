@@ -0,0 +1,30 @@
+"""Benchmark the synthetic market generator: `python -m scripts.bench_synthetic` from `backend/`."""
+import argparse
+import time
+from typing import Optional
+
+from app.services.candle_store import INTERVAL_SECONDS
+from app.services.synthetic_market import SyntheticMarket
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the synthetic market generator.")
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--periods", type=int, default=2880)
+    parser.add_argument("--interval", default="5m", choices=sorted(INTERVAL_SECONDS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    market = SyntheticMarket(seed=args.seed)
+    symbols = [f"SYN{i:05d}" for i in range(args.symbols)]
+    started = time.perf_counter()
+    arrays = market.generate_arrays(symbols, args.periods, args.interval)
+    elapsed = time.perf_counter() - started
+    candles = args.symbols * args.periods
+    size_mb = sum(a.nbytes for a in arrays.values()) / 1e6
+    print(f"{candles:,} candles ({args.symbols} symbols x {args.periods}) in {elapsed:.3f}s: "
+          f"{candles / elapsed:,.0f} candles/sec, {size_mb:,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Replay candles and trades through the pipelines: `python -m scripts.replay` from `backend/`."""
+import argparse
+import json
+from typing import Optional
+
+from app.services.candle_store import INTERVAL_SECONDS
+from app.services.replay_engine import ReplayEngine, load_candles, synthetic_trades
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay candles and trades through the market and behavior pipelines.")
+    parser.add_argument("--symbol", default="EURUSD=X")
+    parser.add_argument("--interval", default="5m", choices=sorted(INTERVAL_SECONDS))
+    parser.add_argument("--source", default="synthetic", choices=["store", "synthetic"])
+    parser.add_argument("--candles", type=int, default=2880, help="Candles to replay (default: 10 days of 5m)")
+    parser.add_argument("--trades", type=int, default=500, help="Synthetic trades spread across the session")
+    parser.add_argument("--trade-window", type=int, default=50)
+    parser.add_argument("--llm", default="off", choices=["off", "stub", "live"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    candles = load_candles(args.symbol, args.interval, args.source, args.candles, seed=args.seed)
+    if candles.empty:
+        parser.error(f"No stored candles for {args.symbol} {args.interval}")
+    trades = synthetic_trades(candles, args.trades, args.symbol, seed=args.seed)
+
+    engine = ReplayEngine(args.symbol, args.interval, trade_window=args.trade_window, llm=args.llm)
+    report = engine.run(candles, trades)
+    print(json.dumps(report.as_dict(), indent=2) if args.json else report.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import os
+import tempfile
+
+os.environ.setdefault("MARKET_DATA_SOURCE", "synthetic")
+os.environ.setdefault("CANDLE_STORE_DIR", tempfile.mkdtemp(prefix="candles-"))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _make_candles(n: int, seed: int = 0, start: str = "2026-01-05", freq: str = "5min") -> pd.DataFrame:
+    """Seeded random-walk OHLCV candles on a UTC index (some with zero volume)."""
+    rng = np.random.default_rng(seed)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0.0, 0.001, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    wick = np.abs(rng.normal(0.0, 0.0005, n))
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close) + wick,
+            "Low": np.minimum(open_, close) - wick,
+            "Close": close,
+            "Volume": rng.integers(0, 1000, n).astype(np.float64),
+        },
+        index=pd.date_range(start, periods=n, freq=freq, tz="UTC"),
+    )
+
+
+@pytest.fixture
+def make_candles():
+    return _make_candles
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from app.services.alert_engine import ANY_SYMBOL, AlertEngine, AlertIndex, _Rule
+
+SYMBOLS = ("EURUSD=X", "GBPUSD=X", ANY_SYMBOL)
+INDICATORS = ("rsi", "price")
+
+
+def _random_rules(rng: np.random.Generator, count: int) -> list[_Rule]:
+    # Thresholds on a coarse grid, so duplicates and exact hits are common.
+    return [
+        _Rule(
+            id=i,
+            user_id=int(rng.integers(1, 4)),
+            symbol=str(rng.choice(SYMBOLS)),
+            indicator=str(rng.choice(INDICATORS)),
+            operator=str(rng.choice([">", "<"])),
+            threshold=float(rng.integers(0, 20) * 5),
+        )
+        for i in range(count)
+    ]
+
+
+def _brute_force(rules: list[_Rule], symbol: str, indicator: str, old: float, new: float) -> list[int]:
+    return sorted(
+        r.id for r in rules
+        if r.symbol in (symbol, ANY_SYMBOL) and r.indicator == indicator and (
+            (r.operator == ">" and old <= r.threshold < new)
+            or (r.operator == "<" and new < r.threshold <= old)
+        )
+    )
+
+
+def _index(rules: list[_Rule], bulk: bool) -> AlertIndex:
+    index = AlertIndex()
+    if bulk:
+        index.load(rules)
+    else:
+        for rule in rules:
+            index.add(rule)
+    return index
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_crossed_matches_brute_force(bulk):
+    rng = np.random.default_rng(18)
+    rules = _random_rules(rng, 400)
+    index = _index(rules, bulk)
+
+    for _ in range(2000):
+        symbol = str(rng.choice(SYMBOLS[:2]))
+        indicator = str(rng.choice(INDICATORS))
+        # Half the moves start or end exactly on a threshold.
+        old, new = (float(v) for v in rng.integers(-2, 22, 2) * 5 + rng.choice([0.0, 2.5], 2))
+        assert sorted(index.crossed(symbol, indicator, old, new)) == _brute_force(rules, symbol, indicator, old, new)
+
+
+def test_crossed_after_removals_matches_brute_force():
+    rng = np.random.default_rng(19)
+    rules = _random_rules(rng, 300)
+    index = _index(rules, bulk=True)
+    for rule_id in rng.permutation(len(rules))[:150].tolist():
+        assert index.remove(rule_id) == rules[rule_id]
+    remaining = [rules[i] for i in sorted(index.rules)]
+    assert len(index) == len(remaining)
+
+    for _ in range(1000):
+        symbol = str(rng.choice(SYMBOLS[:2]))
+        indicator = str(rng.choice(INDICATORS))
+        old, new = (float(v) for v in rng.integers(-2, 22, 2) * 5)
+        assert sorted(index.crossed(symbol, indicator, old, new)) == _brute_force(remaining, symbol, indicator, old, new)
+
+
+def test_remove_drops_empty_buckets():
+    index = AlertIndex()
+    index.add(_Rule(1, 1, "EURUSD=X", "rsi", ">", 70.0))
+    index.add(_Rule(2, 1, ANY_SYMBOL, "price", "<", 1.0))
+    assert index.indicators("EURUSD=X") == {"rsi", "price"}
+    index.remove(1)
+    assert not index.has_symbol("EURUSD=X")
+    assert index.indicators("EURUSD=X") == {"price"}
+    assert index.remove(1) is None
+
+
+def test_evaluate_fires_only_on_crossings_since_the_previous_values():
+    engine = AlertEngine()
+    engine.index.load([
+        _Rule(1, 1, "EURUSD=X", "rsi", ">", 70.0),
+        _Rule(2, 1, "EURUSD=X", "rsi", "<", 30.0),
+        _Rule(3, 2, ANY_SYMBOL, "rsi", ">", 50.0),
+    ])
+
+    def fired(values):
+        return sorted(e.rule_id for e in engine.evaluate("EURUSD=X", values))
+
+    assert fired({"rsi": 80.0}) == []  # baseline only
+    assert fired({"rsi": 40.0}) == []
+    assert fired({"rsi": 75.0}) == [1, 3]
+    assert fired({"rsi": 75.0}) == []
+    assert fired({"rsi": None}) == []  # missing values keep the previous baseline
+    assert fired({"rsi": 20.0}) == [2]
@@ -0,0 +1,63 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.cache import SharedCache
+
+
+def _cache() -> SharedCache:
+    return SharedCache(ttl_seconds=60, max_entries=100)
+
+
+def test_get_or_load_many_loads_only_missing_keys():
+    cache = _cache()
+    cache.put("a", 1)
+    calls = []
+
+    def loader(keys):
+        calls.append(keys)
+        return {key: key.upper() for key in keys if key != "c"}
+
+    assert cache.get_or_load_many(["a", "b", "c", "b"], loader) == {"a": 1, "b": "B"}
+    assert calls == [["b", "c"]]
+    # Keys the loader left out are not cached and are requested again next time.
+    assert cache.get_or_load_many(["b", "c"], loader) == {"b": "B"}
+    assert calls == [["b", "c"], ["c"]]
+
+
+def test_concurrent_callers_share_one_load_per_key():
+    cache = _cache()
+    started = threading.Event()
+    calls = []
+
+    def slow_loader(keys):
+        calls.append(list(keys))
+        started.set()
+        time.sleep(0.1)
+        return {key: key * 2 for key in keys}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        bulk = pool.submit(cache.get_or_load_many, ["x", "y"], slow_loader)
+        started.wait()
+        single = pool.submit(cache.get_or_load, "x", lambda: pytest.fail("x loaded twice"))
+        overlapping = pool.submit(cache.get_or_load_many, ["y", "z"], slow_loader)
+        assert bulk.result() == {"x": "xx", "y": "yy"}
+        assert single.result() == "xx"
+        assert overlapping.result() == {"y": "yy", "z": "zz"}
+
+    assert calls == [["x", "y"], ["z"]]
+    assert cache.coalesced == 2
+
+
+def test_failed_bulk_load_is_not_cached():
+    cache = _cache()
+
+    def failing(keys):
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load_many(["a"], failing)
+    assert cache.stats()["in_flight"] == 0
+    assert cache.get_or_load_many(["a"], lambda keys: {"a": 1}) == {"a": 1}
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("MARKET_DATA_SOURCE", "synthetic")
+os.environ.setdefault("CANDLE_STORE_DIR", tempfile.mkdtemp(prefix="candles-"))
+
+import httpx
+import pytest
+
+from app.main import app
+from app.services import claude_engine
+from app.services.claude_engine import AIEngine, get_ai_engine
+
+LLM_LATENCY_SECONDS = 0.2
+HEALTH_P99_BOUND_MS = 100.0
+
+
+class FakeCompletions:
+    """Slow stand-in for `AsyncOpenAI.chat.completions`.
+
+    The first turn of a conversation asks for `get_market_with_news`; the turn after
+    the tool result answers in plain text.
+    """
+
+    def __init__(self):
+        self.requests: list[list[dict]] = []
+
+    async def create(self, model, messages, **kwargs):
+        self.requests.append(messages)
+        await asyncio.sleep(LLM_LATENCY_SECONDS)
+        if messages[-1]["role"] == "user":
+            message = SimpleNamespace(
+                content="",
+                function_call=None,
+                tool_calls=[SimpleNamespace(
+                    id="call-1",
+                    function=SimpleNamespace(name="get_market_with_news", arguments='{"symbol": "EURUSD=X"}'),
+                )],
+            )
+        else:
+            message = SimpleNamespace(content="final answer", function_call=None, tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def fake_llm():
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    app.dependency_overrides[get_ai_engine] = lambda: AIEngine(client)
+    yield completions
+    app.dependency_overrides.pop(get_ai_engine, None)
+
+
+@pytest.fixture
+def slow_tool(monkeypatch):
+    """Make the market tool block its worker thread for `slow_tool.seconds`."""
+    state = SimpleNamespace(seconds=0.3)
+
+    def run_market_tool(self, symbol, simulate_drop, news_limit):
+        time.sleep(state.seconds)
+        return json.dumps({"symbol": symbol, "price": 1.085})
+
+    monkeypatch.setattr(AIEngine, "_run_market_tool", run_market_tool)
+    return state
+
+
+async def _post_chat(client: httpx.AsyncClient, text: str) -> httpx.Response:
+    return await client.post("/api/v1/chat", json={"messages": [{"role": "user", "content": text}]})
+
+
+def test_health_latency_stays_flat_with_50_chats_in_flight(fake_llm, slow_tool):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+            chats = [asyncio.create_task(_post_chat(client, f"how is the market {i}")) for i in range(50)]
+            await asyncio.sleep(LLM_LATENCY_SECONDS / 2)
+
+            latencies = []
+            while not all(chat.done() for chat in chats):
+                started = time.perf_counter()
+                response = await client.get("/health")
+                latencies.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200
+                await asyncio.sleep(0.02)
+            return await asyncio.gather(*chats), latencies
+
+    responses, latencies = asyncio.run(scenario())
+
+    assert all(r.status_code == 200 for r in responses)
+    assert all(r.json()["message"]["content"] == "final answer" for r in responses)
+    assert len(latencies) >= 20
+    p99 = sorted(latencies)[int(0.99 * (len(latencies) - 1))]
+    assert p99 < HEALTH_P99_BOUND_MS, f"/health p99 {p99:.1f}ms with 50 chats in flight"
+
+
+def test_tool_timeout_answers_without_tool_output(fake_llm, slow_tool, monkeypatch):
+    monkeypatch.setattr(claude_engine.settings, "CHAT_TOOL_TIMEOUT_SECONDS", 0.2)
+    slow_tool.seconds = 1.0
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+            started = time.perf_counter()
+            response = await _post_chat(client, "how is the market")
+            return response, time.perf_counter() - started
+
+    response, elapsed = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    assert response.json()["message"]["content"] == "final answer"
+    # Two model turns plus the tool timeout, without waiting for the tool itself.
+    assert elapsed < 2 * LLM_LATENCY_SECONDS + slow_tool.seconds
+    tool_result = json.loads(fake_llm.requests[-1][-1]["content"])
+    assert "error" in tool_result and "price" not in tool_result
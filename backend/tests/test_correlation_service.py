@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.schemas import MarketData
+from app.services.correlation_service import CorrelationService
+from app.services.indicator_engine import default_indicators
+from app.services.market_poller import MarketSnapshot
+
+WINDOW = 30
+SYMBOLS = ("A", "B", "C", "D")
+
+
+def _closes(n: int, seed: int = 17) -> pd.DataFrame:
+    """Correlated log-return random walks, one column per symbol."""
+    rng = np.random.default_rng(seed)
+    cov = np.array([
+        [1.0, 0.8, -0.5, 0.1],
+        [0.8, 1.0, -0.3, 0.0],
+        [-0.5, -0.3, 1.0, 0.2],
+        [0.1, 0.0, 0.2, 1.0],
+    ]) * 1e-6
+    returns = rng.multivariate_normal(np.zeros(len(SYMBOLS)), cov, n)
+    index = pd.date_range("2026-01-05", periods=n, freq="5min", tz="UTC")
+    return pd.DataFrame(np.exp(np.cumsum(returns, axis=0)), index=index, columns=list(SYMBOLS))
+
+
+def _snapshot(symbol: str, close: pd.Series) -> MarketSnapshot:
+    history = pd.DataFrame({"Close": close.to_numpy()}, index=close.index)
+    price = float(close.iloc[-1])
+    market = MarketData(
+        symbol=symbol, current_price=price, previous_price=price, change_pct=0.0,
+        indicators=default_indicators(), is_spike=False, timestamp=datetime.now(),
+    )
+    return MarketSnapshot(
+        symbol=symbol, interval="5m", history=history, market_data=market,
+        candle_time=close.index[-1].to_pydatetime(), computed_at=0.0,
+    )
+
+
+def _expected(closes: pd.DataFrame, symbols: list[str], end: int) -> np.ndarray:
+    returns = np.log(closes[symbols].to_numpy()[1:end] / closes[symbols].to_numpy()[:end - 1])
+    return np.corrcoef(returns[-WINDOW:].T)
+
+
+def _assert_matrix(service: CorrelationService, closes: pd.DataFrame, symbols: list[str], end: int) -> None:
+    response = service.correlations(symbols)
+    assert response.symbols == symbols
+    assert response.observations == WINDOW
+    np.testing.assert_allclose(np.array(response.matrix), _expected(closes, symbols, end), atol=1e-4)
+
+
+def test_rank_one_updates_match_corrcoef():
+    closes = _closes(400)
+    service = CorrelationService(interval="5m", window=WINDOW, max_symbols=8, top_k=2)
+    for end in range(40, len(closes) + 1):
+        for symbol in SYMBOLS[:3]:
+            service.on_snapshot(_snapshot(symbol, closes[symbol].iloc[:end]))
+        # "D" joins late and is backfilled from its own history.
+        if end >= 200:
+            service.on_snapshot(_snapshot("D", closes["D"].iloc[:end]))
+        if end in (100, 199):
+            _assert_matrix(service, closes, list(SYMBOLS[:3]), end)
+    _assert_matrix(service, closes, list(SYMBOLS), len(closes))
+
+    matrix = _expected(closes, list(SYMBOLS), len(closes))
+    peers = [p.symbol for p in service.peers("A")]
+    strongest = np.argsort(-np.abs(matrix[0, 1:]))[:2] + 1
+    assert peers == [SYMBOLS[i] for i in strongest]
+
+
+def test_drop_frees_the_slot_and_keeps_the_rest_exact():
+    closes = _closes(300, seed=23)
+    service = CorrelationService(interval="5m", window=WINDOW, max_symbols=4)
+    for end in range(40, 150):
+        for symbol in SYMBOLS:
+            service.on_snapshot(_snapshot(symbol, closes[symbol].iloc[:end]))
+
+    service.drop("B")
+    remaining = ["A", "C", "D"]
+    assert service.peers("B") is None
+    _assert_matrix(service, closes, remaining, 149)
+
+    # The remaining symbols keep committing without waiting for "B".
+    for end in range(150, 260):
+        for symbol in remaining:
+            service.on_snapshot(_snapshot(symbol, closes[symbol].iloc[:end]))
+    _assert_matrix(service, closes, remaining, 259)
+
+    # The freed slot can be reused even though max_symbols was reached before.
+    service.on_snapshot(_snapshot("B", closes["B"].iloc[:260]))
+    for end in range(260, 300):
+        for symbol in SYMBOLS:
+            service.on_snapshot(_snapshot(symbol, closes[symbol].iloc[:end]))
+    _assert_matrix(service, closes, list(SYMBOLS), 299)
+
+
+@pytest.mark.parametrize("missing_every", [5, 7])
+def test_stale_symbols_do_not_hold_back_the_others(missing_every):
+    closes = _closes(120, seed=29)
+    service = CorrelationService(interval="5m", window=WINDOW, max_symbols=4)
+    returns = np.log(closes.to_numpy()[1:] / closes.to_numpy()[:-1])
+    for end in range(40, len(closes) + 1):
+        for col, symbol in enumerate(SYMBOLS):
+            if symbol == "D" and end % missing_every == 0:
+                # The missed candle is committed flat once a newer one arrives, and "D",
+                # no longer active, doesn't hold back that newer candle either.
+                returns[end - 2:end, col] = 0.0
+                continue
+            service.on_snapshot(_snapshot(symbol, closes[symbol].iloc[:end]))
+    # A skip on the last poll leaves the newest candle pending.
+    committed = len(closes) - 1 if len(closes) % missing_every else len(closes) - 2
+    response = service.correlations()
+    np.testing.assert_allclose(
+        np.array(response.matrix), np.corrcoef(returns[:committed][-WINDOW:].T), atol=1e-4,
+    )
@@ -0,0 +1,55 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.services.downsampling import lttb_indices
+
+
+def _reference_lttb(x: list[float], y: list[float], threshold: int) -> list[int]:
+    """Straightforward scalar Largest-Triangle-Three-Buckets (Steinarsson, 2013)."""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    sampled = [0]
+    for i in range(threshold - 2):
+        avg_start = math.floor((i + 1) * every) + 1
+        avg_end = min(math.floor((i + 2) * every) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+
+        best, best_area = -1, -1.0
+        for j in range(math.floor(i * every) + 1, math.floor((i + 1) * every) + 1):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(best)
+        a = best
+    sampled.append(n - 1)
+    return sampled
+
+
+@pytest.mark.parametrize("n,threshold", [(10, 3), (100, 7), (1000, 50), (1001, 333), (5000, 4999), (2880, 500)])
+def test_lttb_matches_reference(n, threshold):
+    rng = np.random.default_rng(n + threshold)
+    x = np.cumsum(rng.integers(1, 4, n)).astype(np.float64)
+    y = np.cumsum(rng.normal(0, 1, n))
+    indices = lttb_indices(x, y, threshold)
+    assert indices.tolist() == _reference_lttb(x.tolist(), y.tolist(), threshold)
+    assert len(indices) == threshold
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_keeps_extremes_of_a_spike():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[437] = 10.0
+    y[712] = -10.0
+    kept = set(lttb_indices(x, y, 20).tolist())
+    assert {0, 437, 712, 999} <= kept
+
+
+@pytest.mark.parametrize("n,threshold", [(0, 10), (5, 10), (10, 10), (10, 2)])
+def test_lttb_returns_everything_when_no_reduction_is_possible(n, threshold):
+    x = np.arange(n, dtype=np.float64)
+    assert lttb_indices(x, x, threshold).tolist() == list(range(n))
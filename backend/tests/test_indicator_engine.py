@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from app.services.indicator_engine import IndicatorState, RollingWindow
+
+
+def _internals(state: IndicatorState) -> dict:
+    return {
+        "count": state.count,
+        "last": state._last,
+        "prev_close": state._prev_close,
+        "gain": state.gains.mean,
+        "loss": state.losses.mean,
+        "true_range": state.true_ranges.mean,
+        "volume": state.volumes.mean,
+        "gains_full": state.gains.full,
+        **state.extended.values(),
+    }
+
+
+def _assert_same_state(actual: IndicatorState, expected: IndicatorState) -> None:
+    got, want = _internals(actual), _internals(expected)
+    assert got.keys() == want.keys()
+    for key, value in want.items():
+        if isinstance(value, float):
+            assert got[key] == pytest.approx(value, rel=1e-9, abs=1e-12), key
+        elif isinstance(value, tuple):
+            assert got[key] == pytest.approx(value, rel=1e-12), key
+        else:
+            assert got[key] == value, key
+
+
+def test_rolling_window_replace_last_matches_fresh_window():
+    rng = np.random.default_rng(1)
+    window = RollingWindow(5)
+    values: list[float] = []
+    for _ in range(200):
+        value = float(rng.normal())
+        if values and rng.random() < 0.4:
+            window.replace_last(value)
+            values[-1] = value
+        else:
+            window.push(value)
+            values.append(value)
+        expected = values[-5:]
+        assert list(window._values) == expected
+        assert window.total == pytest.approx(sum(expected), abs=1e-12)
+
+
+def test_rolling_window_replace_last_after_seed():
+    window = RollingWindow(3)
+    window.seed([1.0, 2.0, 3.0, 4.0])
+    window.replace_last(10.0)
+    assert list(window._values) == [2.0, 3.0, 10.0]
+    assert window.total == pytest.approx(15.0)
+
+
+def test_update_matches_from_frame(make_candles):
+    df = make_candles(400)
+    state = IndicatorState.from_frame(df.iloc[:25])
+    for ts, row in df.iloc[25:].iterrows():
+        state.update(ts, row["High"], row["Low"], row["Close"], row["Volume"])
+    _assert_same_state(state, IndicatorState.from_frame(df))
+
+
+def test_replace_last_matches_rebuild(make_candles):
+    df = make_candles(120)
+    state = IndicatorState.from_frame(df.iloc[:100])
+    revised = df.iloc[:101].copy()
+    ts = revised.index[-1]
+    rng = np.random.default_rng(2)
+    state.update(ts, *revised.iloc[-1][["High", "Low", "Close", "Volume"]])
+    for _ in range(5):
+        close = revised["Close"].iloc[-1] * (1 + rng.normal(0, 0.002))
+        revised.iloc[-1, revised.columns.get_loc("Close")] = close
+        revised.iloc[-1, revised.columns.get_loc("High")] = max(revised["High"].iloc[-1], close)
+        revised.iloc[-1, revised.columns.get_loc("Low")] = min(revised["Low"].iloc[-1], close)
+        revised.iloc[-1, revised.columns.get_loc("Volume")] += 50
+        state.replace_last(*revised.iloc[-1][["High", "Low", "Close", "Volume"]])
+        _assert_same_state(state, IndicatorState.from_frame(revised))
+
+
+def test_incremental_sync_matches_from_frame(make_candles):
+    """Poller-style frames: new candles arrive and the forming one is revised in place."""
+    df = make_candles(600, seed=3)
+    rng = np.random.default_rng(3)
+    state = IndicatorState()
+    for end in range(30, len(df), 3):
+        frame = df.iloc[:end].copy()
+        # Revise the forming candle a couple of times before the next one opens.
+        for _ in range(2):
+            frame.iloc[-1, frame.columns.get_loc("Close")] *= 1 + rng.normal(0, 0.001)
+            frame.iloc[-1, frame.columns.get_loc("Volume")] += 10
+            state.sync(frame)
+        _assert_same_state(state, IndicatorState.from_frame(frame))
+
+
+def test_sync_rebuilds_when_history_is_replaced(make_candles):
+    state = IndicatorState.from_frame(make_candles(100, seed=4))
+    other = make_candles(100, seed=5, start="2026-02-02")
+    state.sync(other)
+    _assert_same_state(state, IndicatorState.from_frame(other))
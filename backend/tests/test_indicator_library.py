@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from app.models.schemas import ScenarioSpec
+from app.services.indicator_engine import IndicatorState, _index_ns, shocked_extended_indicators
+from app.services.indicator_library import EXTENDED_FIELDS, FusedState
+from app.services.scenario_engine import DROP, RISE, WINDOW, scenario_engine
+
+
+def _arrays(df):
+    return (
+        _index_ns(df.index),
+        df["High"].to_numpy(dtype=np.float64),
+        df["Low"].to_numpy(dtype=np.float64),
+        df["Close"].to_numpy(dtype=np.float64),
+        df["Volume"].to_numpy(dtype=np.float64),
+    )
+
+
+def _sequential(ts, high, low, close, volume) -> FusedState:
+    state = FusedState()
+    for row in zip(ts.tolist(), high.tolist(), low.tolist(), close.tolist(), volume.tolist()):
+        state.update(*row)
+    return state
+
+
+def _assert_same_values(actual: FusedState, expected: FusedState) -> None:
+    got, want = actual.values(), expected.values()
+    for name in EXTENDED_FIELDS:
+        if want[name] is None:
+            assert got[name] is None, name
+        else:
+            assert got[name] == pytest.approx(want[name], rel=1e-10, abs=1e-10), name
+
+
+# Around every window length (Bollinger 20, Stochastics 14 + 3, EMAs 12/26, MACD 26 + 9).
+@pytest.mark.parametrize("n", [1, 2, 3, 12, 13, 14, 15, 16, 17, 19, 20, 21, 26, 33, 34, 35, 300, 1500])
+def test_from_arrays_matches_sequential_updates(make_candles, n):
+    # 5m candles over several UTC days, so VWAP sessions roll over.
+    arrays = _arrays(make_candles(n, seed=n))
+    _assert_same_values(FusedState.from_arrays(*arrays), _sequential(*arrays))
+
+
+def test_from_arrays_state_keeps_updating_like_sequential(make_candles):
+    arrays = _arrays(make_candles(700, seed=7))
+    warm = FusedState.from_arrays(*(a[:400] for a in arrays))
+    for row in zip(*(a[400:].tolist() for a in arrays)):
+        warm.update(*row)
+    _assert_same_values(warm, _sequential(*arrays))
+
+
+def test_replace_last_matches_fresh_state(make_candles):
+    ts, high, low, close, volume = _arrays(make_candles(300, seed=8))
+    state = FusedState.from_arrays(ts, high, low, close, volume)
+    rng = np.random.default_rng(8)
+    for _ in range(5):
+        close = close.copy()
+        close[-1] *= 1 + rng.normal(0, 0.003)
+        high, low, volume = high.copy(), low.copy(), volume.copy()
+        high[-1] = max(high[-1], close[-1])
+        low[-1] = min(low[-1], close[-1])
+        volume[-1] += 25
+        state.replace_last(int(ts[-1]), high[-1], low[-1], close[-1], volume[-1])
+        _assert_same_values(state, FusedState.from_arrays(ts, high, low, close, volume))
+
+
+def test_copy_is_independent(make_candles):
+    arrays = _arrays(make_candles(100, seed=9))
+    state = FusedState.from_arrays(*(a[:99] for a in arrays))
+    before = state.values()
+    clone = state.copy()
+    clone.update(*(a[99].item() for a in arrays))
+    assert state.values() == before
+    _assert_same_values(clone, FusedState.from_arrays(*arrays))
+
+
+@pytest.mark.parametrize("n", [25, WINDOW, 400])
+def test_shocked_extended_indicators_match_rebuild_on_shocked_copy(make_candles, n):
+    df = make_candles(n, seed=10)
+    scenarios = [DROP, RISE, ScenarioSpec(name="burst", vol_multiplier=3.0, candles=5)]
+    shocked = scenario_engine.overlay(df, scenarios)
+    results = shocked_extended_indicators(df, shocked)
+
+    for row, extended in enumerate(results):
+        copy = df.copy()
+        tail = min(len(df), WINDOW)
+        for column in ("High", "Low", "Close", "Volume"):
+            copy.iloc[-tail:, copy.columns.get_loc(column)] = shocked[column][row, -tail:]
+        expected = IndicatorState.from_frame(copy).snapshot().model_dump()
+        for name in EXTENDED_FIELDS:
+            assert extended[name] == pytest.approx(expected[name], abs=1e-5), (row, name)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.candle_store import period_to_timedelta
+from app.services.indicator_engine import MIN_CANDLES
+from app.services.timeframes import TimeframeResampler
+
+RULES = {"15m": "15min", "1h": "1h", "4h": "4h", "1d": "1D"}
+
+
+def _reference(base: pd.DataFrame, interval: str) -> pd.DataFrame:
+    bars = base.resample(RULES[interval], label="left", closed="left").agg(
+        {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+    )
+    return bars.dropna(subset=["Close"])
+
+
+def _assert_matches_reference(frame: pd.DataFrame, seen: pd.DataFrame, interval: str) -> None:
+    expected = _reference(seen, interval).iloc[-len(frame):]
+    assert frame.index.equals(expected.index)
+    np.testing.assert_allclose(frame.to_numpy(), expected[list(frame.columns)].to_numpy(), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("interval", ["15m", "1h", "4h"])
+def test_incremental_resample_matches_pandas(make_candles, interval):
+    """Poller-style base frames: a sliding window whose forming candle is revised in place."""
+    base = make_candles(2000, seed=11)
+    rng = np.random.default_rng(11)
+    resampler = TimeframeResampler(max_bars=40)
+
+    for end in range(300, len(base), 11):
+        seen = base.iloc[:end].copy()
+        for _ in range(2):
+            seen.iloc[-1, seen.columns.get_loc("Close")] *= 1 + rng.normal(0, 0.001)
+            seen.iloc[-1, seen.columns.get_loc("High")] = seen[["High", "Close"]].iloc[-1].max()
+            seen.iloc[-1, seen.columns.get_loc("Volume")] += 5
+            frame = resampler.resample("X", "5m", seen.iloc[-1440:], interval)
+            _assert_matches_reference(frame, seen, interval)
+    assert len(frame) == 41
+
+
+def test_frames_handed_out_keep_their_closed_bars(make_candles):
+    """Reallocating the bar buffers must not rewrite frames returned earlier."""
+    base = make_candles(4000, seed=12)
+    resampler = TimeframeResampler(max_bars=30)
+    issued = []
+    for end in range(200, len(base), 5):
+        frame = resampler.resample("X", "5m", base.iloc[max(0, end - 600):end], "15m")
+        issued.append((frame, frame.iloc[:-1].copy()))
+    for frame, closed in issued:
+        pd.testing.assert_frame_equal(frame.iloc[:-1], closed)
+
+
+def test_period_trims_to_lookback_with_indicator_floor(make_candles):
+    base = make_candles(2016, seed=13)  # 7 days of 5m candles
+    resampler = TimeframeResampler()
+
+    frame = resampler.resample("X", "5m", base, "15m", "1d")
+    cutoff = base.index[-1] - period_to_timedelta("1d")
+    assert frame.index[0] <= cutoff < frame.index[1]
+    _assert_matches_reference(frame, base, "15m")
+
+    # One day of hourly bars is fewer than the indicators need.
+    hourly = resampler.resample("X", "5m", base, "1h", "12h")
+    assert len(hourly) == MIN_CANDLES + 1
+    _assert_matches_reference(hourly, base, "1h")
+
+    assert len(resampler.resample("X", "5m", base, "1d", "5d")) == 7
+    assert len(resampler.resample("X", "5m", base, "15m", None)) == len(_reference(base, "15m"))